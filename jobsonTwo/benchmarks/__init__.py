@@ -0,0 +1,3 @@
+"""
+Benchmark harness for JobsonTwo (see ``python -m jobsonTwo.benchmarks.run --help``)
+"""
@@ -0,0 +1,372 @@
+"""
+Reproducible benchmarks for JobsonTwo.
+
+Drives the Flask app through its test client and the execution engine
+directly, against a throwaway jobs directory and synthetic specs, and
+writes the measurements as JSON so runs can be compared between commits:
+
+    python -m jobsonTwo.benchmarks.run --output results.json
+    python -m jobsonTwo.benchmarks.run --compare jobsonTwo/benchmarks/baseline.json
+"""
+import argparse
+import contextlib
+import importlib
+import io
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+import yaml
+
+from jobsonTwo.execution.engine import JobExecutionEngine
+from jobsonTwo.execution.scheduler import JobScheduler
+from jobsonTwo.specs.loader import JobSpecLoader
+from jobsonTwo.specs.registry import SpecRegistry
+from jobsonTwo.storage.job_store import JobStore, TERMINAL_STATUSES
+
+# jobsonTwo.web re-exports the Flask object as ``app``, shadowing the module
+app_module = importlib.import_module('jobsonTwo.web.app')
+
+REPO_SPECS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'specs')
+
+CPU_SCRIPT = """import sys
+total = 0
+for i in range(int(sys.argv[1])):
+    total += i * i
+print(total)
+"""
+
+# Synthetic specs: a process that does nothing, and one that burns CPU for a while
+SYNTHETIC_SPECS = {
+    'bench_noop': {
+        'name': 'Benchmark No-op',
+        'description': 'Starts an interpreter and exits',
+        'expectedInputs': [
+            {'id': 'message', 'name': 'Message', 'type': 'string', 'description': 'Ignored', 'optional': True}
+        ],
+        'execution': {'application': 'python3', 'arguments': ['-c', 'pass']},
+        'cacheable': False,
+    },
+    'bench_noop_warm': {
+        'name': 'Benchmark No-op (warm)',
+        'description': 'Runs an empty script in the warm interpreter pool',
+        'expectedInputs': [
+            {'id': 'message', 'name': 'Message', 'type': 'string', 'description': 'Ignored', 'optional': True}
+        ],
+        'execution': {'application': 'python3', 'mode': 'warm', 'arguments': ['-c', 'pass']},
+        'cacheable': False,
+    },
+    'bench_cpu': {
+        'name': 'Benchmark CPU',
+        'description': 'Sums squares in a loop',
+        'expectedInputs': [
+            {'id': 'iterations', 'name': 'Iterations', 'type': 'number', 'description': 'Loop count'}
+        ],
+        'execution': {'application': 'python3', 'arguments': ['-c', CPU_SCRIPT, '${inputs.iterations}']},
+        'cacheable': False,
+    },
+}
+
+CPU_ITERATIONS = 2000000
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Summarize samples (seconds) as milliseconds."""
+    if not samples:
+        return {'count': 0}
+    ordered = sorted(samples)
+
+    def rank(p):
+        return ordered[min(len(ordered) - 1, max(0, int(round(p / 100.0 * len(ordered))) - 1))]
+
+    return {
+        'count': len(ordered),
+        'mean_ms': round(sum(ordered) / len(ordered) * 1000, 3),
+        'p50_ms': round(rank(50) * 1000, 3),
+        'p90_ms': round(rank(90) * 1000, 3),
+        'p99_ms': round(rank(99) * 1000, 3),
+        'max_ms': round(ordered[-1] * 1000, 3),
+    }
+
+
+def parse_time(value: str) -> float:
+    return datetime.fromisoformat(value).timestamp()
+
+
+class Environment:
+    """Throwaway jobs directory and specs wired into the Flask app module."""
+
+    def __init__(self, root: str, max_workers: int):
+        self.root = root
+        self.specs_dir = os.path.join(root, 'specs')
+        os.makedirs(self.specs_dir)
+        for spec_id, spec in SYNTHETIC_SPECS.items():
+            with open(os.path.join(self.specs_dir, f'{spec_id}.yaml'), 'w') as f:
+                yaml.safe_dump(spec, f, sort_keys=False)
+
+        self.registry = SpecRegistry(self.specs_dir, JobSpecLoader())
+        self.store = JobStore(os.path.join(root, 'jobs'))
+        self.engine = JobExecutionEngine(self.store)
+        self.scheduler = JobScheduler(self.engine, max_workers=max_workers)
+
+        app_module.spec_registry = self.registry
+        app_module.job_store = self.store
+        app_module.job_engine = self.engine
+        app_module.job_scheduler = self.scheduler
+        app_module.app.config['TESTING'] = True
+        self.client = app_module.app.test_client()
+
+    def spec(self, spec_id: str) -> Dict[str, Any]:
+        return self.registry.get(spec_id)
+
+    def wait_for(self, job_ids: List[str], timeout: float = 600.0) -> None:
+        """Block until every job reaches a terminal status."""
+        pending = set(job_ids)
+        deadline = time.monotonic() + timeout
+        while pending:
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"{len(pending)} benchmark jobs did not finish")
+            pending = {job_id for job_id in pending if self.store.get_job(job_id)['status'] not in TERMINAL_STATUSES}
+            if pending:
+                time.sleep(0.01)
+
+    def close(self) -> None:
+        self.scheduler.shutdown()
+        self.engine.shutdown()
+
+
+def bench_submissions(env: Environment, count: int) -> Dict[str, Any]:
+    """Submissions per second through the HTML form and the batch API."""
+    results = {}
+
+    job_ids = []
+    started = time.perf_counter()
+    for i in range(count):
+        response = env.client.post('/jobs/new?type=bench_noop_warm', data={'name': f'submit {i}', 'message': 'x'})
+        job_ids.append(response.headers['Location'].rsplit('/', 1)[-1])
+    elapsed = time.perf_counter() - started
+    results['form'] = {'jobs': count, 'seconds': round(elapsed, 4), 'per_second': round(count / elapsed, 1)}
+    env.wait_for(job_ids)
+
+    started = time.perf_counter()
+    response = env.client.post('/api/batches', json={
+        'spec': 'bench_noop_warm',
+        'inputs': [{'message': str(i)} for i in range(count)],
+    })
+    elapsed = time.perf_counter() - started
+    batch_id = response.get_json()['batch_id']
+    results['batch'] = {'jobs': count, 'seconds': round(elapsed, 4), 'per_second': round(count / elapsed, 1)}
+    env.wait_for([job['id'] for job in env.store.list_batch_jobs(batch_id)])
+    return results
+
+
+def run_latency(env: Environment, spec_id: str, inputs: Dict[str, Any], count: int, thread_per_job: bool) -> Dict[str, Any]:
+    """Submit a burst of jobs and measure creation-to-completion latency."""
+    spec = env.spec(spec_id)
+    job_ids = [env.store.create_job(spec, dict(inputs), f'latency {i}') for i in range(count)]
+
+    started = time.perf_counter()
+    if thread_per_job:
+        # The original design: one unbounded thread per submitted job
+        for job_id in job_ids:
+            threading.Thread(target=env.engine.execute_job, args=(job_id, spec, dict(inputs)), daemon=True).start()
+    else:
+        env.scheduler.submit_many([(job_id, spec, dict(inputs)) for job_id in job_ids])
+    env.wait_for(job_ids)
+    elapsed = time.perf_counter() - started
+
+    latencies = []
+    failed = 0
+    for job_id in job_ids:
+        job = env.store.get_job(job_id)
+        if job['status'] != 'completed':
+            failed += 1
+        latencies.append(parse_time(job['completed_at']) - parse_time(job['created_at']))
+
+    summary = percentiles(latencies)
+    summary.update({'seconds': round(elapsed, 4), 'jobs_per_second': round(count / elapsed, 1), 'failed': failed})
+    return summary
+
+
+def bench_latency(env: Environment, count: int, cpu_count: int) -> Dict[str, Any]:
+    """End-to-end job latency for each execution mode."""
+    cpu_inputs = {'iterations': CPU_ITERATIONS}
+    return {
+        'noop': {
+            'thread_per_job': run_latency(env, 'bench_noop', {}, count, thread_per_job=True),
+            'scheduler': run_latency(env, 'bench_noop', {}, count, thread_per_job=False),
+            'scheduler_warm': run_latency(env, 'bench_noop_warm', {}, count, thread_per_job=False),
+        },
+        'cpu': {
+            'thread_per_job': run_latency(env, 'bench_cpu', cpu_inputs, cpu_count, thread_per_job=True),
+            'scheduler': run_latency(env, 'bench_cpu', cpu_inputs, cpu_count, thread_per_job=False),
+        },
+    }
+
+
+def fill_store(store: JobStore, spec: Dict[str, Any], total: int, chunk: int = 10000) -> None:
+    """Insert total jobs with a realistic mix of statuses."""
+    for offset in range(0, total, chunk):
+        size = min(chunk, total - offset)
+        _, job_ids = store.create_batch(spec, [{'inputs': {'message': str(i)}, 'name': f'job {offset + i}'} for i in range(size)])
+        failed = size // 10
+        store.update_jobs_status(job_ids[:failed], 'failed')
+        store.update_jobs_status(job_ids[failed:size - failed], 'completed')
+
+
+def time_requests(client, path: str, repeats: int) -> Dict[str, Any]:
+    samples = []
+    for _ in range(repeats):
+        started = time.perf_counter()
+        response = client.get(path)
+        samples.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise RuntimeError(f"GET {path} returned {response.status_code}")
+    return percentiles(samples)
+
+
+def bench_listing(env: Environment, scales: List[int], repeats: int) -> Dict[str, Any]:
+    """Latency of the dashboard and job list pages at several store sizes."""
+    spec = env.spec('bench_noop')
+    results = {}
+    original_store = app_module.job_store
+    try:
+        for total in scales:
+            store = JobStore(os.path.join(env.root, f'listing_{total}'))
+            started = time.perf_counter()
+            fill_store(store, spec, total)
+            fill_seconds = time.perf_counter() - started
+            app_module.job_store = store
+
+            _, cursor = store.list_jobs_page(limit=app_module.DEFAULT_PAGE_SIZE)
+            results[str(total)] = {
+                'fill_seconds': round(fill_seconds, 3),
+                'index': time_requests(env.client, '/', repeats),
+                'jobs': time_requests(env.client, '/jobs', repeats),
+                'jobs_page_2': time_requests(env.client, f'/jobs?cursor={cursor}', repeats),
+                'jobs_failed': time_requests(env.client, '/jobs?status=failed', repeats),
+                'api_jobs': time_requests(env.client, '/api/jobs', repeats),
+            }
+    finally:
+        app_module.job_store = original_store
+    return results
+
+
+def bench_spec_loading(env: Environment, repeats: int) -> Dict[str, Any]:
+    """Cost of parsing and validating spec files versus registry lookups."""
+    loader = JobSpecLoader()
+    spec_files = sorted(
+        os.path.join(REPO_SPECS_DIR, name) for name in os.listdir(REPO_SPECS_DIR) if name.endswith('.yaml')
+    )
+    samples = []
+    for _ in range(repeats):
+        for path in spec_files:
+            started = time.perf_counter()
+            loader.load_from_file(path)
+            samples.append(time.perf_counter() - started)
+
+    registry = SpecRegistry(REPO_SPECS_DIR, loader)
+    spec_ids = [os.path.splitext(os.path.basename(path))[0] for path in spec_files]
+    registry.refresh()
+    lookups = []
+    for _ in range(repeats):
+        for spec_id in spec_ids:
+            started = time.perf_counter()
+            registry.get(spec_id)
+            lookups.append(time.perf_counter() - started)
+
+    return {
+        'load_from_file': percentiles(samples),
+        'registry_get': percentiles(lookups),
+        'new_job_form': time_requests(env.client, '/jobs/new', repeats),
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=os.path.dirname(__file__), stderr=subprocess.DEVNULL
+        ).decode().strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], path: str = '') -> List[str]:
+    """List p50 latencies and throughputs side by side with a baseline run."""
+    lines = []
+    for key, value in current.items():
+        other = baseline.get(key) if isinstance(baseline, dict) else None
+        if isinstance(value, dict) and isinstance(other, dict):
+            lines.extend(compare(value, other, f'{path}{key}.'))
+        elif key in ('p50_ms', 'per_second', 'jobs_per_second') and isinstance(other, (int, float)) and other:
+            lines.append(f'{path}{key}: {other} -> {value} ({value / other:.2f}x)')
+    return lines
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Run JobsonTwo benchmarks')
+    parser.add_argument('--output', help='Write results JSON to this file')
+    parser.add_argument('--compare', help='Baseline results JSON to compare against')
+    parser.add_argument('--jobs', type=int, default=200, help='Jobs per submission and latency run')
+    parser.add_argument('--scales', default='1000,10000,100000', help='Comma-separated stored job counts for listing')
+    parser.add_argument('--repeats', type=int, default=20, help='Requests timed per listing page')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Scheduler worker count')
+    parser.add_argument('--only', help='Comma-separated subset: submissions,latency,listing,spec_loading')
+    args = parser.parse_args(argv)
+
+    selected = set(args.only.split(',')) if args.only else {'submissions', 'latency', 'listing', 'spec_loading'}
+    root = tempfile.mkdtemp(prefix='jobson-bench-')
+    results = {
+        'meta': {
+            'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'revision': git_revision(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'workers': args.workers,
+            'jobs': args.jobs,
+        }
+    }
+    env = Environment(root, args.workers)
+    try:
+        # Keep console output from the app and engine out of the report
+        with contextlib.redirect_stdout(io.StringIO()):
+            if 'spec_loading' in selected:
+                results['spec_loading'] = bench_spec_loading(env, args.repeats)
+            if 'submissions' in selected:
+                results['submissions'] = bench_submissions(env, args.jobs)
+            if 'latency' in selected:
+                results['latency'] = bench_latency(env, args.jobs, args.workers * 2)
+            if 'listing' in selected:
+                scales = [int(n) for n in args.scales.split(',') if n]
+                results['listing'] = bench_listing(env, scales, args.repeats)
+    finally:
+        env.close()
+        shutil.rmtree(root, ignore_errors=True)
+
+    report = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(report + '\n')
+    else:
+        print(report)
+
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            baseline = json.load(f)
+        if baseline.get('meta', {}).get('note'):
+            print(f"Baseline: {baseline['meta']['note']}", file=sys.stderr)
+        print('\n'.join(compare(results, baseline)), file=sys.stderr)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
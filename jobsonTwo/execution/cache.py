@@ -0,0 +1,232 @@
+import os
+import json
+import shutil
+import stat
+import hashlib
+import threading
+import uuid
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Sequence
+
+# Spec fields that determine what a job computes
+KEY_SPEC_FIELDS = ('name', 'version', 'expectedInputs', 'execution', 'outputs')
+
+ENTRY_FILE = 'entry.json'
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file's contents."""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(src: str, dst: str) -> None:
+    """Hardlink src to dst, falling back to a copy across filesystems.
+
+    The file is made read-only, as UploadStore does for uploads: a hardlink
+    shares its contents with every other job directory or cache entry
+    linking it, so a job writing to its copy in place would change them all.
+    """
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+    os.chmod(dst, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+
+
+class ResultCache:
+    """Content-addressed cache of job outputs.
+
+    Entries are keyed on the spec definition (including its version) plus
+    the input values and the content hashes of input files. Each entry is a
+    directory holding the output files, any other files of the job kept
+    with them (such as its stdout and stderr logs) and an ``entry.json``
+    with the recorded results. Least recently used entries are evicted once the
+    cache grows past ``max_bytes``.
+    """
+
+    def __init__(self, cache_dir: str, max_bytes: int = 1024 * 1024 * 1024):
+        """Initialize the result cache.
+
+        Args:
+            cache_dir: Directory holding cache entries
+            max_bytes: Total size of cached outputs to keep before evicting
+        """
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._entries: 'OrderedDict[str, int]' = OrderedDict()
+        self._total_bytes = 0
+        self._load_index()
+
+    def _load_index(self) -> None:
+        """Rebuild the LRU index from the entries on disk, oldest first."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            entry_file = os.path.join(self.cache_dir, name, ENTRY_FILE)
+            try:
+                with open(entry_file, 'r') as f:
+                    size = json.load(f).get('size', 0)
+                entries.append((os.path.getmtime(entry_file), name, size))
+            except (OSError, ValueError):
+                continue
+        for _, name, size in sorted(entries):
+            self._entries[name] = size
+            self._total_bytes += size
+
+    def key_for(self, spec: Dict[str, Any], inputs: Dict[str, Any], input_files: Dict[str, str],
+                digests: Optional[Dict[str, str]] = None) -> Optional[str]:
+        """Compute the cache key for a job, or None if the spec opts out.
+
+        Args:
+            spec: Job specification
+            inputs: Job input values
+            input_files: Materialized input files keyed by input id
+            digests: Already known SHA-256 digests of input files keyed by
+                input id (such as stored uploads); other files are hashed
+        """
+        digests = digests or {}
+        if not spec.get('cacheable', True):
+            return None
+
+        key_inputs = {}
+        for input_spec in spec['expectedInputs']:
+            input_id = input_spec['id']
+            if input_spec['type'] == 'file' and input_id in input_files:
+                key_inputs[input_id] = {'sha256': digests.get(input_id) or hash_file(input_files[input_id])}
+            elif inputs.get(input_id) is not None:
+                key_inputs[input_id] = str(inputs[input_id])
+
+        payload = {
+            'spec': {field: spec.get(field) for field in KEY_SPEC_FIELDS},
+            'inputs': key_inputs,
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()
+
+    def materialize(self, key: str, job_dir: str) -> Optional[Dict[str, Any]]:
+        """Place cached outputs for key into job_dir.
+
+        Returns:
+            The cached results (with output paths rewritten to job_dir) or
+            None on a cache miss
+        """
+        entry_dir = os.path.join(self.cache_dir, key)
+        with self._lock:
+            if key not in self._entries:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+
+        try:
+            with open(os.path.join(entry_dir, ENTRY_FILE), 'r') as f:
+                entry = json.load(f)
+            output_files = {}
+            for output_id, rel_path in entry['output_files'].items():
+                dst = os.path.join(job_dir, rel_path)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                if os.path.exists(dst):
+                    os.remove(dst)
+                link_or_copy(os.path.join(entry_dir, 'outputs', rel_path), dst)
+                output_files[output_id] = dst
+            for rel_path in entry.get('files', []):
+                dst = os.path.join(job_dir, rel_path)
+                if os.path.exists(dst):
+                    os.remove(dst)
+                link_or_copy(os.path.join(entry_dir, 'files', rel_path), dst)
+            os.utime(os.path.join(entry_dir, ENTRY_FILE))
+        except (OSError, ValueError, KeyError) as e:
+            # Entry was damaged or evicted underneath us; treat as a miss
+            print(f"Error reading cache entry {key}: {e}")
+            self._discard(key)
+            with self._lock:
+                self.hits -= 1
+                self.misses += 1
+            return None
+
+        results = dict(entry['results'])
+        results['output_files'] = output_files
+        return results
+
+    def store(self, key: str, job_dir: str, results: Dict[str, Any], files: Sequence[str] = ()) -> None:
+        """Record the outputs of a successful job under key.
+
+        Args:
+            key: Cache key of the job
+            job_dir: The job's directory
+            results: The job's results, with its output files
+            files: Other files of the job, relative to job_dir, restored
+                with the outputs on a hit; missing ones are skipped
+        """
+        with self._lock:
+            if key in self._entries:
+                return
+
+        tmp_dir = os.path.join(self.cache_dir, f'.tmp-{uuid.uuid4().hex}')
+        try:
+            output_files = {}
+            size = 0
+            for output_id, path in results.get('output_files', {}).items():
+                rel_path = os.path.relpath(path, job_dir)
+                dst = os.path.join(tmp_dir, 'outputs', rel_path)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                link_or_copy(path, dst)
+                output_files[output_id] = rel_path
+                size += os.path.getsize(dst)
+            kept_files = []
+            for rel_path in files:
+                path = os.path.join(job_dir, rel_path)
+                if not os.path.isfile(path):
+                    continue
+                dst = os.path.join(tmp_dir, 'files', rel_path)
+                os.makedirs(os.path.dirname(dst), exist_ok=True)
+                link_or_copy(path, dst)
+                kept_files.append(rel_path)
+                size += os.path.getsize(dst)
+
+            cached_results = {
+                k: v for k, v in results.items()
+                if k in ('stdout', 'stderr', 'stdout_truncated', 'stderr_truncated', 'return_code')
+            }
+            with open(os.path.join(tmp_dir, ENTRY_FILE), 'w') as f:
+                json.dump({'output_files': output_files, 'files': kept_files, 'results': cached_results, 'size': size}, f)
+            os.rename(tmp_dir, os.path.join(self.cache_dir, key))
+        except OSError as e:
+            print(f"Error storing cache entry {key}: {e}")
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            return
+
+        with self._lock:
+            self._entries[key] = size
+            self._total_bytes += size
+            evicted = []
+            while self._total_bytes > self.max_bytes and len(self._entries) > 1:
+                old_key, old_size = self._entries.popitem(last=False)
+                self._total_bytes -= old_size
+                evicted.append(old_key)
+        for old_key in evicted:
+            shutil.rmtree(os.path.join(self.cache_dir, old_key), ignore_errors=True)
+
+    def _discard(self, key: str) -> None:
+        with self._lock:
+            size = self._entries.pop(key, None)
+            if size is not None:
+                self._total_bytes -= size
+        shutil.rmtree(os.path.join(self.cache_dir, key), ignore_errors=True)
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and cache size."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+            }
@@ -0,0 +1,145 @@
+import gzip
+import os
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# Sidecar file suffix of each content coding, in order of server preference
+SIDECAR_SUFFIXES = {'zstd': '.zst', 'gzip': '.gz'}
+
+# Content codings sidecars are written in
+SIDECAR_ENCODINGS = [encoding for encoding in SIDECAR_SUFFIXES if encoding != 'zstd' or zstandard is not None]
+
+# Files smaller than this are not worth compressing
+MIN_COMPRESS_BYTES = 1024
+
+# Bytes from the start of a file compressed to estimate how well it compresses
+PROBE_BYTES = 64 * 1024
+
+# Largest compressed/original size ratio of the probe for a file to get sidecars
+MAX_PROBE_RATIO = 0.9
+
+CHUNK_SIZE = 1024 * 1024
+
+
+def sidecar_path(path: str, encoding: str) -> str:
+    """Return the path of a file's precompressed copy in a content coding."""
+    return path + SIDECAR_SUFFIXES[encoding]
+
+
+def worth_compressing(path: str) -> bool:
+    """Check with a fast compression probe whether a file is large and compressible enough."""
+    try:
+        if os.path.getsize(path) < MIN_COMPRESS_BYTES:
+            return False
+        with open(path, 'rb') as f:
+            sample = f.read(PROBE_BYTES)
+    except OSError:
+        return False
+    return len(zlib.compress(sample, 1)) <= len(sample) * MAX_PROBE_RATIO
+
+
+def _write_gzip(path: str, target) -> None:
+    # Fixed mtime and no file name keep the sidecar bytes reproducible
+    with open(path, 'rb') as src, gzip.GzipFile(filename='', mode='wb', fileobj=target, compresslevel=6, mtime=0) as dst:
+        for chunk in iter(lambda: src.read(CHUNK_SIZE), b''):
+            dst.write(chunk)
+
+
+def _write_zstd(path: str, target) -> None:
+    with open(path, 'rb') as src:
+        zstandard.ZstdCompressor(level=10).copy_stream(src, target, size=os.path.getsize(path))
+
+
+WRITERS = {'gzip': _write_gzip, 'zstd': _write_zstd}
+
+
+def compress_file(path: str, encodings: Optional[List[str]] = None) -> List[str]:
+    """Write precompressed sidecars next to a file if it compresses well.
+
+    Each sidecar is written to a temporary file and renamed into place, so a
+    reader never sees a partial one.
+
+    Args:
+        path: File to compress
+        encodings: Content codings to write (defaults to SIDECAR_ENCODINGS)
+
+    Returns:
+        Content codings sidecars were written in
+    """
+    if not worth_compressing(path):
+        return []
+    written = []
+    for encoding in encodings or SIDECAR_ENCODINGS:
+        target_path = sidecar_path(path, encoding)
+        tmp_path = target_path + '.tmp'
+        try:
+            with open(tmp_path, 'wb') as target:
+                WRITERS[encoding](path, target)
+            os.replace(tmp_path, target_path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        written.append(encoding)
+    return written
+
+
+def compress_files(paths: List[str]) -> Dict[str, List[str]]:
+    """Write sidecars for many files, skipping missing ones and duplicates.
+
+    Returns:
+        Content codings written, keyed by path, for files that got sidecars
+    """
+    compressed = {}
+    for path in dict.fromkeys(paths):
+        encodings = compress_file(path)
+        if encodings:
+            compressed[path] = encodings
+    return compressed
+
+
+def find_sidecar(path: str, accept_encodings) -> Optional[Tuple[str, str]]:
+    """Pick the precompressed copy of a file to send for a request's Accept-Encoding.
+
+    Among the codings the client accepts, the one it gives the highest
+    quality is chosen, with ties going to SIDECAR_SUFFIXES order. A sidecar
+    older than its file is ignored.
+
+    Args:
+        path: File being requested
+        accept_encodings: The request's parsed Accept-Encoding header
+
+    Returns:
+        Tuple of (sidecar path, content coding), or None to send the file as is
+    """
+    best = None
+    for encoding in SIDECAR_SUFFIXES:
+        quality = accept_encodings.quality(encoding)
+        if quality <= 0 or (best is not None and quality <= best[0]):
+            continue
+        try:
+            candidate = sidecar_path(path, encoding)
+            if os.stat(candidate).st_mtime < os.stat(path).st_mtime:
+                continue
+        except OSError:
+            continue
+        best = (quality, candidate, encoding)
+    return (best[1], best[2]) if best is not None else None
+
+
+def has_sidecars(path: str) -> bool:
+    """Check whether any precompressed copy of a file exists."""
+    return any(os.path.exists(sidecar_path(path, encoding)) for encoding in SIDECAR_SUFFIXES)
+
+
+def is_sidecar(path: str) -> bool:
+    """Check whether a file is the precompressed copy of another file next to it."""
+    return any(
+        path.endswith(suffix) and os.path.exists(path[:-len(suffix)])
+        for suffix in SIDECAR_SUFFIXES.values()
+    )
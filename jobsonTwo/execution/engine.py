@@ -1,24 +1,118 @@
 import os
-import subprocess
 import json
-from typing import Dict, Any, Optional
-from pathlib import Path
+import threading
+import time
+import traceback
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Any, Optional, Callable
 from jobsonTwo.storage.job_store import JobStore
+from jobsonTwo.specs.template import ArgumentTemplate, CompiledSpec, compile_arguments
+from jobsonTwo.specs.inputs import format_input_value
+from jobsonTwo.metrics import JOBS_FINISHED, JOB_RUN_SECONDS, INPUT_MATERIALIZE_SECONDS
+from .output import read_head_tail
+from .job_log import JobLogger, LOG_FILE
+from .cache import ResultCache, link_or_copy
+from .warm_pool import WarmPool
+from .resources import rusage_to_dict
+from .supervisor import ProcessSupervisor
+from .compression import compress_files
+
+# Names of the files a job's stdout and stderr are streamed to
+STDOUT_FILE = 'stdout.log'
+STDERR_FILE = 'stderr.log'
+
+# Seconds a job gets to exit after SIGTERM before its process group is killed
+DEFAULT_GRACE_PERIOD = 10.0
+
+# Niceness added to the thread compressing finished jobs' artifacts
+COMPRESSOR_NICENESS = 10
+
+
+def lower_thread_priority() -> None:
+    """Make the calling thread yield the CPU to jobs and request handling (Linux only)."""
+    try:
+        os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), COMPRESSOR_NICENESS)
+    except (AttributeError, OSError):
+        pass
+
+
+class RunningJob:
+    """State of a job whose process has been started."""
+
+    __slots__ = ('job_id', 'spec', 'spec_key', 'job_dir', 'logger', 'process', 'started', 'cache_key',
+                 'future', 'cancel_timeout', 'timed_out', 'stop_requested', 'abandoned', 'claim_id')
+
+    def __init__(self, job_id: str, spec: Dict[str, Any], spec_key: str, job_dir: str, logger: JobLogger,
+                 cache_key: Optional[str], future: Future, claim_id: Optional[str] = None):
+        self.job_id = job_id
+        self.spec = spec
+        self.spec_key = spec_key
+        self.job_dir = job_dir
+        self.logger = logger
+        self.cache_key = cache_key
+        self.future = future
+        self.process = None
+        self.started = 0.0
+        self.cancel_timeout: Optional[Callable[[], None]] = None
+        self.timed_out = False
+        self.stop_requested = False
+        self.abandoned = False
+        self.claim_id = claim_id
+
 
 class JobExecutionEngine:
-    """Handles job execution and process management."""
+    """Handles job execution and process management.
+
+    Job processes are started without blocking on them: a ProcessSupervisor
+    notices their exits and enforces timeouts from a single event loop
+    thread, and results are collected on a small pool of finisher threads.
+    Preparing a job (materializing inputs, computing its cache key, waiting
+    for a warm interpreter) happens on a pool of starter threads, so
+    ``start_job`` returns at once and a slow job does not hold up the caller.
+    """
     
-    def __init__(self, job_store: JobStore):
+    def __init__(self, job_store: JobStore, output_preview_bytes: int = 64 * 1024,
+                 result_cache: Optional[ResultCache] = None, warm_pool: Optional[WarmPool] = None,
+                 log_echo: bool = False, supervisor: Optional[ProcessSupervisor] = None,
+                 finisher_threads: int = 4, compress_artifacts: bool = True,
+                 upload_store=None, starter_threads: int = 4):
         """Initialize the job execution engine.
         
         Args:
             job_store: JobStore instance for job state management
+            output_preview_bytes: Maximum bytes of stdout/stderr kept in job
+                results (split between the head and tail of each stream)
+            result_cache: Optional cache used to skip re-running identical jobs
+            warm_pool: Pool of warm interpreters for ``execution.mode: warm``
+                specs (created on demand where fork is available)
+            log_echo: Also print job log records to the server's stdout
+            supervisor: Event loop watching job processes (created if not given)
+            finisher_threads: Threads collecting results of finished jobs
+            compress_artifacts: Write gzip (and zstd, if available) copies of
+                a finished job's compressible outputs, logs and results
+            upload_store: UploadStore whose files' digests are reused for
+                cache keys instead of hashing the inputs again
+            starter_threads: Threads preparing and starting jobs
         """
         self.job_store = job_store
-        self.running_jobs: Dict[str, subprocess.Popen] = {}
+        self.output_preview_bytes = output_preview_bytes
+        self.result_cache = result_cache
+        if warm_pool is None and hasattr(os, 'fork'):
+            warm_pool = WarmPool()
+        self.warm_pool = warm_pool
+        self.log_echo = log_echo
+        self.compress_artifacts = compress_artifacts
+        self.upload_store = upload_store
+        self.supervisor = supervisor or ProcessSupervisor()
+        self.running_jobs: Dict[str, RunningJob] = {}
+        self._lock = threading.Lock()
+        self._finishers = ThreadPoolExecutor(max_workers=finisher_threads, thread_name_prefix='jobson-finisher')
+        self._starters = ThreadPoolExecutor(max_workers=starter_threads, thread_name_prefix='jobson-starter')
+        self._compressor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='jobson-compress',
+                                              initializer=lower_thread_priority)
     
     def execute_job(self, job_id: str, spec: Dict[str, Any], inputs: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        """Execute a job according to its specification.
+        """Execute a job according to its specification and wait for it.
         
         Args:
             job_id: Job identifier
@@ -28,101 +122,336 @@ class JobExecutionEngine:
         Returns:
             Job results dictionary or None if execution failed
         """
-        # Create job directory
-        job_dir = os.path.join(self.job_store.jobs_dir, job_id)
-        os.makedirs(job_dir, exist_ok=True)
-        
-        # Set up logging
-        log_file = os.path.join(job_dir, 'job.log')
-        def log(message):
-            with open(log_file, 'a') as f:
-                f.write(f"{message}\n")
-            print(message)
+        return self.start_job(job_id, spec, inputs).result()
+    
+    def start_job(self, job_id: str, spec: Dict[str, Any], inputs: Dict[str, Any],
+                  claim_id: Optional[str] = None) -> Future:
+        """Prepare a job and start its process on a starter thread.
         
+        Args:
+            job_id: Job identifier
+            spec: Job specification
+            inputs: Job input values
+            claim_id: Job queue claim that must still hold the job, with an
+                unexpired lease, for its status and results to be recorded
+            
+        Returns:
+            Future resolving to the job results, or None if execution failed
+        """
+        future: Future = Future()
+        job_dir = os.path.join(self.job_store.jobs_dir, job_id)
+        logger = JobLogger(os.path.join(job_dir, LOG_FILE), echo=self.log_echo, prefix=f"[{job_id}] ")
+        job = RunningJob(job_id, spec, spec.get('id') or spec.get('name', ''), job_dir, logger, None, future, claim_id)
+        # Registered right away so the job can be stopped while it is being prepared
+        with self._lock:
+            self.running_jobs[job_id] = job
+        self._starters.submit(self._start_job, job, inputs)
+        return future
+    
+    def _start_job(self, job: RunningJob, inputs: Dict[str, Any]) -> None:
+        """Prepare a job and start its process without waiting for it."""
+        job_id, spec, spec_key, job_dir, logger = job.job_id, job.spec, job.spec_key, job.job_dir, job.logger
         try:
-            log(f"Starting job execution for {job_id}")
-            self.job_store.update_job_status(job_id, 'running')
+            if not self.job_store.update_job_status(job_id, 'running', claim_id=job.claim_id):
+                # Deleted, or the lease on it was lost before it started
+                self._abandon(job)
+                return
+            os.makedirs(job_dir, exist_ok=True)
+            logger.log(f"Starting job execution for {job_id}", flush=True, status='running')
             
             # Create input files
+            materialize_started = time.perf_counter()
             input_files = self._create_input_files(job_dir, spec, inputs)
-            log(f"Created input files: {input_files}")
+            INPUT_MATERIALIZE_SECONDS.labels(spec_key).observe(time.perf_counter() - materialize_started)
+            logger.info(f"Created input files: {input_files}")
+            
+            # Reuse the outputs of an identical earlier job if cached
+            if self.result_cache is not None:
+                job.cache_key = self.result_cache.key_for(spec, inputs, input_files, self._upload_digests(spec, inputs))
+                if job.cache_key is not None:
+                    results = self.result_cache.materialize(job.cache_key, job_dir)
+                    if results is not None:
+                        with self._lock:
+                            self._unregister(job)
+                        results.update({'log_file': logger.path, 'cache_hit': True, 'cache_key': job.cache_key})
+                        if not self.job_store.update_job_status(job_id, 'completed', results, claim_id=job.claim_id):
+                            self._abandon(job)
+                            return
+                        results_file = self._save_results(job_dir, results)
+                        JOBS_FINISHED.labels(spec_key, 'completed').inc()
+                        logger.log(f"Result cache hit, saved cached results to {results_file}", status='completed')
+                        logger.close()
+                        job.future.set_result(results)
+                        self._compress_artifacts(job_id, results)
+                        return
             
             # Prepare command
-            cmd = self._prepare_command(spec, job_dir)
-            log(f"Prepared command: {cmd}")
-            
-            # Execute command
-            log(f"Executing command in directory: {job_dir}")
-            process = subprocess.Popen(
-                cmd,
-                cwd=job_dir,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                env=dict(os.environ, JOB_DIR=job_dir)
-            )
-            
-            # Store process reference
-            self.running_jobs[job_id] = process
-            
-            # Wait for completion
-            stdout, stderr = process.communicate()
-            log(f"Command execution completed with return code: {process.returncode}")
-            log(f"stdout: {stdout}")
-            log(f"stderr: {stderr}")
+            cmd = self._prepare_command(spec, inputs, input_files)
+            logger.info(f"Prepared command: {cmd}")
+            
+            if self._stopped_before_start(job):
+                return
+            
+            # Start the process, streaming output straight to per-job files
+            logger.info(f"Executing command in directory: {job_dir}")
+            stdout_file = os.path.join(job_dir, STDOUT_FILE)
+            stderr_file = os.path.join(job_dir, STDERR_FILE)
+            env = dict(os.environ, JOB_DIR=job_dir)
+            job.started = time.monotonic()
+            if spec['execution'].get('mode') == 'warm' and self.warm_pool is not None:
+                logger.info("Running in warm interpreter pool")
+                process = self.warm_pool.spawn(
+                    cmd,
+                    spec['execution'].get('preload', []),
+                    cwd=job_dir,
+                    env=env,
+                    stdout_path=stdout_file,
+                    stderr_path=stderr_file
+                )
+            else:
+                process = self.supervisor.spawn(cmd, job_dir, env, stdout_file, stderr_file)
+            with self._lock:
+                job.process = process
+                stop_requested = job.stop_requested
+            if stop_requested:
+                # Stopped while the process was being spawned
+                self.supervisor.stop(process, self._grace_period(spec))
+            
+            timeout = spec['execution'].get('timeout')
+            if timeout:
+                job.cancel_timeout = self.supervisor.call_later(float(timeout), self._timeout_job, job)
+            logger.log(f"Started process {process.pid}", flush=True)
+            
+            # Results are collected off the thread that notices the exit
+            process.add_done_callback(lambda _: self._finishers.submit(self._finish_job, job))
+        except Exception as e:
+            self._fail_job(job, e)
+    
+    def _stopped_before_start(self, job: RunningJob) -> bool:
+        """Finish a job that was stopped or abandoned while it was being prepared."""
+        with self._lock:
+            if not job.stop_requested:
+                return False
+            self._unregister(job)
+        if job.abandoned or not self.job_store.update_job_status(job.job_id, 'stopped', claim_id=job.claim_id):
+            self._abandon(job)
+            return True
+        JOBS_FINISHED.labels(job.spec_key, 'stopped').inc()
+        job.logger.log("Job stopped before it started", 'warning', status='stopped')
+        job.logger.close()
+        job.future.set_result(None)
+        return True
+    
+    def _upload_digests(self, spec: Dict[str, Any], inputs: Dict[str, Any]) -> Dict[str, str]:
+        """Content digests of file inputs that are stored uploads, known from their names."""
+        if self.upload_store is None:
+            return {}
+        digests = {}
+        for input_spec in spec['expectedInputs']:
+            value = inputs.get(input_spec['id'])
+            if input_spec['type'] == 'file' and isinstance(value, str):
+                digest = self.upload_store.digest_of(value)
+                if digest is not None:
+                    digests[input_spec['id']] = digest
+        return digests
+    
+    def _finish_job(self, job: RunningJob) -> None:
+        """Collect a finished job's outputs and record its final status."""
+        process = job.process
+        logger = job.logger
+        try:
+            with self._lock:
+                self._unregister(job)
+            if job.cancel_timeout is not None:
+                job.cancel_timeout()
+            if job.abandoned:
+                self._abandon(job)
+                return
+            
+            wall_time = time.monotonic() - job.started
+            JOB_RUN_SECONDS.labels(job.spec_key).observe(wall_time)
+            resources = rusage_to_dict(process.rusage, wall_time)
+            logger.info(f"Command execution completed with return code: {process.returncode}",
+                        return_code=process.returncode)
+            logger.info(f"Resource usage: {resources}", resources=resources)
+            
+            stdout_file = os.path.join(job.job_dir, STDOUT_FILE)
+            stderr_file = os.path.join(job.job_dir, STDERR_FILE)
+            half = self.output_preview_bytes // 2
+            stdout, stdout_truncated = read_head_tail(stdout_file, half, half)
+            stderr, stderr_truncated = read_head_tail(stderr_file, half, half)
+            logger.info(f"stdout: {os.path.getsize(stdout_file)} bytes written to {stdout_file}")
+            logger.info(f"stderr: {os.path.getsize(stderr_file)} bytes written to {stderr_file}")
             
             # Process output files
-            output_files = self._process_output_files(job_dir, spec)
-            log(f"Processed output files: {output_files}")
+            output_files = self._process_output_files(job.job_dir, job.spec)
+            logger.info(f"Processed output files: {output_files}")
             
             # Save results
             results = {
                 'output_files': output_files,
                 'stdout': stdout,
                 'stderr': stderr,
+                'stdout_file': stdout_file,
+                'stderr_file': stderr_file,
+                'stdout_truncated': stdout_truncated,
+                'stderr_truncated': stderr_truncated,
                 'return_code': process.returncode,
-                'log_file': log_file
+                'resources': resources,
+                'log_file': logger.path
             }
+            if job.timed_out:
+                results['timed_out'] = True
+                results['error'] = f"Job exceeded its timeout of {job.spec['execution']['timeout']} seconds"
             
-            results_file = os.path.join(job_dir, 'results.json')
-            with open(results_file, 'w') as f:
-                json.dump(results, f, indent=2)
-            log(f"Saved results to {results_file}")
-            
-            # Update job status
-            if process.returncode == 0:
-                self.job_store.update_job_status(job_id, 'completed', results)
-                log("Job completed successfully")
+            # Update job status; nothing is written for a job whose lease was
+            # lost meanwhile, since another worker may be running it in this directory
+            if job.stop_requested:
+                status = 'stopped'
+            elif process.returncode == 0 and not job.timed_out:
+                status = 'completed'
             else:
-                self.job_store.update_job_status(job_id, 'failed', results)
-                log("Job failed")
+                status = 'failed'
+            if not self.job_store.update_job_status(job.job_id, status, results, claim_id=job.claim_id):
+                self._abandon(job)
+                return
+            JOBS_FINISHED.labels(job.spec_key, status).inc()
             
-            return results
+            results_file = self._save_results(job.job_dir, results)
+            logger.info(f"Saved results to {results_file}")
+            if status == 'stopped':
+                logger.log("Job stopped", 'warning', status='stopped')
+            elif status == 'completed':
+                if job.cache_key is not None:
+                    self.result_cache.store(job.cache_key, job.job_dir, results, (STDOUT_FILE, STDERR_FILE))
+                logger.log("Job completed successfully", status='completed')
+            else:
+                logger.log("Job timed out" if job.timed_out else "Job failed", 'error', status='failed')
             
+            logger.close()
+            job.future.set_result(results)
+        except Exception as e:
+            self._fail_job(job, e)
+            return
+        self._compress_artifacts(job.job_id, results)
+    
+    def _compress_artifacts(self, job_id: str, results: Dict[str, Any]) -> None:
+        """Queue writing precompressed copies of a finished job's files for downloads.
+
+        Compression runs on a single low-priority thread of its own, so it
+        never delays starting or finishing other jobs; downloads fall back
+        to the plain files meanwhile.
+        """
+        if self.compress_artifacts:
+            self._compressor.submit(self._write_compressed_artifacts, job_id, results)
+    
+    def _write_compressed_artifacts(self, job_id: str, results: Dict[str, Any]) -> None:
+        job_dir = os.path.join(self.job_store.jobs_dir, job_id)
+        paths = list((results.get('output_files') or {}).values())
+        paths += [results[key] for key in ('stdout_file', 'stderr_file', 'log_file') if results.get(key)]
+        paths.append(os.path.join(job_dir, 'results.json'))
+        try:
+            compress_files([path for path in paths if os.path.exists(path)])
         except Exception as e:
-            log(f"Error executing job: {e}")
-            import traceback
-            log(traceback.format_exc())
-            self.job_store.update_job_status(job_id, 'failed', {'error': str(e)})
-            return None
+            print(f"Error compressing artifacts of job {job_id}: {e}")
+    
+    def _fail_job(self, job: RunningJob, error: Exception) -> None:
+        """Mark a job failed after an error in the engine itself."""
+        with self._lock:
+            self._unregister(job)
+        if not self.job_store.update_job_status(job.job_id, 'failed', {'error': str(error)}, claim_id=job.claim_id):
+            self._abandon(job)
+            return
+        try:
+            job.logger.error(f"Error executing job: {error}", traceback=traceback.format_exc())
+            job.logger.close()
+        except OSError:
+            pass
+        JOBS_FINISHED.labels(job.spec_key, 'failed').inc()
+        if not job.future.done():
+            job.future.set_result(None)
+    
+    def _unregister(self, job: RunningJob) -> None:
+        """Drop a job from running_jobs unless a later run of the same job has replaced it (call with the lock held)."""
+        if self.running_jobs.get(job.job_id) is job:
+            del self.running_jobs[job.job_id]
+    
+    def _abandon(self, job: RunningJob) -> None:
+        """Let go of a job without recording anything for it."""
+        with self._lock:
+            self._unregister(job)
+        job.logger.discard()
+        if not job.future.done():
+            job.future.set_result(None)
+    
+    def _grace_period(self, spec: Dict[str, Any]) -> float:
+        return float(spec['execution'].get('gracePeriod', DEFAULT_GRACE_PERIOD))
+    
+    def _timeout_job(self, job: RunningJob) -> None:
+        """Terminate a job that ran past its timeout (called on the supervisor loop)."""
+        if job.process.poll() is not None:
+            return
+        job.timed_out = True
+        self.supervisor.stop(job.process, self._grace_period(job.spec))
     
     def stop_job(self, job_id: str) -> bool:
-        """Stop a running job.
+        """Stop a running job without waiting for it to exit.
+        
+        The job's process group gets SIGTERM now and SIGKILL if it is still
+        running after the spec's ``gracePeriod``; the job is marked
+        ``stopped`` once it has exited.
         
         Args:
             job_id: Job identifier
             
         Returns:
-            True if job was stopped, False otherwise
+            True if the job was running, False otherwise
         """
-        if job_id in self.running_jobs:
-            process = self.running_jobs[job_id]
-            process.terminate()
-            process.wait()
-            del self.running_jobs[job_id]
-            self.job_store.update_job_status(job_id, 'stopped')
-            return True
-        return False
+        with self._lock:
+            job = self.running_jobs.get(job_id)
+            if job is None or job.stop_requested:
+                return False
+            job.stop_requested = True
+            process = job.process
+        # A job still being prepared is stopped before its process is spawned
+        if process is not None:
+            self.supervisor.stop(process, self._grace_period(job.spec))
+        return True
+    
+    def abandon_job(self, job_id: str) -> bool:
+        """Stop a job this process no longer owns, without recording its results.
+        
+        Used by queue workers for jobs whose lease has lapsed: another worker
+        may already be running the job, so its status, results and log are
+        left to that worker.
+        
+        Returns:
+            True if the job was running, False otherwise
+        """
+        with self._lock:
+            job = self.running_jobs.get(job_id)
+            if job is None or job.abandoned:
+                return False
+            job.abandoned = True
+            job.stop_requested = True
+            process = job.process
+        if process is not None:
+            self.supervisor.stop(process, self._grace_period(job.spec))
+        return True
+    
+    def is_running(self, job_id: str) -> bool:
+        """Check whether a job's process is running."""
+        with self._lock:
+            return job_id in self.running_jobs
+    
+    def shutdown(self) -> None:
+        """Stop the starter, finisher and compression threads, supervisor and warm pool."""
+        self._starters.shutdown(wait=True)
+        self._finishers.shutdown(wait=True)
+        self._compressor.shutdown(wait=True)
+        self.supervisor.shutdown()
+        if self.warm_pool is not None:
+            self.warm_pool.shutdown()
     
     def delete_job(self, job_id: str) -> bool:
         """Delete a job and stop it if running.
@@ -151,51 +480,55 @@ class JobExecutionEngine:
                 input_file = os.path.join(job_dir, f'input_{input_id}.txt')
                 
                 if input_spec['type'] == 'file':
-                    # Copy input file to job directory
-                    import shutil
-                    shutil.copy2(input_value, input_file)
+                    # Hardlink input file into job directory (copy across filesystems)
+                    if os.path.lexists(input_file):
+                        os.remove(input_file)
+                    link_or_copy(input_value, input_file)
                 else:
                     # Write input value to file
                     with open(input_file, 'w') as f:
-                        f.write(str(input_value))
+                        f.write(format_input_value(input_value))
                 
                 input_files[input_id] = input_file
         
         return input_files
     
-    def _prepare_command(self, spec: Dict[str, Any], job_dir: str) -> list:
-        """Prepare command for job execution."""
+    def _prepare_command(self, spec: Dict[str, Any], inputs: Dict[str, Any], input_files: Dict[str, str]) -> list:
+        """Prepare command for job execution.
+
+        Arguments are rendered from the spec's precompiled templates using
+        the in-memory input values; file inputs render as the path of their
+        copy in the job directory.
+        """
+        templates = spec.argument_templates if isinstance(spec, CompiledSpec) else compile_arguments(spec)
+
+        values = {}
+        for input_spec in spec['expectedInputs']:
+            input_id = input_spec['id']
+            if input_id in input_files and input_spec['type'] == 'file':
+                values[input_id] = input_files[input_id]
+            elif inputs.get(input_id) is not None:
+                values[input_id] = format_input_value(inputs[input_id]).strip()
+
         cmd = [spec['execution']['application']]
-        
-        # Process arguments with string interpolation
-        processed_args = []
-        for arg in spec['execution']['arguments']:
-            if isinstance(arg, str):
-                # Replace all ${inputs.xyz} with the actual values
-                processed_arg = arg
-                while '${inputs.' in processed_arg:
-                    start = processed_arg.find('${inputs.')
-                    end = processed_arg.find('}', start) + 1
-                    input_id = processed_arg[start + 9:end - 1]  # 9 is length of '${inputs.'
-                    input_file = os.path.join(job_dir, f'input_{input_id}.txt')
-                    if os.path.exists(input_file):
-                        with open(input_file, 'r') as f:
-                            value = f.read().strip()
-                        processed_arg = processed_arg[:start] + value + processed_arg[end:]
-                    else:
-                        processed_arg = processed_arg[:start] + processed_arg[end:]
-                processed_args.append(processed_arg)
-            else:
-                processed_args.append(arg)
-        
-        cmd.extend(processed_args)
+        cmd.extend(
+            template.render(values) if isinstance(template, ArgumentTemplate) else template
+            for template in templates
+        )
         return cmd
     
+    def _save_results(self, job_dir: str, results: Dict[str, Any]) -> str:
+        """Write results.json into the job directory and return its path."""
+        results_file = os.path.join(job_dir, 'results.json')
+        with open(results_file, 'w') as f:
+            json.dump(results, f, indent=2)
+        return results_file
+    
     def _process_output_files(self, job_dir: str, spec: Dict[str, Any]) -> Dict[str, str]:
         """Process output files from job execution."""
         output_files = {}
         
-        for output in spec['outputs']:
+        for output in spec.get('outputs', []):
             output_id = output['id']
             output_path = os.path.join(job_dir, output['path'])
             
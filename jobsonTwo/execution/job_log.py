@@ -0,0 +1,156 @@
+import json
+import time
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+
+# Name of the structured per-job log inside the job directory
+LOG_FILE = 'job.log'
+
+LEVELS = ('debug', 'info', 'warning', 'error')
+
+
+class JobLogger:
+    """Buffered JSON Lines log for a single job.
+
+    Each call to ``log`` appends one ``{"ts", "level", "msg"}`` record to an
+    in-memory buffer. The buffer is written out in one go once it reaches
+    ``max_buffer_bytes``, when ``flush_interval`` seconds have passed since
+    the last write, on ``flush=True`` (used for state changes) and on close.
+    """
+
+    def __init__(self, path: str, echo: bool = False, prefix: str = '',
+                 max_buffer_bytes: int = 64 * 1024, flush_interval: float = 1.0):
+        """Initialize the logger.
+
+        Args:
+            path: Log file, appended to if it exists
+            echo: Also print each record to the server's stdout
+            prefix: Text prepended to echoed records (e.g. the job id)
+            max_buffer_bytes: Buffered bytes that trigger a write
+            flush_interval: Maximum seconds a record waits in the buffer
+                before the next log call writes it out
+        """
+        self.path = path
+        self.echo = echo
+        self.prefix = prefix
+        self.max_buffer_bytes = max_buffer_bytes
+        self.flush_interval = flush_interval
+
+        self._buffer: List[str] = []
+        self._buffered_bytes = 0
+        self._last_flush = time.monotonic()
+
+    def log(self, message: str, level: str = 'info', flush: bool = False, **fields: Any) -> None:
+        """Add a record to the log.
+
+        Args:
+            message: Log message
+            level: One of LEVELS
+            flush: Write the buffer out immediately, e.g. on a status change
+            **fields: Extra JSON-serializable fields stored with the record
+        """
+        record = {'ts': datetime.now().isoformat(timespec='milliseconds'), 'level': level, 'msg': message}
+        record.update(fields)
+        line = json.dumps(record, default=str) + '\n'
+        self._buffer.append(line)
+        self._buffered_bytes += len(line)
+        if self.echo:
+            print(f"{self.prefix}{message}")
+
+        if (flush or self._buffered_bytes >= self.max_buffer_bytes
+                or time.monotonic() - self._last_flush >= self.flush_interval):
+            self.flush()
+
+    def info(self, message: str, **fields: Any) -> None:
+        self.log(message, 'info', **fields)
+
+    def error(self, message: str, **fields: Any) -> None:
+        self.log(message, 'error', **fields)
+
+    def flush(self) -> None:
+        """Write buffered records to the log file."""
+        if self._buffer:
+            with open(self.path, 'a') as f:
+                f.write(''.join(self._buffer))
+            self._buffer = []
+            self._buffered_bytes = 0
+        self._last_flush = time.monotonic()
+
+    def close(self) -> None:
+        self.flush()
+
+    def discard(self) -> None:
+        """Drop buffered records without writing them."""
+        self._buffer = []
+        self._buffered_bytes = 0
+
+    def __enter__(self) -> 'JobLogger':
+        return self
+
+    def __exit__(self, exc_type, exc_value, tb) -> None:
+        self.close()
+
+
+def read_log_records(path: str, offset: int = 0, limit: int = 100,
+                     max_bytes: int = 1024 * 1024) -> Tuple[List[Dict[str, Any]], int, bool]:
+    """Read up to limit log records starting at a byte offset.
+
+    Only complete lines are returned, so a record being written is picked
+    up by the next call. Lines that are not JSON (logs written before the
+    structured format) are returned as plain ``info`` records. A line longer
+    than max_bytes is returned as an ``info`` record of its first max_bytes,
+    marked ``truncated``, and the rest of it is skipped.
+
+    Args:
+        path: Log file
+        offset: Byte offset to start from (a previous call's next offset)
+        limit: Maximum number of records to return
+        max_bytes: Maximum bytes read per call
+
+    Returns:
+        Tuple of (records, next_offset, at_end)
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(max_bytes)
+            if limit > 0 and len(data) == max_bytes and b'\n' not in data:
+                return _read_long_line(f, data, offset)
+    except OSError:
+        return [], offset, True
+
+    records = []
+    pos = 0
+    while len(records) < limit:
+        end = data.find(b'\n', pos)
+        if end < 0:
+            break
+        records.append(_parse_record(data[pos:end]))
+        pos = end + 1
+
+    at_end = data.find(b'\n', pos) < 0 and len(data) < max_bytes
+    return records, offset + pos, at_end
+
+
+def _read_long_line(f, data: bytes, offset: int) -> Tuple[List[Dict[str, Any]], int, bool]:
+    """Return the start of a line longer than one read, skipping past its end."""
+    record = {'ts': None, 'level': 'info', 'msg': data.decode('utf-8', errors='replace'), 'truncated': True}
+    next_offset = offset + len(data)
+    for chunk in iter(lambda: f.read(len(data)), b''):
+        end = chunk.find(b'\n')
+        if end >= 0:
+            return [record], next_offset + end + 1, False
+        next_offset += len(chunk)
+    # The line has no end yet; whatever is appended to it later comes back as its own record
+    return [record], next_offset, True
+
+
+def _parse_record(line: bytes) -> Dict[str, Any]:
+    text = line.decode('utf-8', errors='replace')
+    try:
+        record = json.loads(text)
+        if isinstance(record, dict):
+            return record
+    except ValueError:
+        pass
+    return {'ts': None, 'level': 'info', 'msg': text}
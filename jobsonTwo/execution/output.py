@@ -0,0 +1,61 @@
+import os
+from typing import Tuple
+
+TRUNCATION_MARKER = "\n... [{skipped} bytes truncated] ...\n"
+
+
+def read_head_tail(path: str, head_bytes: int, tail_bytes: int) -> Tuple[str, bool]:
+    """Read at most the first head_bytes and last tail_bytes of a file.
+
+    Args:
+        path: File to read
+        head_bytes: Number of bytes to keep from the start
+        tail_bytes: Number of bytes to keep from the end
+
+    Returns:
+        Tuple of (text, truncated); text is empty if the file does not exist
+    """
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return '', False
+
+    with open(path, 'rb') as f:
+        if size <= head_bytes + tail_bytes:
+            return f.read().decode('utf-8', errors='replace'), False
+        head = f.read(head_bytes)
+        f.seek(size - tail_bytes)
+        tail = f.read(tail_bytes)
+
+    skipped = size - head_bytes - tail_bytes
+    text = (
+        head.decode('utf-8', errors='replace')
+        + TRUNCATION_MARKER.format(skipped=skipped)
+        + tail.decode('utf-8', errors='replace')
+    )
+    return text, True
+
+
+def read_new_lines(path: str, offset: int, max_bytes: int = 64 * 1024, final: bool = False) -> Tuple[str, int]:
+    """Read complete lines appended to a file since offset.
+
+    A trailing partial line is left for the next call unless final is set.
+
+    Returns:
+        Tuple of (text, new_offset)
+    """
+    try:
+        with open(path, 'rb') as f:
+            f.seek(offset)
+            data = f.read(max_bytes)
+    except OSError:
+        return '', offset
+
+    if not final:
+        end = data.rfind(b'\n')
+        if end >= 0:
+            data = data[:end + 1]
+        elif len(data) < max_bytes:
+            # Wait for the rest of the line unless it is longer than a chunk
+            data = b''
+    return data.decode('utf-8', errors='replace'), offset + len(data)
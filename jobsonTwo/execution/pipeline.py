@@ -0,0 +1,265 @@
+import os
+import threading
+from typing import Dict, Any, Optional, List
+from jobsonTwo.storage.job_store import JobStore, TERMINAL_STATUSES
+from jobsonTwo.specs.pipeline import parse_reference, step_dependencies, topological_order
+from jobsonTwo.specs.inputs import validate_inputs
+
+# Largest output file passed by value to a step input that is not a file
+MAX_VALUE_BYTES = 1024 * 1024
+
+
+class PipelineRunner:
+    """Runs pipelines: DAGs of job specs wired output to input.
+
+    Every step of a run becomes an ordinary job, created up front as
+    ``pending`` and handed to the scheduler once all the steps it depends on
+    have completed, so independent branches run in parallel. An output feeds
+    a file input by path: the engine hardlinks it into the next job's
+    directory, so no artifact is copied, and makes it read-only, so the
+    next job cannot change the upstream job's output in place. Other inputs
+    receive the output file's text.
+
+    A step whose upstream step failed or was stopped is marked ``stopped``;
+    the run fails once every step has finished. Re-running a failed run
+    keeps completed steps whose outputs are still on disk and runs the rest.
+
+    Runs are advanced when the scheduler reports a finished job and on a
+    ``poll_interval`` timer, which also picks up jobs finished by worker
+    processes. After a restart the timer only resumes a run's ``pending``
+    steps; a step that was running is failed by the scheduler's recovery
+    (or retried by the job queue in worker mode), and a run failed that way
+    can be re-run.
+    """
+
+    def __init__(self, job_store: JobStore, scheduler, spec_registry, poll_interval: float = 1.0):
+        """Initialize the pipeline runner.
+
+        Args:
+            job_store: Store holding runs and step jobs
+            scheduler: JobScheduler or JobQueue that runs the step jobs
+            spec_registry: Registry resolving step specs by id
+            poll_interval: Seconds between checks of unfinished runs
+        """
+        self.job_store = job_store
+        self.scheduler = scheduler
+        self.spec_registry = spec_registry
+        self.poll_interval = poll_interval
+
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Jobs run by worker processes finish elsewhere and are only seen by polling
+        if hasattr(scheduler, 'add_listener'):
+            scheduler.add_listener(lambda job_id: self._wakeup.set())
+
+    def start(self) -> None:
+        """Start advancing runs in a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='jobson-pipelines', daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """Stop the background thread."""
+        self._stop.set()
+        self._wakeup.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            self._wakeup.wait(self.poll_interval)
+            self._wakeup.clear()
+            try:
+                for run in self.job_store.list_active_pipeline_runs():
+                    self.advance(run['id'])
+            except Exception as e:
+                print(f"Error advancing pipeline runs: {e}")
+
+    def resolve_specs(self, pipeline: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Look up each step's job spec and check the step's wiring against it.
+
+        Returns:
+            Job spec of each step, keyed by step id
+
+        Raises:
+            ValueError: If a spec, input or output a step refers to does not exist
+        """
+        specs = {}
+        for step in pipeline['steps']:
+            spec = self.spec_registry.get(step['spec'])
+            if spec is None:
+                raise ValueError(f"Step {step['id']} uses unknown job spec: {step['spec']}")
+            unknown = set(step.get('inputs', {})) - {input_spec['id'] for input_spec in spec['expectedInputs']}
+            if unknown:
+                raise ValueError(f"Step {step['id']} sets unknown inputs: {sorted(unknown)}")
+            specs[step['id']] = spec
+
+        for step in pipeline['steps']:
+            for input_id, value in step.get('inputs', {}).items():
+                ref = parse_reference(value)
+                if ref is None or ref[0] != 'step':
+                    continue
+                outputs = {output['id'] for output in specs[ref[1]].get('outputs', [])}
+                if ref[2] not in outputs:
+                    raise ValueError(f"Step {step['id']} input {input_id} references unknown output "
+                                     f"{ref[2]} of step {ref[1]}")
+        return specs
+
+    def create_run(self, pipeline: Dict[str, Any], inputs: Dict[str, Any], name: str) -> str:
+        """Create a run of a pipeline and queue the steps that can start right away.
+
+        Args:
+            pipeline: Pipeline definition
+            inputs: Pipeline input values (file inputs as stored paths)
+            name: Display name of the run
+
+        Returns:
+            The new run identifier
+        """
+        specs = self.resolve_specs(pipeline)
+        run_id, _ = self.job_store.create_pipeline_run(pipeline, specs, inputs, name, [
+            {
+                'step_id': step['id'],
+                'inputs': dict(step.get('inputs', {})),
+                'name': f"{name} / {step['id']}",
+                'description': step.get('description', ''),
+            }
+            for step in pipeline['steps']
+        ])
+        self.advance(run_id)
+        return run_id
+
+    def rerun(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Run the unfinished steps of a failed run again.
+
+        Completed steps are kept if their outputs still exist and every step
+        they depend on is kept too; the others get new jobs.
+
+        Returns:
+            The run, or None if it does not exist
+
+        Raises:
+            ValueError: If the run is still in progress
+        """
+        with self._lock:
+            run = self.job_store.get_pipeline_run(run_id)
+            if run is None:
+                return None
+            if run['status'] == 'running':
+                raise ValueError("Pipeline run is still in progress")
+
+            pipeline = run['definition']
+            dependencies = step_dependencies(pipeline)
+            jobs = self.job_store.get_jobs(list(run['steps'].values()))
+            kept = set()
+            for step_id in topological_order(pipeline):
+                job = jobs.get(run['steps'][step_id])
+                if (job is not None and job['status'] == 'completed' and self._outputs_available(job)
+                        and all(dep in kept for dep in dependencies[step_id])):
+                    kept.add(step_id)
+
+            steps = []
+            for step in pipeline['steps']:
+                if step['id'] in kept:
+                    continue
+                job = jobs.get(run['steps'][step['id']])
+                steps.append({
+                    'step_id': step['id'],
+                    'inputs': dict(step.get('inputs', {})),
+                    'name': job['name'] if job else f"{run['name']} / {step['id']}",
+                    'description': step.get('description', ''),
+                })
+            if not steps:
+                return run
+
+            self.job_store.restart_pipeline_run(run_id, steps)
+            run = self.job_store.get_pipeline_run(run_id)
+            self._advance(run)
+            return run
+
+    def advance(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Queue the steps of a run whose dependencies have completed.
+
+        Returns:
+            The run, or None if it does not exist
+        """
+        with self._lock:
+            run = self.job_store.get_pipeline_run(run_id)
+            if run is not None and run['status'] == 'running':
+                self._advance(run)
+            return run
+
+    def _advance(self, run: Dict[str, Any]) -> None:
+        pipeline = run['definition']
+        steps = {step['id']: step for step in pipeline['steps']}
+        dependencies = step_dependencies(pipeline)
+        jobs = self.job_store.get_jobs(list(run['steps'].values()))
+        # A step whose job has been deleted counts as stopped
+        statuses = {
+            step_id: jobs[job_id]['status'] if job_id in jobs else 'stopped'
+            for step_id, job_id in run['steps'].items()
+        }
+
+        ready = []
+        for step_id in topological_order(pipeline):
+            if statuses[step_id] != 'pending':
+                continue
+            job_id = run['steps'][step_id]
+            blocked = [dep for dep in dependencies[step_id] if statuses[dep] in ('failed', 'stopped')]
+            if blocked:
+                self.job_store.update_job_status(job_id, 'stopped', {'error': f"Upstream step {blocked[0]} did not complete"})
+                statuses[step_id] = 'stopped'
+                continue
+            if not all(statuses[dep] == 'completed' for dep in dependencies[step_id]):
+                continue
+
+            try:
+                inputs = validate_inputs(run['specs'][step_id], self._resolve_inputs(run, steps[step_id], jobs))
+            except (ValueError, OSError) as e:
+                self.job_store.update_job_status(job_id, 'failed', {'error': str(e)})
+                statuses[step_id] = 'failed'
+                continue
+            if self.job_store.queue_pending_job(job_id, inputs, getattr(self.scheduler, 'owner', None)):
+                ready.append((job_id, run['specs'][step_id], inputs))
+            statuses[step_id] = 'queued'
+
+        if ready:
+            self.scheduler.submit_many(ready)
+
+        if all(status in TERMINAL_STATUSES for status in statuses.values()):
+            run['status'] = 'completed' if all(status == 'completed' for status in statuses.values()) else 'failed'
+            self.job_store.finish_pipeline_run(run['id'], run['status'])
+
+    def _resolve_inputs(self, run: Dict[str, Any], step: Dict[str, Any], jobs: Dict[str, Dict[str, Any]]) -> Dict[str, Any]:
+        """Replace a step's references with pipeline inputs and upstream output files."""
+        input_types = {input_spec['id']: input_spec['type'] for input_spec in run['specs'][step['id']]['expectedInputs']}
+        inputs = {}
+        for input_id, value in step.get('inputs', {}).items():
+            ref = parse_reference(value)
+            if ref is None:
+                inputs[input_id] = value
+            elif ref[0] == 'input':
+                inputs[input_id] = run['inputs'].get(ref[1])
+            else:
+                upstream = jobs[run['steps'][ref[1]]]
+                path = ((upstream.get('results') or {}).get('output_files') or {}).get(ref[2])
+                if path is None or not os.path.exists(path):
+                    raise ValueError(f"Step {ref[1]} produced no output {ref[2]}")
+                if input_types.get(input_id) == 'file':
+                    inputs[input_id] = path
+                else:
+                    if os.path.getsize(path) > MAX_VALUE_BYTES:
+                        raise ValueError(f"Output {ref[2]} of step {ref[1]} is too large for input {input_id}")
+                    with open(path, 'r', errors='replace') as f:
+                        inputs[input_id] = f.read().strip()
+        return inputs
+
+    def _outputs_available(self, job: Dict[str, Any]) -> bool:
+        output_files = (job.get('results') or {}).get('output_files') or {}
+        return all(os.path.exists(path) for path in output_files.values())
@@ -0,0 +1,131 @@
+import os
+import resource
+import sys
+import threading
+import time
+from typing import Dict, Any, Optional, Tuple
+
+# ru_inblock/ru_oublock count 512-byte blocks
+BLOCK_SIZE = 512
+
+# ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+MAXRSS_UNIT = 1 if sys.platform == 'darwin' else 1024
+
+
+def rusage_to_dict(rusage: Optional[resource.struct_rusage], wall_time: float) -> Dict[str, Any]:
+    """Convert a child's rusage into the resource summary stored in job results.
+
+    CPU, peak RSS and I/O cover the job process and every descendant it
+    waited for. I/O counts storage-level reads and writes, so data served
+    from the page cache is not included.
+    """
+    usage = {'wall_time': round(wall_time, 6)}
+    if rusage is not None:
+        usage.update({
+            'user_cpu': round(rusage.ru_utime, 6),
+            'sys_cpu': round(rusage.ru_stime, 6),
+            'peak_rss_bytes': rusage.ru_maxrss * MAXRSS_UNIT,
+            'read_bytes': rusage.ru_inblock * BLOCK_SIZE,
+            'write_bytes': rusage.ru_oublock * BLOCK_SIZE,
+        })
+    return usage
+
+
+def exit_code(status: int) -> int:
+    """Convert a wait status into a Popen-style return code."""
+    if os.WIFSIGNALED(status):
+        return -os.WTERMSIG(status)
+    return os.WEXITSTATUS(status)
+
+
+def read_available_memory() -> Optional[int]:
+    """Return MemAvailable from /proc/meminfo in bytes, if available."""
+    try:
+        with open('/proc/meminfo', 'r') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def spec_resource_hints(spec: Dict[str, Any]) -> Tuple[int, float]:
+    """Return the (memory bytes, cores) a spec expects to use; specs without hints use (0, 0)."""
+    hints = spec.get('resources') or {}
+    memory = int(float(hints.get('memoryMb', 0)) * 1024 * 1024)
+    cores = float(hints.get('cores', 0))
+    return memory, cores
+
+
+class ResourceBudget:
+    """Host memory and core budget used to admit jobs.
+
+    A job is admitted only if its ``resources`` hints fit in what is left of
+    the budget after the hints of running jobs, and its memory hint fits in
+    the memory the host currently reports as available. A job larger than
+    the whole budget is still admitted when nothing else is running.
+    """
+
+    def __init__(self, memory_bytes: Optional[int] = None, cores: Optional[float] = None,
+                 check_available: bool = True, meminfo_interval: float = 1.0):
+        """Initialize the budget.
+
+        Args:
+            memory_bytes: Memory budget (defaults to MemAvailable at startup)
+            cores: Core budget (defaults to the CPU count)
+            check_available: Also require the memory hint to fit in current MemAvailable
+            meminfo_interval: Minimum seconds between /proc/meminfo reads
+        """
+        if memory_bytes is None:
+            memory_bytes = read_available_memory()
+        self.memory_bytes = memory_bytes
+        self.cores = cores or float(os.cpu_count() or 1)
+        self.check_available = check_available
+        self.meminfo_interval = meminfo_interval
+
+        self.reserved_memory = 0
+        self.reserved_cores = 0.0
+        self.active = 0
+        self._available: Optional[int] = None
+        self._available_at = 0.0
+        self._lock = threading.Lock()
+
+    def fits(self, spec: Dict[str, Any]) -> bool:
+        """Check whether a job for spec can start now."""
+        memory, cores = spec_resource_hints(spec)
+        with self._lock:
+            if self.active == 0:
+                return True
+            if self.reserved_cores + cores > self.cores:
+                return False
+            if self.memory_bytes is not None and self.reserved_memory + memory > self.memory_bytes:
+                return False
+        if memory and self.check_available:
+            available = self._current_available()
+            if available is not None and memory > available:
+                return False
+        return True
+
+    def acquire(self, spec: Dict[str, Any]) -> None:
+        """Reserve a spec's hints for a starting job."""
+        memory, cores = spec_resource_hints(spec)
+        with self._lock:
+            self.reserved_memory += memory
+            self.reserved_cores += cores
+            self.active += 1
+
+    def release(self, spec: Dict[str, Any]) -> None:
+        """Return a finished job's hints to the budget."""
+        memory, cores = spec_resource_hints(spec)
+        with self._lock:
+            self.reserved_memory -= memory
+            self.reserved_cores -= cores
+            self.active -= 1
+
+    def _current_available(self) -> Optional[int]:
+        now = time.monotonic()
+        if now - self._available_at >= self.meminfo_interval:
+            self._available = read_available_memory()
+            self._available_at = now
+        return self._available
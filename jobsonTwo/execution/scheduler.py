@@ -0,0 +1,329 @@
+import heapq
+import itertools
+import os
+import socket
+import threading
+import time
+import traceback
+import uuid
+from collections import defaultdict
+from typing import Dict, Any, Optional, List, Tuple, Callable
+from .resources import ResourceBudget
+from ..metrics import JOBS_FINISHED, QUEUE_WAIT_SECONDS
+
+
+class QueuedJob:
+    """A job waiting in the scheduler queue."""
+
+    __slots__ = ('job_id', 'spec', 'inputs', 'priority', 'seq', 'cancelled', 'enqueued_at')
+
+    def __init__(self, job_id: str, spec: Dict[str, Any], inputs: Dict[str, Any], priority: int, seq: int):
+        self.job_id = job_id
+        self.spec = spec
+        self.inputs = inputs
+        self.priority = priority
+        self.seq = seq
+        self.cancelled = False
+        self.enqueued_at = time.monotonic()
+
+    def __lt__(self, other: 'QueuedJob') -> bool:
+        # Higher priority first, then first-in first-out
+        return (-self.priority, self.seq) < (-other.priority, other.seq)
+
+
+def process_owner() -> str:
+    """Return an owner name unique to this process: host, pid and a random suffix."""
+    return f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+
+def owner_alive(owner: Optional[str], current: str) -> bool:
+    """Check whether the process an owner name belongs to may still be running.
+
+    Processes on other hosts cannot be checked and count as alive. A name
+    with this process's pid but not its suffix belonged to an earlier
+    process that had the same pid.
+    """
+    if owner is None:
+        return False
+    if owner == current:
+        return True
+    try:
+        host, pid, _ = owner.rsplit(':', 2)
+        pid = int(pid)
+    except ValueError:
+        return False
+    if host != socket.gethostname():
+        return True
+    if pid == os.getpid():
+        return False
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+class JobScheduler:
+    """Bounded, prioritized queue in front of the execution engine.
+
+    Jobs are queued on submission and started by a single dispatcher thread.
+    A job only starts while fewer than ``max_workers`` jobs are running and
+    its spec is below its concurrency cap; otherwise it stays ``queued``.
+    Running jobs do not hold a thread: the engine prepares and starts each
+    one on its own starter threads, so the dispatcher never waits on a slow
+    spec, and reports each one's completion, which frees its slot.
+    """
+
+    # Seconds between admission retries while jobs wait for memory to free up
+    RESOURCE_RECHECK_INTERVAL = 1.0
+
+    def __init__(self, engine, max_workers: Optional[int] = None, spec_limits: Optional[Dict[str, int]] = None,
+                 budget: Optional[ResourceBudget] = None):
+        """Initialize the scheduler.
+
+        Args:
+            engine: JobExecutionEngine used to run jobs
+            max_workers: Number of jobs allowed to run at once (defaults to CPU count)
+            spec_limits: Per-spec concurrency caps keyed by spec id, overriding
+                ``execution.maxConcurrency`` from the spec itself
+            budget: Optional host budget checked against each spec's
+                ``resources`` hints before a job is admitted
+        """
+        self.engine = engine
+        self.owner = process_owner()
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.spec_limits = dict(spec_limits or {})
+        self.budget = budget
+
+        self._heaps: Dict[str, List[QueuedJob]] = defaultdict(list)
+        self._queued: Dict[str, QueuedJob] = {}
+        self._running: Dict[str, str] = {}
+        self._running_by_spec: Dict[str, int] = defaultdict(int)
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._shutdown = False
+        self._budget_blocked = False
+        self._listeners: List[Callable[[str], None]] = []
+
+    def start(self) -> None:
+        """Start the dispatcher thread if it is not running yet."""
+        with self._cond:
+            if self._dispatcher is not None:
+                return
+            self._shutdown = False
+            self._dispatcher = threading.Thread(target=self._dispatch, name='jobson-dispatcher', daemon=True)
+            self._dispatcher.start()
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop starting queued jobs, optionally waiting for running ones to finish."""
+        with self._cond:
+            self._shutdown = True
+            self._cond.notify_all()
+            dispatcher = self._dispatcher
+            self._dispatcher = None
+        if wait:
+            if dispatcher is not None:
+                dispatcher.join()
+            with self._cond:
+                while self._running:
+                    self._cond.wait()
+
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        """Call callback with the job id whenever a job finishes or is cancelled."""
+        self._listeners.append(callback)
+
+    def _notify(self, job_id: str) -> None:
+        for callback in self._listeners:
+            try:
+                callback(job_id)
+            except Exception as e:
+                print(f"Error in scheduler listener for job {job_id}: {e}")
+
+    def submit(self, job_id: str, spec: Dict[str, Any], inputs: Dict[str, Any], priority: Optional[int] = None) -> None:
+        """Queue a job for execution.
+
+        Args:
+            job_id: Job identifier
+            spec: Job specification
+            inputs: Job input values
+            priority: Higher values run first (defaults to the spec's ``priority``)
+        """
+        if priority is None:
+            priority = int(spec.get('priority', 0))
+
+        self.start()
+        self.engine.job_store.update_job_status(job_id, 'queued', owner=self.owner)
+
+        with self._cond:
+            entry = QueuedJob(job_id, spec, inputs, priority, next(self._seq))
+            heapq.heappush(self._heaps[self._spec_key(spec)], entry)
+            self._queued[job_id] = entry
+            self._cond.notify()
+
+    def submit_many(self, jobs: List[Tuple[str, Dict[str, Any], Dict[str, Any]]], priority: Optional[int] = None) -> None:
+        """Queue many jobs at once.
+
+        Args:
+            jobs: List of (job_id, spec, inputs) tuples
+            priority: Higher values run first (defaults to each spec's ``priority``)
+        """
+        if not jobs:
+            return
+
+        self.start()
+        self.engine.job_store.update_jobs_status([job_id for job_id, _, _ in jobs], 'queued', owner=self.owner)
+
+        with self._cond:
+            for job_id, spec, inputs in jobs:
+                job_priority = int(spec.get('priority', 0)) if priority is None else priority
+                entry = QueuedJob(job_id, spec, inputs, job_priority, next(self._seq))
+                heapq.heappush(self._heaps[self._spec_key(spec)], entry)
+                self._queued[job_id] = entry
+            self._cond.notify_all()
+
+    def recover(self) -> None:
+        """Pick up jobs left behind by processes that exited without finishing them.
+
+        Every job this scheduler queues records it as its owner, so jobs of
+        other processes sharing the job store (such as sibling WSGI
+        workers) are left alone while those processes are alive. Jobs of a
+        dead owner that were still ``queued`` never started and are queued
+        here again. Jobs left ``running`` may have half-written outputs, so
+        they are failed rather than run a second time.
+        """
+        job_store = self.engine.job_store
+        for owner in job_store.list_unfinished_owners():
+            if owner_alive(owner, self.owner):
+                continue
+            for job_id in job_store.fail_owned_jobs(owner, "Job was interrupted by a server restart"):
+                self._notify(job_id)
+            adopted = job_store.adopt_queued_jobs(owner, self.owner)
+            self.submit_many([(job['id'], job['spec'], job['inputs']) for job in adopted])
+
+    def cancel(self, job_id: str) -> bool:
+        """Remove a queued job before it starts.
+
+        Returns:
+            True if the job was still queued, False otherwise
+        """
+        with self._cond:
+            entry = self._queued.pop(job_id, None)
+            if entry is None:
+                return False
+            entry.cancelled = True
+        self.engine.job_store.update_job_status(job_id, 'stopped')
+        JOBS_FINISHED.labels(self._spec_key(entry.spec), 'stopped').inc()
+        self._notify(job_id)
+        return True
+
+    def stop(self, job_id: str) -> Optional[str]:
+        """Stop a job whether it is queued or running.
+
+        Returns:
+            'stopped' if it was still queued, 'stopping' if its process was
+            signalled, None if it is neither queued nor running here
+        """
+        if self.cancel(job_id):
+            return 'stopped'
+        if self.engine.stop_job(job_id):
+            return 'stopping'
+        return None
+
+    def is_queued(self, job_id: str) -> bool:
+        """Check whether a job is waiting in the queue."""
+        with self._cond:
+            return job_id in self._queued
+
+    def stats(self) -> Dict[str, Any]:
+        """Return a snapshot of queue depth and running jobs per spec."""
+        with self._cond:
+            return {
+                'max_workers': self.max_workers,
+                'queued': len(self._queued),
+                'running': len(self._running),
+                'running_by_spec': {k: v for k, v in self._running_by_spec.items() if v},
+                'reserved_memory': self.budget.reserved_memory if self.budget else None,
+                'reserved_cores': self.budget.reserved_cores if self.budget else None,
+            }
+
+    def _spec_key(self, spec: Dict[str, Any]) -> str:
+        return spec.get('id') or spec.get('name', '')
+
+    def _spec_limit(self, spec: Dict[str, Any]) -> Optional[int]:
+        key = self._spec_key(spec)
+        if key in self.spec_limits:
+            return self.spec_limits[key]
+        return spec.get('execution', {}).get('maxConcurrency')
+
+    def _next_job(self) -> Optional[QueuedJob]:
+        """Pop the highest-priority job among specs with spare capacity.
+
+        Must be called with the condition held. Records whether a job that
+        could otherwise start was held back by the resource budget.
+        """
+        self._budget_blocked = False
+        if len(self._running) >= self.max_workers:
+            return None
+
+        # Queued jobs are kept in one heap per spec, so capped specs are
+        # skipped as a whole instead of entry by entry
+        best = None
+        for spec_key, heap in self._heaps.items():
+            while heap and heap[0].cancelled:
+                heapq.heappop(heap)
+            if not heap:
+                continue
+            limit = self._spec_limit(heap[0].spec)
+            if limit is not None and self._running_by_spec[spec_key] >= limit:
+                continue
+            if self.budget is not None and not self.budget.fits(heap[0].spec):
+                self._budget_blocked = True
+                continue
+            if best is None or heap[0] < best[0]:
+                best = heap
+        return heapq.heappop(best) if best is not None else None
+
+    def _dispatch(self) -> None:
+        while True:
+            with self._cond:
+                entry = self._next_job()
+                while entry is None:
+                    if self._shutdown:
+                        return
+                    # Jobs held back by the resource budget are retried periodically,
+                    # since host memory can free up without a job finishing here;
+                    # anything else only changes when a job is queued or finishes
+                    self._cond.wait(self.RESOURCE_RECHECK_INTERVAL if self._budget_blocked else None)
+                    entry = self._next_job()
+                del self._queued[entry.job_id]
+                if self.budget is not None:
+                    self.budget.acquire(entry.spec)
+                spec_key = self._spec_key(entry.spec)
+                self._running[entry.job_id] = spec_key
+                self._running_by_spec[spec_key] += 1
+            QUEUE_WAIT_SECONDS.labels(spec_key).observe(time.monotonic() - entry.enqueued_at)
+
+            try:
+                future = self.engine.start_job(entry.job_id, entry.spec, entry.inputs)
+            except Exception as e:
+                print(f"Error executing job {entry.job_id}: {e}")
+                print(traceback.format_exc())
+                self.engine.job_store.update_job_status(entry.job_id, 'failed', {'error': str(e)})
+                JOBS_FINISHED.labels(spec_key, 'failed').inc()
+                self._release(entry)
+            else:
+                future.add_done_callback(lambda _, entry=entry: self._release(entry))
+
+    def _release(self, entry: QueuedJob) -> None:
+        """Free a finished job's slot and budget."""
+        spec_key = self._spec_key(entry.spec)
+        with self._cond:
+            if self.budget is not None:
+                self.budget.release(entry.spec)
+            del self._running[entry.job_id]
+            self._running_by_spec[spec_key] -= 1
+            self._cond.notify_all()
+        self._notify(entry.job_id)
@@ -0,0 +1,212 @@
+import asyncio
+import os
+import signal
+import subprocess
+import threading
+from typing import Callable, Dict, List, Optional
+from .resources import exit_code
+
+# Seconds between exit checks for processes that can't be watched through a pidfd
+POLL_INTERVAL = 0.05
+
+
+class SupervisedProcess:
+    """Popen-like handle for a job process watched by a ProcessSupervisor.
+
+    The process leads its own process group, so signals reach everything it
+    started. Its exit status and resource usage are collected by the
+    supervisor's event loop rather than by a thread blocked in ``wait``.
+    """
+
+    def __init__(self, popen: subprocess.Popen):
+        # Keep the Popen object alive so it never reaps the child on its own
+        self._popen = popen
+        self.pid = popen.pid
+        self.returncode: Optional[int] = None
+        self.rusage = None
+        self._finished = threading.Event()
+        self._callbacks: List[Callable[['SupervisedProcess'], None]] = []
+        self._callbacks_lock = threading.Lock()
+
+    def poll(self) -> Optional[int]:
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        if not self._finished.wait(timeout):
+            raise subprocess.TimeoutExpired(self._popen.args, timeout)
+        return self.returncode
+
+    def add_done_callback(self, callback: Callable[['SupervisedProcess'], None]) -> None:
+        """Call callback with this handle once the process exits (immediately if it has)."""
+        with self._callbacks_lock:
+            if not self._finished.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def send_signal(self, sig: int) -> None:
+        if self.returncode is None:
+            try:
+                os.killpg(self.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self) -> None:
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        """SIGKILL the whole process group, even if its leader has already exited."""
+        try:
+            os.killpg(self.pid, signal.SIGKILL)
+        except ProcessLookupError:
+            pass
+
+    def _reap(self) -> bool:
+        """Collect the exit status if the process has exited."""
+        try:
+            pid, status, rusage = os.wait4(self.pid, os.WNOHANG)
+        except ChildProcessError:
+            # Reaped elsewhere, so the exit status is lost
+            pid, status, rusage = self.pid, None, None
+        if pid == 0:
+            return False
+
+        self.returncode = exit_code(status) if status is not None else -1
+        self.rusage = rusage
+        self._popen.returncode = self.returncode
+        with self._callbacks_lock:
+            self._finished.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            try:
+                callback(self)
+            except Exception as e:
+                print(f"Error in exit callback for process {self.pid}: {e}")
+        return True
+
+
+class ProcessSupervisor:
+    """Watches job processes and their deadlines from one asyncio event loop.
+
+    Exits are noticed through a pidfd per process (or periodic non-blocking
+    polls where pidfds are unavailable), and timeouts are loop timers, so
+    supervising thousands of running jobs needs no thread per job.
+    """
+
+    def __init__(self):
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._polled: Dict[int, SupervisedProcess] = {}
+
+    def start(self) -> None:
+        """Start the event loop thread if it is not running yet."""
+        with self._lock:
+            if self._thread is not None:
+                return
+            self._loop = asyncio.new_event_loop()
+            ready = threading.Event()
+            self._thread = threading.Thread(
+                target=self._run_loop, args=(ready,), name='jobson-supervisor', daemon=True
+            )
+            self._thread.start()
+            ready.wait()
+
+    def shutdown(self) -> None:
+        """Stop the event loop; processes still running are left alone."""
+        with self._lock:
+            if self._thread is None:
+                return
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+            self._thread = None
+            self._loop = None
+
+    def _run_loop(self, ready: threading.Event) -> None:
+        asyncio.set_event_loop(self._loop)
+        self._loop.call_soon(ready.set)
+        self._loop.run_forever()
+
+    def spawn(self, cmd: List[str], cwd: str, env: Dict[str, str], stdout_path: str, stderr_path: str) -> SupervisedProcess:
+        """Start a process in its own session with output redirected to files.
+
+        Args:
+            cmd: Command and arguments
+            cwd: Working directory
+            env: Environment
+            stdout_path: File receiving stdout
+            stderr_path: File receiving stderr
+
+        Returns:
+            Handle that reports the exit once the loop sees it
+        """
+        self.start()
+        with open(stdout_path, 'wb') as stdout_fh, open(stderr_path, 'wb') as stderr_fh:
+            popen = subprocess.Popen(
+                cmd,
+                cwd=cwd,
+                stdout=stdout_fh,
+                stderr=stderr_fh,
+                env=env,
+                start_new_session=True
+            )
+        process = SupervisedProcess(popen)
+        self._loop.call_soon_threadsafe(self._watch, process)
+        return process
+
+    def call_later(self, delay: float, callback: Callable, *args) -> Callable[[], None]:
+        """Run callback on the loop after delay seconds.
+
+        Returns:
+            Function that cancels the call if it has not run yet
+        """
+        self.start()
+        handles = []
+        cancelled = threading.Event()
+
+        def schedule():
+            if not cancelled.is_set():
+                handles.append(self._loop.call_later(delay, callback, *args))
+
+        def cancel():
+            cancelled.set()
+            loop = self._loop
+            if loop is not None and not loop.is_closed():
+                loop.call_soon_threadsafe(lambda: [handle.cancel() for handle in handles])
+
+        self._loop.call_soon_threadsafe(schedule)
+        return cancel
+
+    def stop(self, process, grace_period: float) -> None:
+        """Send SIGTERM to a process group now and SIGKILL to it after grace_period.
+
+        The SIGKILL is sent even if the group leader exited on SIGTERM, so
+        children that ignore SIGTERM do not outlive the job. Returns
+        immediately. Works for any handle with ``terminate`` and a
+        group-wide ``kill``.
+        """
+        process.terminate()
+        self.call_later(grace_period, process.kill)
+
+    def _watch(self, process: SupervisedProcess) -> None:
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except (AttributeError, OSError):
+            if not self._polled:
+                self._loop.call_later(POLL_INTERVAL, self._poll)
+            self._polled[process.pid] = process
+            return
+
+        def on_readable():
+            self._loop.remove_reader(pidfd)
+            os.close(pidfd)
+            process._reap()
+        self._loop.add_reader(pidfd, on_readable)
+
+    def _poll(self) -> None:
+        for pid, process in list(self._polled.items()):
+            if process._reap():
+                del self._polled[pid]
+        if self._polled:
+            self._loop.call_later(POLL_INTERVAL, self._poll)
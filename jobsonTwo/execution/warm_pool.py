@@ -0,0 +1,337 @@
+import os
+import json
+import signal
+import subprocess
+import threading
+import itertools
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Source of the zygote interpreter. It imports the preload modules given on
+# its command line, then forks one child per request read from stdin. Each
+# child gets its own session, working directory, environment and output
+# files before running the job script as __main__. The zygote reports
+# child pids and exit codes as JSON lines on a private copy of stdout;
+# fd 1 itself is pointed at stderr first, so anything preloads print
+# cannot be mixed into the replies.
+ZYGOTE_SOURCE = r'''
+import os, sys, json, signal, select, importlib, traceback
+
+replies = os.fdopen(os.dup(1), 'w', buffering=1)
+os.dup2(2, 1)
+
+for name in sys.argv[1:]:
+    try:
+        importlib.import_module(name)
+    except Exception as e:
+        print(f"warm pool: could not preload {name}: {e}", file=sys.stderr)
+
+wakeup_r, wakeup_w = os.pipe()
+os.set_blocking(wakeup_w, False)
+signal.signal(signal.SIGCHLD, lambda signum, frame: None)
+signal.set_wakeup_fd(wakeup_w)
+requests_in = os.fdopen(0, 'rb', buffering=0)
+buffer = b''
+
+
+def reply(message):
+    replies.write(json.dumps(message) + '\n')
+
+
+def run_child(request):
+    signal.set_wakeup_fd(-1)
+    signal.signal(signal.SIGCHLD, signal.SIG_DFL)
+    os.setsid()
+    devnull = os.open(os.devnull, os.O_RDONLY)
+    stdout = os.open(request['stdout'], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    stderr = os.open(request['stderr'], os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    os.dup2(devnull, 0)
+    os.dup2(stdout, 1)
+    os.dup2(stderr, 2)
+    for fd in (devnull, stdout, stderr, wakeup_r, wakeup_w, replies.fileno()):
+        os.close(fd)
+    sys.stdin = open(0, 'r', closefd=False)
+    sys.stdout = open(1, 'w', closefd=False)
+    sys.stderr = open(2, 'w', closefd=False)
+    os.chdir(request['cwd'])
+    os.environ.clear()
+    os.environ.update(request['env'])
+    sys.argv = ['-c'] + request['argv']
+
+    code = 0
+    try:
+        exec(compile(request['script'], '<string>', 'exec'), {'__name__': '__main__', '__builtins__': __builtins__})
+    except SystemExit as e:
+        if e.code is None:
+            code = 0
+        elif isinstance(e.code, int):
+            code = e.code
+        else:
+            print(e.code, file=sys.stderr)
+            code = 1
+    except BaseException:
+        traceback.print_exc()
+        code = 1
+    try:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    finally:
+        os._exit(code)
+
+
+def reap():
+    while True:
+        try:
+            pid, status, rusage = os.wait4(-1, os.WNOHANG)
+        except ChildProcessError:
+            return
+        if pid == 0:
+            return
+        code = -os.WTERMSIG(status) if os.WIFSIGNALED(status) else os.WEXITSTATUS(status)
+        reply({
+            'event': 'exit',
+            'pid': pid,
+            'returncode': code,
+            'rusage': [rusage.ru_utime, rusage.ru_stime, rusage.ru_maxrss, rusage.ru_inblock, rusage.ru_oublock],
+        })
+
+
+while True:
+    try:
+        ready, _, _ = select.select([requests_in, wakeup_r], [], [])
+    except InterruptedError:
+        continue
+    if wakeup_r in ready:
+        os.read(wakeup_r, 512)
+        reap()
+    if requests_in in ready:
+        data = requests_in.read(65536)
+        if not data:
+            break
+        buffer += data
+        while b'\n' in buffer:
+            line, buffer = buffer.split(b'\n', 1)
+            request = json.loads(line)
+            pid = os.fork()
+            if pid == 0:
+                run_child(request)
+            reply({'event': 'started', 'request': request['request'], 'pid': pid})
+        reap()
+'''
+
+
+class WarmRusage:
+    """The subset of struct_rusage reported by the zygote for a finished job."""
+
+    __slots__ = ('ru_utime', 'ru_stime', 'ru_maxrss', 'ru_inblock', 'ru_oublock')
+
+    def __init__(self, ru_utime: float, ru_stime: float, ru_maxrss: int, ru_inblock: int, ru_oublock: int):
+        self.ru_utime = ru_utime
+        self.ru_stime = ru_stime
+        self.ru_maxrss = ru_maxrss
+        self.ru_inblock = ru_inblock
+        self.ru_oublock = ru_oublock
+
+
+class WarmProcess:
+    """Popen-like handle for a job forked from a warm interpreter."""
+
+    def __init__(self):
+        self.pid: Optional[int] = None
+        self.returncode: Optional[int] = None
+        self.rusage = None
+        self._started = threading.Event()
+        self._finished = threading.Event()
+        self._callbacks: List[Callable[['WarmProcess'], None]] = []
+        self._callbacks_lock = threading.Lock()
+
+    def poll(self) -> Optional[int]:
+        return self.returncode
+
+    def wait(self, timeout: Optional[float] = None) -> Optional[int]:
+        if not self._finished.wait(timeout):
+            raise subprocess.TimeoutExpired('warm job', timeout)
+        return self.returncode
+
+    def add_done_callback(self, callback: Callable[['WarmProcess'], None]) -> None:
+        """Call callback with this handle once the process exits (immediately if it has)."""
+        with self._callbacks_lock:
+            if not self._finished.is_set():
+                self._callbacks.append(callback)
+                return
+        callback(self)
+
+    def send_signal(self, sig: int) -> None:
+        if self.pid is not None and self.returncode is None:
+            try:
+                os.killpg(self.pid, sig)
+            except ProcessLookupError:
+                pass
+
+    def terminate(self) -> None:
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self) -> None:
+        """SIGKILL the whole process group, even if its leader has already exited."""
+        if self.pid is not None:
+            try:
+                os.killpg(self.pid, signal.SIGKILL)
+            except ProcessLookupError:
+                pass
+
+    def _set_started(self, pid: int) -> None:
+        self.pid = pid
+        self._started.set()
+
+    def _set_finished(self, returncode: int, rusage=None) -> None:
+        self.returncode = returncode
+        self.rusage = rusage
+        self._started.set()
+        with self._callbacks_lock:
+            self._finished.set()
+            callbacks, self._callbacks = self._callbacks, []
+        for callback in callbacks:
+            callback(self)
+
+
+class Zygote:
+    """A warm interpreter with preloaded modules that forks job processes."""
+
+    def __init__(self, application: str, preload: Tuple[str, ...]):
+        self.process = subprocess.Popen(
+            [application, '-c', ZYGOTE_SOURCE, *preload],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            start_new_session=True
+        )
+        self._lock = threading.Lock()
+        self._request_ids = itertools.count()
+        self._pending: Dict[int, WarmProcess] = {}
+        self._by_pid: Dict[int, WarmProcess] = {}
+        self._closed = False
+        self._reader = threading.Thread(target=self._read_replies, daemon=True)
+        self._reader.start()
+
+    def alive(self) -> bool:
+        return self.process.poll() is None and not self._closed
+
+    def spawn(self, script: str, argv: List[str], cwd: str, env: Dict[str, str],
+              stdout_path: str, stderr_path: str, timeout: Optional[float] = None) -> WarmProcess:
+        """Fork a child running script and return its handle once started.
+
+        Raises:
+            RuntimeError: If the zygote has already exited
+            TimeoutError: If the zygote does not start the child within
+                timeout seconds (it is killed, since it is stuck importing
+                its preloads or forking)
+        """
+        handle = WarmProcess()
+        request_id = next(self._request_ids)
+        request = {
+            'request': request_id,
+            'script': script,
+            'argv': argv,
+            'cwd': cwd,
+            'env': env,
+            'stdout': stdout_path,
+            'stderr': stderr_path,
+        }
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("Warm interpreter has exited")
+            self._pending[request_id] = handle
+            self.process.stdin.write(json.dumps(request).encode('utf-8') + b'\n')
+            self.process.stdin.flush()
+        if not handle._started.wait(timeout):
+            self.process.kill()
+            raise TimeoutError(f"Warm interpreter did not start the job within {timeout} seconds")
+        return handle
+
+    def close(self) -> None:
+        try:
+            self.process.stdin.close()
+        except OSError:
+            pass
+        self.process.wait()
+
+    def _read_replies(self) -> None:
+        try:
+            for line in self.process.stdout:
+                try:
+                    message = json.loads(line)
+                except ValueError:
+                    print(f"Warm interpreter {self.process.pid} wrote a malformed reply: {line[:200]!r}")
+                    continue
+                with self._lock:
+                    # The zygote always reports a child as started before it exits
+                    if message['event'] == 'started':
+                        handle = self._pending.pop(message['request'], None)
+                        if handle is not None:
+                            self._by_pid[message['pid']] = handle
+                            handle._set_started(message['pid'])
+                    else:
+                        handle = self._by_pid.pop(message['pid'], None)
+                        if handle is not None:
+                            handle._set_finished(message['returncode'], WarmRusage(*message['rusage']))
+        finally:
+            # The zygote died, or can no longer be followed; fail everything
+            # it was still responsible for so no job waits on it forever
+            if self.process.poll() is None:
+                self.process.kill()
+            with self._lock:
+                self._closed = True
+                for handle in list(self._pending.values()) + list(self._by_pid.values()):
+                    handle._set_finished(-signal.SIGKILL)
+                self._pending.clear()
+                self._by_pid.clear()
+
+
+class WarmPool:
+    """Pool of warm Python interpreters used by specs with ``execution.mode: warm``.
+
+    One zygote is kept per (interpreter, preload modules) pair. Every job is
+    forked from its zygote, so it starts with the modules already imported
+    while still running in its own process with its own working directory,
+    environment and ``stdout``/``stderr`` files.
+    """
+
+    def __init__(self, start_timeout: Optional[float] = 120.0):
+        """Initialize the pool.
+
+        Args:
+            start_timeout: Seconds to wait for a zygote to start a job,
+                including importing its preloads on first use
+        """
+        self.start_timeout = start_timeout
+        self._zygotes: Dict[Tuple[str, Tuple[str, ...]], Zygote] = {}
+        self._lock = threading.Lock()
+
+    def spawn(self, cmd: List[str], preload: List[str], cwd: str, env: Dict[str, str],
+              stdout_path: str, stderr_path: str) -> WarmProcess:
+        """Run a ``<python> -c <script> [args...]`` command in a warm interpreter.
+
+        Args:
+            cmd: Rendered command line
+            preload: Modules to import in the zygote before forking
+            cwd: Working directory for the job
+            env: Environment for the job
+            stdout_path: File receiving the job's stdout
+            stderr_path: File receiving the job's stderr
+        """
+        if len(cmd) < 3 or cmd[1] != '-c':
+            raise ValueError("Warm execution requires arguments of the form ['-c', <script>, ...]")
+
+        key = (cmd[0], tuple(preload))
+        with self._lock:
+            zygote = self._zygotes.get(key)
+            if zygote is None or not zygote.alive():
+                zygote = Zygote(cmd[0], key[1])
+                self._zygotes[key] = zygote
+        return zygote.spawn(cmd[2], list(cmd[3:]), cwd, env, stdout_path, stderr_path, self.start_timeout)
+
+    def shutdown(self) -> None:
+        """Stop all warm interpreters."""
+        with self._lock:
+            zygotes = list(self._zygotes.values())
+            self._zygotes.clear()
+        for zygote in zygotes:
+            zygote.close()
@@ -0,0 +1,148 @@
+import os
+import socket
+import threading
+import traceback
+import uuid
+from typing import Dict, Optional
+from jobsonTwo.storage.job_queue import JobQueue
+from jobsonTwo.metrics import QUEUE_WAIT_SECONDS
+from .engine import JobExecutionEngine
+
+
+class QueueWorker:
+    """Runs jobs claimed from a shared JobQueue.
+
+    Any number of workers, on one host or several sharing the jobs
+    directory, can serve the same queue. Each claims jobs while it has free
+    slots, runs them with its own JobExecutionEngine and renews its leases
+    every ``heartbeat_interval`` seconds from a separate thread, so slow job
+    start-up cannot let them lapse. Stop requests for its jobs arrive with
+    the heartbeat. Jobs whose lease it has lost are abandoned: their
+    processes are stopped and, since another worker may already be running
+    them, the engine only records a job's status and results while the
+    claim it was started under still holds the job with an unexpired lease.
+    Jobs are tracked by claim rather than by job id, so a job this worker
+    lost and claimed again is never confused with its abandoned run.
+    """
+
+    def __init__(self, engine: JobExecutionEngine, queue: JobQueue, worker_id: Optional[str] = None,
+                 max_jobs: Optional[int] = None, lease_seconds: float = 30.0,
+                 heartbeat_interval: float = 5.0, poll_interval: float = 0.5):
+        """Initialize the worker.
+
+        Args:
+            engine: Engine used to run claimed jobs
+            queue: Shared queue to claim jobs from
+            worker_id: Unique worker name (defaults to host, pid and a random suffix)
+            max_jobs: Jobs this worker runs at once (defaults to CPU count)
+            lease_seconds: How long a claim stays valid without a heartbeat
+            heartbeat_interval: Seconds between lease renewals
+            poll_interval: Seconds between claims while the queue is empty
+        """
+        self.engine = engine
+        self.queue = queue
+        self.worker_id = worker_id or f"{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+        self.max_jobs = max_jobs or os.cpu_count() or 1
+        self.lease_seconds = lease_seconds
+        self.heartbeat_interval = heartbeat_interval
+        self.poll_interval = poll_interval
+
+        # Job id of each claim being run, keyed by claim id
+        self._running: Dict[str, str] = {}
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = threading.Event()
+        self._done = threading.Event()
+
+    def run(self) -> None:
+        """Claim and run jobs until shutdown() is called, then wait for running jobs."""
+        print(f"Worker {self.worker_id} serving {self.engine.job_store.jobs_dir} with {self.max_jobs} slots")
+        self._done.clear()
+        heartbeat = threading.Thread(target=self._heartbeat_loop, name='jobson-heartbeat', daemon=True)
+        heartbeat.start()
+        try:
+            while True:
+                with self._lock:
+                    running = len(self._running)
+                if self._stopping.is_set():
+                    if not running:
+                        break
+                else:
+                    claimed = False
+                    while running < self.max_jobs and self._claim():
+                        claimed = True
+                        running += 1
+                    if claimed:
+                        continue
+
+                self._wakeup.wait(self.poll_interval)
+                self._wakeup.clear()
+        finally:
+            self._done.set()
+            heartbeat.join()
+        print(f"Worker {self.worker_id} stopped")
+
+    def shutdown(self) -> None:
+        """Stop claiming new jobs; run() returns once the running ones finish."""
+        self._stopping.set()
+        self._wakeup.set()
+
+    def _claim(self) -> bool:
+        claimed = self.queue.claim(self.worker_id, self.lease_seconds)
+        if claimed is None:
+            return False
+        job_id, claim_id, waited = claimed
+
+        job = self.engine.job_store.get_job(job_id)
+        if job is None or job['status'] not in ('queued', 'running'):
+            # Deleted or finished while queued
+            self.queue.complete(job_id, claim_id)
+            return True
+        if self.engine.is_running(job_id):
+            # An earlier run of the job that lost its lease is still stopping
+            # here and shares its directory; leave the job for a later claim
+            self.queue.release(job_id, claim_id)
+            return False
+        spec_key = job['spec'].get('id') or job['spec'].get('name', '')
+        QUEUE_WAIT_SECONDS.labels(spec_key).observe(waited)
+
+        with self._lock:
+            self._running[claim_id] = job_id
+        try:
+            future = self.engine.start_job(job_id, job['spec'], job['inputs'], claim_id=claim_id)
+        except Exception as e:
+            print(f"Error starting job {job_id}: {e}")
+            print(traceback.format_exc())
+            self.engine.job_store.update_job_status(job_id, 'failed', {'error': str(e)}, claim_id=claim_id)
+            self._finished(claim_id)
+            return True
+        future.add_done_callback(lambda _: self._finished(claim_id))
+        return True
+
+    def _finished(self, claim_id: str) -> None:
+        with self._lock:
+            job_id = self._running.pop(claim_id)
+        self.queue.complete(job_id, claim_id)
+        self._wakeup.set()
+
+    def _heartbeat_loop(self) -> None:
+        while True:
+            self._heartbeat()
+            if self._done.wait(self.heartbeat_interval):
+                return
+
+    def _heartbeat(self) -> None:
+        try:
+            with self._lock:
+                claims = dict(self._running)
+            stop, lost = self.queue.heartbeat(list(claims), self.lease_seconds)
+            for claim_id in lost:
+                self.engine.abandon_job(claims[claim_id])
+            for claim_id in stop:
+                self.engine.stop_job(claims[claim_id])
+
+            requeued, failed = self.queue.requeue_expired()
+            if requeued or failed:
+                print(f"Requeued {len(requeued)} jobs with expired leases, failed {len(failed)}")
+        except Exception as e:
+            print(f"Error renewing leases for worker {self.worker_id}: {e}")
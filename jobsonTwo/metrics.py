@@ -0,0 +1,226 @@
+"""
+Process-wide metrics for JobsonTwo, rendered in the Prometheus text format
+"""
+import bisect
+import functools
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+# Default latency buckets in seconds
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = '') -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return '{' + ','.join(parts) + '}' if parts else ''
+
+
+def _escape(value: str) -> str:
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _CounterChild:
+    __slots__ = ('value', '_lock')
+
+    def __init__(self):
+        self.value = 0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1) -> None:
+        with self._lock:
+            self.value += amount
+
+
+class _HistogramChild:
+    __slots__ = ('bounds', 'counts', 'sum', 'count', '_lock')
+
+    def __init__(self, bounds: Tuple[float, ...]):
+        self.bounds = bounds
+        # One slot per bucket plus the +Inf overflow bucket; counts are per
+        # bucket and only made cumulative when rendered
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[index] += 1
+            self.sum += value
+            self.count += 1
+
+
+class _Metric:
+    kind = ''
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[Tuple[str, ...], object] = {}
+        self._lock = threading.Lock()
+
+    def labels(self, *values: str):
+        """Return the child for a set of label values.
+
+        Children are created once and cached, so hot paths can keep the
+        returned object and update it without further lookups.
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _header(self) -> List[str]:
+        return [f'# HELP {self.name} {self.documentation}', f'# TYPE {self.name} {self.kind}']
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = 'counter'
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1) -> None:
+        self.labels().inc(amount)
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for values, child in sorted(self._children.items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}')
+        return lines
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    kind = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self.labels().observe(value)
+
+    def timed(self, *values: str) -> Callable:
+        """Decorator observing the run time of each call under the given labels."""
+        child = self.labels(*values)
+
+        def decorator(function: Callable) -> Callable:
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                started = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    child.observe(time.perf_counter() - started)
+            return wrapper
+        return decorator
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for values, child in sorted(self._children.items()):
+            with child._lock:
+                counts = list(child.counts)
+                total, count = child.sum, child.count
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = f'le="{_format_value(bound)}"'
+                lines.append(f'{self.name}_bucket{_format_labels(self.labelnames, values, le)} {cumulative}')
+            labels = _format_labels(self.labelnames, values)
+            lines.append(f'{self.name}_sum{labels} {_format_value(total)}')
+            lines.append(f'{self.name}_count{labels} {count}')
+        return lines
+
+
+class Gauge(_Metric):
+    """Current value read from a callback when metrics are rendered."""
+
+    kind = 'gauge'
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._function: Optional[Callable[[], Dict[Tuple[str, ...], float]]] = None
+
+    def set_function(self, function: Callable[[], Dict[Tuple[str, ...], float]]) -> None:
+        """Set the callback returning values keyed by label value tuples."""
+        self._function = function
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        if self._function is None:
+            return lines
+        try:
+            values = self._function()
+        except Exception as e:
+            print(f"Error collecting gauge {self.name}: {e}")
+            return lines
+        for label_values, value in sorted(values.items()):
+            lines.append(f'{self.name}{_format_labels(self.labelnames, label_values)} {_format_value(value)}')
+        return lines
+
+
+class MetricsRegistry:
+    """Holds metrics and renders them for the /metrics endpoint."""
+
+    def __init__(self):
+        self._metrics: List[_Metric] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return '\n'.join(lines) + '\n'
+
+
+REGISTRY = MetricsRegistry()
+
+JOBS_FINISHED = REGISTRY.register(Counter(
+    'jobson_jobs_finished_total', 'Jobs that reached a final status', ('spec', 'status')))
+QUEUE_WAIT_SECONDS = REGISTRY.register(Histogram(
+    'jobson_queue_wait_seconds', 'Time jobs spent queued before starting', ('spec',)))
+JOB_RUN_SECONDS = REGISTRY.register(Histogram(
+    'jobson_job_run_seconds', 'Wall time of job processes', ('spec',)))
+SPEC_LOAD_SECONDS = REGISTRY.register(Histogram(
+    'jobson_spec_load_seconds', 'Time to parse and validate a spec file'))
+STORE_OP_SECONDS = REGISTRY.register(Histogram(
+    'jobson_store_operation_seconds', 'JobStore operation latency', ('operation',)))
+INPUT_MATERIALIZE_SECONDS = REGISTRY.register(Histogram(
+    'jobson_input_materialize_seconds', 'Time to create a job\'s input files', ('spec',)))
+REQUEST_SECONDS = REGISTRY.register(Histogram(
+    'jobson_http_request_seconds', 'HTTP request latency by route', ('endpoint', 'method', 'status')))
+SCHEDULER_JOBS = REGISTRY.register(Gauge(
+    'jobson_scheduler_jobs', 'Jobs currently queued or running in the scheduler', ('state',)))
+RESULT_CACHE = REGISTRY.register(Gauge(
+    'jobson_result_cache', 'Result cache hits, misses, entries and bytes', ('stat',)))
@@ -1,3 +1,4 @@
 from .validator import JobSpecValidator
+from .registry import SpecRegistry
 
-__all__ = ['JobSpecValidator'] 
\ No newline at end of file
+__all__ = ['JobSpecValidator', 'SpecRegistry']
\ No newline at end of file
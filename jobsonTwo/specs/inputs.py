@@ -0,0 +1,224 @@
+import math
+import os
+from functools import lru_cache
+from typing import Dict, Any, List, Optional, Callable, Tuple
+
+# Magic bytes identifying each binary file format, as (offset, signature) alternatives
+FILE_SIGNATURES = {
+    'jpg': [(0, b'\xff\xd8\xff')],
+    'png': [(0, b'\x89PNG\r\n\x1a\n')],
+    'gif': [(0, b'GIF87a'), (0, b'GIF89a')],
+    'bmp': [(0, b'BM')],
+    'webp': [(8, b'WEBP')],
+    'tif': [(0, b'II*\x00'), (0, b'MM\x00*')],
+    'zip': [(0, b'PK\x03\x04'), (0, b'PK\x05\x06')],
+    'gz': [(0, b'\x1f\x8b')],
+    'tar': [(257, b'ustar')],
+    'pdf': [(0, b'%PDF-')],
+}
+FORMAT_ALIASES = {'jpeg': 'jpg', 'tiff': 'tif', 'tgz': 'gz'}
+
+# Formats with no signature, accepted if the file looks like UTF-8 text
+TEXT_FORMATS = {'txt', 'md', 'json', 'csv', 'tsv', 'yaml', 'yml', 'html', 'xml', 'log'}
+
+# Bytes read from the start of a file to identify it
+SNIFF_BYTES = 8 * 1024
+
+TRUE_VALUES = {'true', '1', 'yes', 'on'}
+FALSE_VALUES = {'false', '0', 'no', 'off'}
+
+
+def format_input_value(value: Any) -> str:
+    """Render an input value as the text a job script receives."""
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    return str(value)
+
+
+def known_format(name: str) -> bool:
+    """Check whether a supportedFormats entry can be recognized by sniffing."""
+    name = FORMAT_ALIASES.get(name, name)
+    return name in FILE_SIGNATURES or name in TEXT_FORMATS
+
+
+def _looks_like_text(head: bytes) -> bool:
+    if b'\x00' in head:
+        return False
+    try:
+        head.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the end of the sample is fine
+        return e.start >= len(head) - 3 and e.reason == 'unexpected end of data'
+    return True
+
+
+@lru_cache(maxsize=1024)
+def _sniff(path: str, size: int, mtime_ns: int, formats: Tuple[str, ...]) -> bool:
+    # Keyed on size and mtime so a replaced file is sniffed again
+    with open(path, 'rb') as f:
+        head = f.read(SNIFF_BYTES)
+    for name in formats:
+        name = FORMAT_ALIASES.get(name, name)
+        if name in TEXT_FORMATS:
+            if _looks_like_text(head):
+                return True
+        elif any(head[offset:offset + len(signature)] == signature for offset, signature in FILE_SIGNATURES[name]):
+            return True
+    return False
+
+
+def sniff_format(path: str, formats: Tuple[str, ...]) -> bool:
+    """Check by its leading bytes whether a file is in one of some formats.
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    stat = os.stat(path)
+    return _sniff(path, stat.st_size, stat.st_mtime_ns, formats)
+
+
+class InputValidator:
+    """Checks and coerces job inputs against a spec's ``expectedInputs``.
+
+    The checks for each input are built once per spec, so validating a
+    submission is a dictionary walk. Values are coerced to their declared
+    type: numbers (strings included) become ints when whole and floats
+    otherwise, and booleans accept true/false, 1/0, yes/no and on/off.
+    Empty strings count as missing. A missing input takes its ``default``
+    if it has one and is rejected if it is required, that is, if it sets
+    ``required: true`` or sets none of ``required``, ``optional`` and
+    ``default``.
+
+    The constraints checked are ``min``/``max`` and ``integer`` for
+    numbers, ``options`` for strings and numbers, and ``supportedFormats``
+    for files, which are identified by their leading bytes rather than by
+    name.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        self._fields: List[Tuple[str, Callable[[Any], Any], bool, Any]] = []
+        for input_spec in spec.get('expectedInputs', []):
+            required = input_spec.get('required', not input_spec.get('optional', False) and 'default' not in input_spec)
+            self._fields.append((input_spec['id'], self._compile(input_spec), bool(required), input_spec.get('default')))
+        self._ids = {field[0] for field in self._fields}
+
+    def validate(self, inputs: Dict[str, Any]) -> Dict[str, Any]:
+        """Check a set of inputs and return them coerced, with defaults filled in.
+
+        File inputs must already be resolved to paths.
+
+        Raises:
+            ValueError: Naming every invalid input
+        """
+        unknown = set(inputs) - self._ids
+        if unknown:
+            raise ValueError(f"Unknown inputs: {sorted(unknown)}")
+
+        values = {}
+        errors = []
+        for input_id, check, required, default in self._fields:
+            value = inputs.get(input_id)
+            if value is None or value == '':
+                if default is not None:
+                    values[input_id] = default
+                elif required:
+                    errors.append(f"{input_id} is required")
+                continue
+            try:
+                values[input_id] = check(value)
+            except (ValueError, TypeError, OSError) as e:
+                errors.append(f"{input_id} {e}")
+        if errors:
+            raise ValueError(f"Invalid inputs: {'; '.join(errors)}")
+        return values
+
+    def _compile(self, input_spec: Dict[str, Any]) -> Callable[[Any], Any]:
+        input_type = input_spec['type']
+        if input_type == 'number':
+            return self._compile_number(input_spec)
+        if input_type == 'boolean':
+            return self._check_boolean
+        if input_type == 'file':
+            return self._compile_file(input_spec)
+        return self._compile_string(input_spec)
+
+    @staticmethod
+    def _compile_number(input_spec: Dict[str, Any]) -> Callable[[Any], Any]:
+        minimum = input_spec.get('min')
+        maximum = input_spec.get('max')
+        integer = input_spec.get('integer', False)
+        options = set(input_spec['options']) if 'options' in input_spec else None
+
+        def check(value):
+            if isinstance(value, bool):
+                raise ValueError("must be a number")
+            if isinstance(value, str):
+                try:
+                    value = float(value.strip())
+                except ValueError:
+                    raise ValueError("must be a number")
+            elif not isinstance(value, (int, float)):
+                raise ValueError("must be a number")
+            if not math.isfinite(value):
+                raise ValueError("must be a finite number")
+            if value == int(value):
+                value = int(value)
+            elif integer:
+                raise ValueError("must be a whole number")
+            if minimum is not None and value < minimum:
+                raise ValueError(f"must be at least {minimum}")
+            if maximum is not None and value > maximum:
+                raise ValueError(f"must be at most {maximum}")
+            if options is not None and value not in options:
+                raise ValueError(f"must be one of {sorted(options)}")
+            return value
+        return check
+
+    @staticmethod
+    def _check_boolean(value: Any) -> bool:
+        if isinstance(value, bool):
+            return value
+        text = str(value).strip().lower()
+        if text in TRUE_VALUES:
+            return True
+        if text in FALSE_VALUES:
+            return False
+        raise ValueError("must be true or false")
+
+    @staticmethod
+    def _compile_string(input_spec: Dict[str, Any]) -> Callable[[Any], Any]:
+        options = input_spec.get('options')
+        allowed = {str(option) for option in options} if options is not None else None
+
+        def check(value):
+            if isinstance(value, (dict, list)):
+                raise ValueError("must be a string")
+            value = format_input_value(value)
+            if allowed is not None:
+                value = value.strip()
+                if value not in allowed:
+                    raise ValueError(f"must be one of {options}")
+            return value
+        return check
+
+    @staticmethod
+    def _compile_file(input_spec: Dict[str, Any]) -> Callable[[Any], Any]:
+        # Spec validation rejects unknown formats; any left in an unvalidated spec are not checked
+        formats = tuple(name for name in (str(name).lower() for name in input_spec.get('supportedFormats', ()))
+                        if known_format(name))
+
+        def check(path):
+            if not isinstance(path, str) or not os.path.isfile(path):
+                raise ValueError("must be an existing file")
+            if formats and not sniff_format(path, formats):
+                raise ValueError(f"is not a supported file type ({', '.join(formats)})")
+            return path
+        return check
+
+
+def validate_inputs(spec: Dict[str, Any], inputs: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate inputs with the spec's precompiled validator, compiling one if it has none."""
+    validator: Optional[InputValidator] = getattr(spec, 'input_validator', None)
+    if validator is None:
+        validator = InputValidator(spec)
+    return validator.validate(inputs)
@@ -2,6 +2,7 @@ import yaml
 from pathlib import Path
 from typing import Dict, Any, Optional
 from .validator import JobSpecValidator
+from .template import CompiledSpec
 
 class JobSpecLoader:
     """Loads and validates job specifications from YAML files."""
@@ -23,13 +24,13 @@ class JobSpecLoader:
             spec = yaml.safe_load(f)
         
         self.validator.validate(spec)
-        return spec
+        return CompiledSpec(spec)
 
     def load_from_string(self, yaml_string):
         """Load and validate a job specification from a YAML string."""
         spec = yaml.safe_load(yaml_string)
         self.validator.validate(spec)
-        return spec 
+        return CompiledSpec(spec) 
 
     def _validate_spec(self, spec: Dict[str, Any]) -> None:
         """Validate a job specification."""
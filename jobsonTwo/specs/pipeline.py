@@ -0,0 +1,138 @@
+import re
+import yaml
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+from .validator import JobSpecValidator
+
+INPUT_REFERENCE = re.compile(r'^\$\{inputs\.([^}]+)\}$')
+STEP_OUTPUT_REFERENCE = re.compile(r'^\$\{steps\.([^}.]+)\.outputs\.([^}]+)\}$')
+
+
+def parse_reference(value: Any) -> Optional[Tuple[str, ...]]:
+    """Parse a step input value that refers to a pipeline input or a step output.
+
+    Returns:
+        ('input', input_id), ('step', step_id, output_id), or None for a literal value
+    """
+    if not isinstance(value, str) or not value.startswith('${'):
+        return None
+    match = INPUT_REFERENCE.match(value)
+    if match:
+        return 'input', match.group(1)
+    match = STEP_OUTPUT_REFERENCE.match(value)
+    if match:
+        return 'step', match.group(1), match.group(2)
+    return None
+
+
+def step_dependencies(pipeline: Dict[str, Any]) -> Dict[str, List[str]]:
+    """Map each step id to the ids of the steps whose outputs it consumes."""
+    dependencies = {}
+    for step in pipeline['steps']:
+        upstream = []
+        for value in step.get('inputs', {}).values():
+            ref = parse_reference(value)
+            if ref is not None and ref[0] == 'step' and ref[1] not in upstream:
+                upstream.append(ref[1])
+        dependencies[step['id']] = upstream
+    return dependencies
+
+
+def topological_order(pipeline: Dict[str, Any]) -> List[str]:
+    """Order step ids so every step comes after the steps it depends on.
+
+    Steps are otherwise kept in declaration order.
+
+    Raises:
+        ValueError: If the steps depend on each other in a cycle
+    """
+    dependencies = step_dependencies(pipeline)
+    order = []
+    done = set()
+    remaining = [step['id'] for step in pipeline['steps']]
+    while remaining:
+        ready = [step_id for step_id in remaining if all(dep in done for dep in dependencies[step_id])]
+        if not ready:
+            raise ValueError(f"Pipeline steps form a cycle: {remaining}")
+        order.extend(ready)
+        done.update(ready)
+        remaining = [step_id for step_id in remaining if step_id not in done]
+    return order
+
+
+class PipelineLoader:
+    """Loads and validates pipeline definitions from YAML files.
+
+    A pipeline lists steps, each running an existing job spec. Step inputs
+    are literal values, ``${inputs.<id>}`` references to the pipeline's own
+    ``expectedInputs``, or ``${steps.<step>.outputs.<output>}`` references to
+    an output of another step, which make the step depend on it. Whether the
+    referenced specs, inputs and outputs exist is checked when a run is
+    created, since specs are loaded separately.
+    """
+
+    REQUIRED_FIELDS = {"name", "description", "steps"}
+    REQUIRED_STEP_FIELDS = {"id", "spec"}
+
+    def __init__(self):
+        self.validator = JobSpecValidator()
+
+    def load_from_file(self, pipeline_path: str) -> Dict[str, Any]:
+        """Load a pipeline definition from a file path."""
+        path = Path(pipeline_path)
+        if not path.exists():
+            raise FileNotFoundError(f"Pipeline file not found: {pipeline_path}")
+
+        with open(path, 'r') as f:
+            pipeline = yaml.safe_load(f)
+
+        self.validate(pipeline)
+        return pipeline
+
+    def load_from_string(self, yaml_string: str) -> Dict[str, Any]:
+        """Load and validate a pipeline definition from a YAML string."""
+        pipeline = yaml.safe_load(yaml_string)
+        self.validate(pipeline)
+        return pipeline
+
+    def validate(self, pipeline: Dict[str, Any]) -> bool:
+        """Validate a pipeline definition."""
+        if not isinstance(pipeline, dict):
+            raise ValueError("Pipeline must be a mapping")
+        missing_fields = self.REQUIRED_FIELDS - set(pipeline.keys())
+        if missing_fields:
+            raise ValueError(f"Missing required fields: {missing_fields}")
+
+        pipeline.setdefault('expectedInputs', [])
+        self.validator._validate_inputs(pipeline['expectedInputs'])
+        input_ids = {input_spec['id'] for input_spec in pipeline['expectedInputs']}
+
+        steps = pipeline['steps']
+        if not isinstance(steps, list) or not steps:
+            raise ValueError("steps must be a non-empty list")
+
+        step_ids = set()
+        for step in steps:
+            if not isinstance(step, dict):
+                raise ValueError("Each step must be a mapping")
+            missing_fields = self.REQUIRED_STEP_FIELDS - set(step.keys())
+            if missing_fields:
+                raise ValueError(f"Step missing required fields: {missing_fields}")
+            if step['id'] in step_ids:
+                raise ValueError(f"Duplicate step id: {step['id']}")
+            step_ids.add(step['id'])
+            if not isinstance(step.get('inputs', {}), dict):
+                raise ValueError(f"Step {step['id']} inputs must be a mapping")
+
+        for step in steps:
+            for input_id, value in step.get('inputs', {}).items():
+                ref = parse_reference(value)
+                if ref is None:
+                    continue
+                if ref[0] == 'input' and ref[1] not in input_ids:
+                    raise ValueError(f"Step {step['id']} input {input_id} references unknown pipeline input: {ref[1]}")
+                if ref[0] == 'step' and (ref[1] not in step_ids or ref[1] == step['id']):
+                    raise ValueError(f"Step {step['id']} input {input_id} references unknown step: {ref[1]}")
+
+        topological_order(pipeline)
+        return True
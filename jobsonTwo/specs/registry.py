@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+from typing import Dict, Any, Optional, List, Tuple
+from .loader import JobSpecLoader
+from ..metrics import SPEC_LOAD_SECONDS
+
+
+class SpecRegistry:
+    """Keeps parsed and validated job specs in memory.
+
+    Each YAML file in the specs directory is loaded once and reloaded only
+    when its mtime or size changes, so a file that fails to load is
+    reported once and retried when it is edited. The directory itself is
+    rescanned at most once per ``check_interval`` seconds. Returned specs
+    are shared and must be treated as read-only.
+    """
+
+    def __init__(self, specs_dir: str, loader: Optional[JobSpecLoader] = None, check_interval: float = 1.0):
+        """Initialize the spec registry.
+
+        Args:
+            specs_dir: Directory containing ``<spec_id>.yaml`` files
+            loader: Loader used to parse and validate spec files
+            check_interval: Minimum seconds between directory rescans
+        """
+        self.specs_dir = specs_dir
+        self.loader = loader or JobSpecLoader()
+        self.check_interval = check_interval
+
+        # (mtime_ns, size, spec) per spec id, with spec None for files that failed to load
+        self._entries: Dict[str, Tuple[int, int, Optional[Dict[str, Any]]]] = {}
+        self._sorted: List[Dict[str, Any]] = []
+        self._last_check = 0.0
+        self._lock = threading.Lock()
+
+    def get(self, spec_id: str) -> Optional[Dict[str, Any]]:
+        """Look up a spec by id (its filename without extension)."""
+        self._maybe_refresh()
+        entry = self._entries.get(spec_id)
+        return entry[2] if entry else None
+
+    def list_specs(self) -> List[Dict[str, Any]]:
+        """Return all valid specs, ordered by id."""
+        self._maybe_refresh()
+        return self._sorted
+
+    def refresh(self) -> None:
+        """Rescan the specs directory and reload changed files."""
+        with self._lock:
+            self._refresh()
+
+    def _maybe_refresh(self) -> None:
+        if time.monotonic() - self._last_check < self.check_interval:
+            return
+        with self._lock:
+            if time.monotonic() - self._last_check >= self.check_interval:
+                self._refresh()
+
+    def _refresh(self) -> None:
+        entries = {}
+        changed = False
+        try:
+            with os.scandir(self.specs_dir) as it:
+                spec_files = [e for e in it if e.name.endswith('.yaml') and e.is_file()]
+        except OSError as e:
+            print(f"Error scanning specs directory {self.specs_dir}: {e}")
+            spec_files = []
+
+        for dir_entry in spec_files:
+            spec_id = os.path.splitext(dir_entry.name)[0]
+            stat = dir_entry.stat()
+            previous = self._entries.get(spec_id)
+            if previous and previous[0] == stat.st_mtime_ns and previous[1] == stat.st_size:
+                entries[spec_id] = previous
+                continue
+
+            changed = True
+            started = time.perf_counter()
+            try:
+                spec = self.loader.load_from_file(dir_entry.path)
+                spec['id'] = spec_id
+            except Exception as e:
+                print(f"Error loading job spec {dir_entry.path}: {e}")
+                spec = None
+            finally:
+                SPEC_LOAD_SECONDS.observe(time.perf_counter() - started)
+            entries[spec_id] = (stat.st_mtime_ns, stat.st_size, spec)
+
+        if changed or entries.keys() != self._entries.keys():
+            self._entries = entries
+            self._sorted = [entries[spec_id][2] for spec_id in sorted(entries) if entries[spec_id][2] is not None]
+        self._last_check = time.monotonic()
@@ -0,0 +1,75 @@
+import re
+from typing import Dict, Any, List, Set, Tuple, Union
+from .inputs import InputValidator
+
+PLACEHOLDER_PREFIX = '${inputs.'
+PLACEHOLDER_PATTERN = re.compile(r'\$\{inputs\.([^}]*)\}')
+
+
+class ArgumentTemplate:
+    """An execution argument compiled into literal segments and input references."""
+
+    __slots__ = ('segments',)
+
+    def __init__(self, segments: Tuple[Tuple[bool, str], ...]):
+        # Each segment is (is_reference, text); text is the input id for references
+        self.segments = segments
+
+    def render(self, values: Dict[str, str]) -> str:
+        """Render the argument, substituting missing inputs with an empty string.
+
+        Only optional inputs can be missing once inputs have been validated,
+        so an argument like ``--limit=${inputs.limit}`` renders as
+        ``--limit=`` when the input is left out.
+        """
+        return ''.join(values.get(text, '') if is_ref else text for is_ref, text in self.segments)
+
+
+def find_references(arg: str) -> List[str]:
+    """Return the input ids referenced by an argument string."""
+    if arg.count(PLACEHOLDER_PREFIX) != len(PLACEHOLDER_PATTERN.findall(arg)):
+        raise ValueError(f"Unterminated input reference in execution argument: {arg[:80]!r}")
+    return PLACEHOLDER_PATTERN.findall(arg)
+
+
+def compile_argument(arg: str, input_ids: Set[str]) -> ArgumentTemplate:
+    """Compile one argument string into an ArgumentTemplate.
+
+    Raises:
+        ValueError: If the argument references an undeclared input
+    """
+    for input_id in find_references(arg):
+        if input_id not in input_ids:
+            raise ValueError(f"Execution argument references unknown input: ${{inputs.{input_id}}}")
+
+    segments = []
+    pos = 0
+    for match in PLACEHOLDER_PATTERN.finditer(arg):
+        if match.start() > pos:
+            segments.append((False, arg[pos:match.start()]))
+        segments.append((True, match.group(1)))
+        pos = match.end()
+    if pos < len(arg):
+        segments.append((False, arg[pos:]))
+    return ArgumentTemplate(tuple(segments))
+
+
+def compile_arguments(spec: Dict[str, Any]) -> List[Union[ArgumentTemplate, Any]]:
+    """Compile a spec's execution arguments; non-string arguments are kept as-is."""
+    input_ids = {input_spec['id'] for input_spec in spec.get('expectedInputs', [])}
+    return [
+        compile_argument(arg, input_ids) if isinstance(arg, str) else arg
+        for arg in spec['execution']['arguments']
+    ]
+
+
+class CompiledSpec(dict):
+    """A job spec carrying its precompiled argument templates and input validator.
+
+    Behaves (and serializes) exactly like the plain spec dictionary.
+    """
+
+    def __init__(self, spec: Dict[str, Any]):
+        super().__init__(spec)
+        self.argument_templates = compile_arguments(self)
+        self.input_validator = InputValidator(self)
@@ -1,8 +1,14 @@
+from .template import compile_arguments
+from .inputs import InputValidator, known_format
+
+
 class JobSpecValidator:
     VALID_INPUT_TYPES = {"string", "number", "boolean", "file"}
     REQUIRED_FIELDS = {"name", "description", "expectedInputs", "execution"}
     REQUIRED_EXECUTION_FIELDS = {"application", "arguments"}
     REQUIRED_INPUT_FIELDS = {"id", "type", "name", "description"}
+    VALID_EXECUTION_MODES = {"subprocess", "warm"}
+    VALID_RESOURCE_HINTS = {"memoryMb", "cores"}
 
     def validate(self, spec):
         """Validate a job specification."""
@@ -14,6 +20,16 @@ class JobSpecValidator:
         
         # Validate execution
         self._validate_execution(spec.get("execution", {}))
+
+        # Validate optional flags
+        if not isinstance(spec.get("cacheable", True), bool):
+            raise ValueError("cacheable must be a boolean")
+
+        # Validate resource hints
+        self._validate_resources(spec.get("resources", {}))
+
+        # Validate input references in execution arguments
+        self._validate_references(spec)
         
         return True
 
@@ -38,6 +54,47 @@ class JobSpecValidator:
             if input_spec["type"] not in self.VALID_INPUT_TYPES:
                 raise ValueError(f"Invalid input type: {input_spec['type']}. Must be one of {self.VALID_INPUT_TYPES}")
 
+            self._validate_constraints(input_spec)
+
+    def _validate_constraints(self, input_spec):
+        """Validate an input's optional value constraints and default."""
+        input_id = input_spec["id"]
+        input_type = input_spec["type"]
+
+        for field in ("min", "max"):
+            value = input_spec.get(field)
+            if value is None:
+                continue
+            if input_type != "number" or isinstance(value, bool) or not isinstance(value, (int, float)):
+                raise ValueError(f"Input {input_id} {field} must be a number and only applies to number inputs")
+        if input_spec.get("min") is not None and input_spec.get("max") is not None and input_spec["min"] > input_spec["max"]:
+            raise ValueError(f"Input {input_id} min is greater than its max")
+
+        for field in ("integer", "required", "optional"):
+            if not isinstance(input_spec.get(field, False), bool):
+                raise ValueError(f"Input {input_id} {field} must be a boolean")
+
+        options = input_spec.get("options")
+        if options is not None:
+            if input_type not in ("string", "number") or not isinstance(options, list) or not options:
+                raise ValueError(f"Input {input_id} options must be a non-empty list on a string or number input")
+
+        formats = input_spec.get("supportedFormats")
+        if formats is not None:
+            if input_type != "file" or not isinstance(formats, list) or not all(isinstance(f, str) for f in formats):
+                raise ValueError(f"Input {input_id} supportedFormats must be a list of strings on a file input")
+            unknown = [f for f in formats if not known_format(f.lower())]
+            if unknown:
+                raise ValueError(f"Input {input_id} has unrecognized supportedFormats: {unknown}")
+
+        if input_spec.get("default") is not None:
+            if input_type == "file":
+                raise ValueError(f"Input {input_id} is a file and cannot have a default")
+            try:
+                InputValidator({"expectedInputs": [input_spec]}).validate({input_id: input_spec["default"]})
+            except ValueError as e:
+                raise ValueError(f"Input {input_id} default is invalid: {e}")
+
     def _validate_execution(self, execution):
         """Validate the execution section."""
         # Check required execution fields
@@ -47,4 +104,39 @@ class JobSpecValidator:
 
         # Validate arguments is a list
         if not isinstance(execution["arguments"], list):
-            raise ValueError("Execution arguments must be a list") 
\ No newline at end of file
+            raise ValueError("Execution arguments must be a list")
+
+        # Validate execution mode
+        mode = execution.get("mode", "subprocess")
+        if mode not in self.VALID_EXECUTION_MODES:
+            raise ValueError(f"Invalid execution mode: {mode}. Must be one of {self.VALID_EXECUTION_MODES}")
+        if mode == "warm":
+            arguments = execution["arguments"]
+            if len(arguments) < 2 or arguments[0] != "-c" or not isinstance(arguments[1], str):
+                raise ValueError("Warm execution requires arguments of the form ['-c', <script>, ...]")
+            preload = execution.get("preload", [])
+            if not isinstance(preload, list) or not all(isinstance(name, str) for name in preload):
+                raise ValueError("Execution preload must be a list of module names")
+
+        # Validate time limits
+        for field in ("timeout", "gracePeriod"):
+            value = execution.get(field)
+            if value is not None and (isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0):
+                raise ValueError(f"Execution {field} must be a positive number of seconds")
+
+    def _validate_references(self, spec):
+        """Validate that execution arguments only reference declared inputs, by compiling them."""
+        compile_arguments(spec)
+
+    def _validate_resources(self, resources):
+        """Validate the optional resources hints section."""
+        if not isinstance(resources, dict):
+            raise ValueError("resources must be a dictionary")
+
+        unknown = set(resources) - self.VALID_RESOURCE_HINTS
+        if unknown:
+            raise ValueError(f"Unknown resource hints: {unknown}. Must be among {self.VALID_RESOURCE_HINTS}")
+
+        for hint, value in resources.items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)) or value <= 0:
+                raise ValueError(f"Resource hint {hint} must be a positive number")
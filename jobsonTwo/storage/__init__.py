@@ -0,0 +1,7 @@
+"""
+Job storage for JobsonTwo
+"""
+from .job_store import JobStore
+from .upload_store import UploadStore
+
+__all__ = ['JobStore', 'UploadStore']
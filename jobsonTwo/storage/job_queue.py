@@ -0,0 +1,276 @@
+import sqlite3
+import threading
+import time
+import uuid
+from typing import Dict, Any, Optional, List, Tuple
+from .job_store import JobStore
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS job_queue (
+    seq INTEGER PRIMARY KEY,
+    job_id TEXT NOT NULL UNIQUE,
+    spec_key TEXT NOT NULL,
+    max_concurrency INTEGER,
+    priority INTEGER NOT NULL DEFAULT 0,
+    enqueued_at REAL NOT NULL,
+    worker_id TEXT,
+    lease_expires REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    stop_requested INTEGER NOT NULL DEFAULT 0,
+    claim_id TEXT
+);
+
+CREATE INDEX IF NOT EXISTS idx_job_queue_ready ON job_queue (priority DESC, seq) WHERE worker_id IS NULL;
+CREATE INDEX IF NOT EXISTS idx_job_queue_leased ON job_queue (spec_key) WHERE worker_id IS NOT NULL;
+CREATE INDEX IF NOT EXISTS idx_job_queue_worker ON job_queue (worker_id);
+"""
+
+# Columns added after the initial schema, with the DDL that adds them to older databases
+MIGRATIONS = [
+    ('claim_id', 'ALTER TABLE job_queue ADD COLUMN claim_id TEXT'),
+]
+
+POST_MIGRATION_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_job_queue_claim ON job_queue (claim_id);
+"""
+
+CLAIM_QUERY = """
+SELECT q.seq, q.job_id FROM job_queue q
+WHERE q.worker_id IS NULL
+  AND (q.max_concurrency IS NULL OR (
+      SELECT COUNT(*) FROM job_queue r WHERE r.spec_key = q.spec_key AND r.worker_id IS NOT NULL
+  ) < q.max_concurrency)
+ORDER BY q.priority DESC, q.seq
+LIMIT 1
+"""
+
+
+class JobQueue:
+    """Durable job queue shared by the web tier and worker processes.
+
+    Rows live in a SQLite table next to the job records. Workers claim a job
+    by taking a lease on it and keep the lease alive with heartbeats; a job
+    whose lease runs out (its worker died or hung) is handed out again.
+    Every claim gets its own ``claim_id``, so a worker that lost a job and
+    later claimed it again can tell its two runs apart.
+    Stop requests are stored on the row and picked up by the owning worker
+    on its next heartbeat.
+
+    The ``submit``, ``submit_many``, ``stop`` and ``stats`` methods mirror
+    JobScheduler, so the web app can enqueue through either.
+    """
+
+    def __init__(self, job_store: JobStore, max_attempts: int = 3):
+        """Initialize the queue.
+
+        Args:
+            job_store: Store holding the queued jobs (the queue shares its database)
+            max_attempts: Times a job is handed out before a lost lease fails it
+        """
+        self.job_store = job_store
+        self.max_attempts = max_attempts
+        self._local = threading.local()
+        conn = self._connect()
+        conn.executescript(SCHEMA)
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(job_queue)')}
+        for column, ddl in MIGRATIONS:
+            if column not in columns:
+                conn.execute(ddl)
+        conn.executescript(POST_MIGRATION_SCHEMA)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's connection, in autocommit mode with explicit transactions."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.job_store.db_path, timeout=30, isolation_level=None)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _row_for(self, job_id: str, spec: Dict[str, Any], priority: Optional[int]) -> Tuple[Any, ...]:
+        if priority is None:
+            priority = int(spec.get('priority', 0))
+        spec_key = spec.get('id') or spec.get('name', '')
+        return (job_id, spec_key, spec.get('execution', {}).get('maxConcurrency'), priority, time.time())
+
+    def submit(self, job_id: str, spec: Dict[str, Any], inputs: Dict[str, Any], priority: Optional[int] = None) -> None:
+        """Queue a job for a worker to run.
+
+        Args:
+            job_id: Job identifier
+            spec: Job specification
+            inputs: Job input values (already stored with the job)
+            priority: Higher values run first (defaults to the spec's ``priority``)
+        """
+        self.submit_many([(job_id, spec, inputs)], priority)
+
+    def submit_many(self, jobs: List[Tuple[str, Dict[str, Any], Dict[str, Any]]], priority: Optional[int] = None) -> None:
+        """Queue many jobs in one transaction."""
+        if not jobs:
+            return
+        self.job_store.update_jobs_status([job_id for job_id, _, _ in jobs], 'queued')
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.executemany(
+                'INSERT OR IGNORE INTO job_queue (job_id, spec_key, max_concurrency, priority, enqueued_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                [self._row_for(job_id, spec, priority) for job_id, spec, _ in jobs]
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+    def claim(self, worker_id: str, lease_seconds: float) -> Optional[Tuple[str, str, float]]:
+        """Lease the next runnable job to a worker.
+
+        Jobs are taken by priority, then in submission order, skipping specs
+        already at their ``maxConcurrency`` across all workers.
+
+        Returns:
+            (job_id, claim_id, seconds the job waited in the queue), or None
+            if nothing is runnable
+        """
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(CLAIM_QUERY).fetchone()
+            if row is None:
+                conn.execute('COMMIT')
+                return None
+            now = time.time()
+            claim_id = uuid.uuid4().hex
+            conn.execute(
+                'UPDATE job_queue SET worker_id = ?, claim_id = ?, lease_expires = ?, attempts = attempts + 1 '
+                'WHERE seq = ?',
+                (worker_id, claim_id, now + lease_seconds, row['seq'])
+            )
+            waited = now - conn.execute('SELECT enqueued_at FROM job_queue WHERE seq = ?', (row['seq'],)).fetchone()[0]
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        return row['job_id'], claim_id, waited
+
+    def heartbeat(self, claim_ids: List[str], lease_seconds: float) -> Tuple[List[str], List[str]]:
+        """Extend the leases of some claims.
+
+        Returns:
+            (claim ids with a pending stop request, claim ids that no longer hold their job)
+        """
+        if not claim_ids:
+            return [], []
+        conn = self._connect()
+        placeholders = ', '.join('?' for _ in claim_ids)
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                f'UPDATE job_queue SET lease_expires = ? WHERE claim_id IN ({placeholders})',
+                [time.time() + lease_seconds, *claim_ids]
+            )
+            rows = conn.execute(
+                f'SELECT claim_id, stop_requested FROM job_queue WHERE claim_id IN ({placeholders})',
+                claim_ids
+            ).fetchall()
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        held = {row['claim_id'] for row in rows}
+        stop = [row['claim_id'] for row in rows if row['stop_requested']]
+        lost = [claim_id for claim_id in claim_ids if claim_id not in held]
+        return stop, lost
+
+    def complete(self, job_id: str, claim_id: str) -> None:
+        """Remove a finished job from the queue, if the claim still holds it."""
+        self._connect().execute('DELETE FROM job_queue WHERE job_id = ? AND claim_id = ?', (job_id, claim_id))
+
+    def release(self, job_id: str, claim_id: str) -> None:
+        """Hand a claimed job back without running it."""
+        self._connect().execute(
+            'UPDATE job_queue SET worker_id = NULL, claim_id = NULL, lease_expires = NULL, attempts = attempts - 1 '
+            'WHERE job_id = ? AND claim_id = ?',
+            (job_id, claim_id)
+        )
+
+    def requeue_expired(self) -> Tuple[List[str], List[str]]:
+        """Return jobs with lapsed leases to the queue, failing those out of attempts.
+
+        Returns:
+            (requeued job ids, failed job ids)
+        """
+        conn = self._connect()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            rows = conn.execute(
+                'SELECT job_id, attempts, stop_requested FROM job_queue '
+                'WHERE worker_id IS NOT NULL AND lease_expires < ?',
+                (time.time(),)
+            ).fetchall()
+            requeued = [r['job_id'] for r in rows if r['attempts'] < self.max_attempts and not r['stop_requested']]
+            dropped = [r['job_id'] for r in rows if r['job_id'] not in requeued]
+            conn.executemany(
+                'UPDATE job_queue SET worker_id = NULL, claim_id = NULL, lease_expires = NULL WHERE job_id = ?',
+                [(job_id,) for job_id in requeued]
+            )
+            conn.executemany('DELETE FROM job_queue WHERE job_id = ?', [(job_id,) for job_id in dropped])
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+        if requeued:
+            self.job_store.update_jobs_status(requeued, 'queued')
+        stopped = [r['job_id'] for r in rows if r['job_id'] in dropped and r['stop_requested']]
+        failed = [job_id for job_id in dropped if job_id not in stopped]
+        for job_id in stopped:
+            self.job_store.update_job_status(job_id, 'stopped')
+        for job_id in failed:
+            self.job_store.update_job_status(
+                job_id, 'failed', {'error': f"Worker lost the job {self.max_attempts} times"}
+            )
+        return requeued, failed
+
+    def cancel(self, job_id: str) -> bool:
+        """Remove a job that no worker has claimed yet.
+
+        Returns:
+            True if the job was still waiting, False otherwise
+        """
+        cursor = self._connect().execute('DELETE FROM job_queue WHERE job_id = ? AND worker_id IS NULL', (job_id,))
+        if cursor.rowcount:
+            self.job_store.update_job_status(job_id, 'stopped')
+            return True
+        return False
+
+    def stop(self, job_id: str) -> Optional[str]:
+        """Stop a job wherever it is.
+
+        Returns:
+            'stopped' if it was still queued, 'stopping' if the owning
+            worker was asked to stop it, None if it is not in the queue
+        """
+        if self.cancel(job_id):
+            return 'stopped'
+        cursor = self._connect().execute('UPDATE job_queue SET stop_requested = 1 WHERE job_id = ?', (job_id,))
+        return 'stopping' if cursor.rowcount else None
+
+    def is_queued(self, job_id: str) -> bool:
+        """Check whether a job is waiting for a worker."""
+        row = self._connect().execute(
+            'SELECT 1 FROM job_queue WHERE job_id = ? AND worker_id IS NULL', (job_id,)
+        ).fetchone()
+        return row is not None
+
+    def stats(self) -> Dict[str, Any]:
+        """Return queue depth and leased jobs per worker."""
+        conn = self._connect()
+        queued = conn.execute('SELECT COUNT(*) FROM job_queue WHERE worker_id IS NULL').fetchone()[0]
+        workers = {
+            row['worker_id']: row['count'] for row in conn.execute(
+                'SELECT worker_id, COUNT(*) AS count FROM job_queue WHERE worker_id IS NOT NULL GROUP BY worker_id'
+            )
+        }
+        return {'queued': queued, 'running': sum(workers.values()), 'running_by_worker': workers}
@@ -0,0 +1,718 @@
+import os
+import base64
+import json
+import shutil
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple, Iterator, Callable, Iterable
+from ..metrics import STORE_OP_SECONDS
+
+TERMINAL_STATUSES = {'completed', 'failed', 'stopped'}
+
+# Columns returned for lightweight job listings (no spec, inputs or results)
+SUMMARY_COLUMNS = ('id', 'name', 'description', 'type', 'status', 'created_at', 'started_at', 'completed_at', 'batch_id',
+                   'archived_at')
+
+# Columns returned by status checks
+STATUS_COLUMNS = ('id', 'status', 'created_at', 'started_at', 'completed_at', 'archived_at')
+
+
+def encode_cursor(created_at: str, job_id: str) -> str:
+    """Encode a keyset position as an opaque URL-safe cursor."""
+    raw = json.dumps([created_at, job_id]).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """Decode a cursor produced by encode_cursor."""
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, job_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+        return str(created_at), str(job_id)
+    except Exception:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    name TEXT NOT NULL,
+    description TEXT NOT NULL DEFAULT '',
+    type TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    started_at TEXT,
+    completed_at TEXT,
+    spec TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    results TEXT,
+    batch_id TEXT,
+    archived_at TEXT,
+    owner TEXT
+);
+
+CREATE TABLE IF NOT EXISTS batches (
+    id TEXT PRIMARY KEY,
+    type TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    size INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS pipeline_runs (
+    id TEXT PRIMARY KEY,
+    pipeline TEXT NOT NULL,
+    name TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    completed_at TEXT,
+    definition TEXT NOT NULL,
+    specs TEXT NOT NULL,
+    inputs TEXT NOT NULL,
+    steps TEXT NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_pipeline_runs_status ON pipeline_runs (status);
+
+CREATE INDEX IF NOT EXISTS idx_jobs_created ON jobs (created_at, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_status_created ON jobs (status, created_at, id);
+CREATE INDEX IF NOT EXISTS idx_jobs_type_created ON jobs (type, created_at, id);
+
+CREATE TABLE IF NOT EXISTS job_counts (
+    status TEXT PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+
+CREATE TRIGGER IF NOT EXISTS trg_jobs_insert AFTER INSERT ON jobs
+BEGIN
+    INSERT INTO job_counts (status, count) VALUES (NEW.status, 1)
+    ON CONFLICT (status) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_jobs_status AFTER UPDATE OF status ON jobs
+WHEN OLD.status != NEW.status
+BEGIN
+    UPDATE job_counts SET count = count - 1 WHERE status = OLD.status;
+    INSERT INTO job_counts (status, count) VALUES (NEW.status, 1)
+    ON CONFLICT (status) DO UPDATE SET count = count + 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS trg_jobs_delete AFTER DELETE ON jobs
+BEGIN
+    UPDATE job_counts SET count = count - 1 WHERE status = OLD.status;
+END;
+"""
+
+INSERT_JOB = (
+    'INSERT INTO jobs (id, name, description, type, status, created_at, spec, inputs, batch_id) '
+    'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)'
+)
+
+# Columns added after the initial schema, with the DDL that adds them to older databases
+MIGRATIONS = [
+    ('batch_id', 'ALTER TABLE jobs ADD COLUMN batch_id TEXT'),
+    ('archived_at', 'ALTER TABLE jobs ADD COLUMN archived_at TEXT'),
+    ('owner', 'ALTER TABLE jobs ADD COLUMN owner TEXT'),
+]
+
+POST_MIGRATION_SCHEMA = """
+CREATE INDEX IF NOT EXISTS idx_jobs_batch_status ON jobs (batch_id, status);
+"""
+
+
+class JobStore:
+    """Persists job metadata in an embedded SQLite database.
+
+    Job files (inputs, outputs, logs) live in ``jobs_dir/<job_id>``, or in
+    ``jobs_dir/<job_id>.zip`` once the job has been archived; the
+    database holds the job records, indexed by status and creation time,
+    and a per-status counter table kept up to date by triggers.
+
+    Status changes made through this store wake threads blocked in
+    ``wait_for_update``. Changes made by other processes (such as queue
+    workers) are only seen by re-reading, so waiters can be given a poll
+    interval as well.
+    """
+
+    def __init__(self, jobs_dir: str, db_path: Optional[str] = None):
+        """Initialize the job store.
+
+        Args:
+            jobs_dir: Directory holding per-job working directories
+            db_path: SQLite database file (defaults to ``jobs_dir/jobs.db``)
+        """
+        self.jobs_dir = jobs_dir
+        os.makedirs(jobs_dir, exist_ok=True)
+        self.db_path = db_path or os.path.join(jobs_dir, 'jobs.db')
+        self._local = threading.local()
+        self._watch_lock = threading.Lock()
+        self._watchers: Dict[str, List[threading.Event]] = {}
+
+        conn = self._connect()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        self._migrate(conn)
+        conn.executescript(POST_MIGRATION_SCHEMA)
+        conn.commit()
+
+    def _migrate(self, conn: sqlite3.Connection) -> None:
+        """Add columns missing from databases created by older versions."""
+        columns = {row['name'] for row in conn.execute('PRAGMA table_info(jobs)')}
+        for column, ddl in MIGRATIONS:
+            if column not in columns:
+                conn.execute(ddl)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Return this thread's database connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    def _row_to_job(self, row: sqlite3.Row) -> Dict[str, Any]:
+        job = dict(row)
+        job['spec'] = json.loads(job['spec'])
+        job['inputs'] = json.loads(job['inputs'])
+        job['results'] = json.loads(job['results']) if job['results'] else None
+        return job
+
+    @STORE_OP_SECONDS.timed('create_job')
+    def create_job(self, spec: Dict[str, Any], inputs: Dict[str, Any], name: str, description: str = '') -> str:
+        """Create a new pending job.
+
+        Args:
+            spec: Job specification
+            inputs: Job input values
+            name: Display name
+            description: Optional description
+
+        Returns:
+            The new job identifier
+        """
+        job_id, row = self._new_job_row(json.dumps(spec), self._job_type(spec), inputs, name, description)
+        conn = self._connect()
+        with conn:
+            conn.execute(INSERT_JOB, row)
+        return job_id
+
+    @STORE_OP_SECONDS.timed('create_batch')
+    def create_batch(self, spec: Dict[str, Any], jobs: List[Dict[str, Any]]) -> Tuple[str, List[str]]:
+        """Create a batch of pending jobs in a single transaction.
+
+        Args:
+            spec: Job specification shared by every job in the batch
+            jobs: Dicts with 'inputs', 'name' and optional 'description'
+
+        Returns:
+            Tuple of (batch_id, job_ids) with job ids in the order given
+        """
+        batch_id = str(uuid.uuid4())
+        spec_json = json.dumps(spec)
+        job_type = self._job_type(spec)
+        job_ids = []
+        rows = []
+        for job in jobs:
+            job_id, row = self._new_job_row(spec_json, job_type, job['inputs'], job['name'], job.get('description', ''), batch_id)
+            job_ids.append(job_id)
+            rows.append(row)
+
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT INTO batches (id, type, created_at, size) VALUES (?, ?, ?, ?)',
+                (batch_id, job_type, datetime.now().isoformat(timespec='microseconds'), len(rows))
+            )
+            conn.executemany(INSERT_JOB, rows)
+        return batch_id, job_ids
+
+    @STORE_OP_SECONDS.timed('get_batch')
+    def get_batch(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """Get a batch with its job counts by status, or None if it does not exist."""
+        conn = self._connect()
+        row = conn.execute('SELECT * FROM batches WHERE id = ?', (batch_id,)).fetchone()
+        if not row:
+            return None
+        batch = dict(row)
+        batch['counts'] = {
+            status: count for status, count in conn.execute(
+                'SELECT status, COUNT(*) FROM jobs WHERE batch_id = ? GROUP BY status', (batch_id,)
+            )
+        }
+        return batch
+
+    @STORE_OP_SECONDS.timed('list_batch_jobs')
+    def list_batch_jobs(self, batch_id: str) -> List[Dict[str, Any]]:
+        """List every job in a batch, oldest first."""
+        rows = self._connect().execute(
+            'SELECT * FROM jobs WHERE batch_id = ? ORDER BY created_at, id', (batch_id,)
+        ).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    @STORE_OP_SECONDS.timed('create_pipeline_run')
+    def create_pipeline_run(self, pipeline: Dict[str, Any], specs: Dict[str, Dict[str, Any]], inputs: Dict[str, Any],
+                            name: str, steps: List[Dict[str, Any]]) -> Tuple[str, Dict[str, str]]:
+        """Create a pipeline run and a pending job for each of its steps in one transaction.
+
+        Args:
+            pipeline: Pipeline definition, stored with the run
+            specs: Job spec of each step, keyed by step id
+            inputs: Pipeline input values
+            name: Display name of the run
+            steps: Dicts with 'step_id', 'inputs', 'name' and optional 'description'
+
+        Returns:
+            Tuple of (run_id, job ids keyed by step id)
+        """
+        run_id = str(uuid.uuid4())
+        step_jobs, rows = self._new_step_rows(specs, steps)
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'INSERT INTO pipeline_runs (id, pipeline, name, status, created_at, definition, specs, inputs, steps) '
+                'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                (run_id, pipeline.get('id') or pipeline['name'], name, 'running',
+                 datetime.now().isoformat(timespec='microseconds'), json.dumps(pipeline), json.dumps(specs),
+                 json.dumps(inputs), json.dumps(step_jobs))
+            )
+            conn.executemany(INSERT_JOB, rows)
+        return run_id, step_jobs
+
+    @STORE_OP_SECONDS.timed('restart_pipeline_run')
+    def restart_pipeline_run(self, run_id: str, steps: List[Dict[str, Any]]) -> Dict[str, str]:
+        """Give some steps of a finished run new pending jobs and mark the run running again.
+
+        Args:
+            run_id: Pipeline run identifier
+            steps: Steps to run again, as for create_pipeline_run
+
+        Returns:
+            The run's job ids keyed by step id, after the restart
+        """
+        conn = self._connect()
+        with conn:
+            row = conn.execute('SELECT specs, steps FROM pipeline_runs WHERE id = ?', (run_id,)).fetchone()
+            step_jobs = json.loads(row['steps'])
+            new_jobs, rows = self._new_step_rows(json.loads(row['specs']), steps)
+            step_jobs.update(new_jobs)
+            conn.executemany(INSERT_JOB, rows)
+            conn.execute(
+                "UPDATE pipeline_runs SET status = 'running', completed_at = NULL, steps = ? WHERE id = ?",
+                (json.dumps(step_jobs), run_id)
+            )
+        return step_jobs
+
+    def _new_step_rows(self, specs: Dict[str, Dict[str, Any]], steps: List[Dict[str, Any]]) -> Tuple[Dict[str, str], List[tuple]]:
+        step_jobs = {}
+        rows = []
+        for step in steps:
+            spec = specs[step['step_id']]
+            job_id, row = self._new_job_row(json.dumps(spec), self._job_type(spec), step['inputs'], step['name'],
+                                            step.get('description', ''))
+            step_jobs[step['step_id']] = job_id
+            rows.append(row)
+        return step_jobs, rows
+
+    def _row_to_pipeline_run(self, row: sqlite3.Row) -> Dict[str, Any]:
+        run = dict(row)
+        for column in ('definition', 'specs', 'inputs', 'steps'):
+            run[column] = json.loads(run[column])
+        return run
+
+    @STORE_OP_SECONDS.timed('get_pipeline_run')
+    def get_pipeline_run(self, run_id: str) -> Optional[Dict[str, Any]]:
+        """Get a pipeline run by id, or None if it does not exist."""
+        row = self._connect().execute('SELECT * FROM pipeline_runs WHERE id = ?', (run_id,)).fetchone()
+        return self._row_to_pipeline_run(row) if row else None
+
+    @STORE_OP_SECONDS.timed('list_active_pipeline_runs')
+    def list_active_pipeline_runs(self) -> List[Dict[str, Any]]:
+        """List pipeline runs that still have steps to run, oldest first."""
+        rows = self._connect().execute(
+            "SELECT * FROM pipeline_runs WHERE status = 'running' ORDER BY created_at, id"
+        ).fetchall()
+        return [self._row_to_pipeline_run(row) for row in rows]
+
+    @STORE_OP_SECONDS.timed('finish_pipeline_run')
+    def finish_pipeline_run(self, run_id: str, status: str) -> None:
+        """Record the final status of a pipeline run."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'UPDATE pipeline_runs SET status = ?, completed_at = ? WHERE id = ?',
+                (status, datetime.now().isoformat(timespec='microseconds'), run_id)
+            )
+
+    def _job_type(self, spec: Dict[str, Any]) -> str:
+        return spec.get('id') or spec.get('name', '')
+
+    def _new_job_row(self, spec_json: str, job_type: str, inputs: Dict[str, Any], name: str, description: str,
+                     batch_id: Optional[str] = None) -> Tuple[str, tuple]:
+        job_id = str(uuid.uuid4())
+        return job_id, (
+            job_id,
+            name,
+            description or '',
+            job_type,
+            'pending',
+            datetime.now().isoformat(timespec='microseconds'),
+            spec_json,
+            json.dumps(inputs),
+            batch_id,
+        )
+
+    @STORE_OP_SECONDS.timed('get_job')
+    def get_job(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Get a job by id, or None if it does not exist."""
+        row = self._connect().execute('SELECT * FROM jobs WHERE id = ?', (job_id,)).fetchone()
+        return self._row_to_job(row) if row else None
+
+    @STORE_OP_SECONDS.timed('get_jobs')
+    def get_jobs(self, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get many jobs by id in one query; missing jobs are left out."""
+        if not job_ids:
+            return {}
+        placeholders = ', '.join('?' for _ in job_ids)
+        rows = self._connect().execute(f'SELECT * FROM jobs WHERE id IN ({placeholders})', list(job_ids)).fetchall()
+        return {row['id']: self._row_to_job(row) for row in rows}
+
+    @STORE_OP_SECONDS.timed('get_job_statuses')
+    def get_job_statuses(self, job_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """Get the status and timestamps of many jobs without loading specs, inputs or results."""
+        if not job_ids:
+            return {}
+        placeholders = ', '.join('?' for _ in job_ids)
+        rows = self._connect().execute(
+            f"SELECT {', '.join(STATUS_COLUMNS)} FROM jobs WHERE id IN ({placeholders})", list(job_ids)
+        ).fetchall()
+        return {row['id']: dict(row) for row in rows}
+
+    def wait_for_update(self, job_ids: List[str], changed: Callable[[Dict[str, Dict[str, Any]]], bool],
+                        timeout: float, poll_interval: Optional[float] = None) -> Dict[str, Dict[str, Any]]:
+        """Block until the statuses of some jobs satisfy ``changed`` or the timeout passes.
+
+        The statuses are re-read whenever this store changes one of the jobs,
+        and every ``poll_interval`` seconds if given.
+
+        Args:
+            job_ids: Jobs to watch
+            changed: Called with the current statuses (as from get_job_statuses)
+            timeout: Maximum seconds to wait
+            poll_interval: Seconds between re-reads without a notification
+
+        Returns:
+            The statuses last read
+        """
+        event = threading.Event()
+        self._watch(job_ids, event)
+        try:
+            deadline = time.monotonic() + timeout
+            while True:
+                event.clear()
+                statuses = self.get_job_statuses(job_ids)
+                remaining = deadline - time.monotonic()
+                if changed(statuses) or remaining <= 0:
+                    return statuses
+                event.wait(min(remaining, poll_interval) if poll_interval else remaining)
+        finally:
+            self._unwatch(job_ids, event)
+
+    def _watch(self, job_ids: Iterable[str], event: threading.Event) -> None:
+        with self._watch_lock:
+            for job_id in job_ids:
+                self._watchers.setdefault(job_id, []).append(event)
+
+    def _unwatch(self, job_ids: Iterable[str], event: threading.Event) -> None:
+        with self._watch_lock:
+            for job_id in job_ids:
+                events = self._watchers.get(job_id)
+                if events is None:
+                    continue
+                events.remove(event)
+                if not events:
+                    del self._watchers[job_id]
+
+    def _notify(self, job_ids: Iterable[str]) -> None:
+        """Wake threads waiting on any of these jobs."""
+        if not self._watchers:
+            return
+        with self._watch_lock:
+            events = [event for job_id in job_ids for event in self._watchers.get(job_id, ())]
+        for event in events:
+            event.set()
+
+    @STORE_OP_SECONDS.timed('queue_pending_job')
+    def queue_pending_job(self, job_id: str, inputs: Dict[str, Any], owner: Optional[str] = None) -> bool:
+        """Store the final inputs of a pending job and mark it queued.
+
+        Args:
+            job_id: Job identifier
+            inputs: Final input values
+            owner: Process taking the job, as for update_job_status
+
+        Returns:
+            True if the job was pending, False if it was already taken (for
+            instance by another process) or no longer exists
+        """
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(
+                "UPDATE jobs SET inputs = ?, status = 'queued', owner = ? WHERE id = ? AND status = 'pending'",
+                (json.dumps(inputs), owner, job_id)
+            )
+        self._notify([job_id])
+        return cursor.rowcount > 0
+
+    @STORE_OP_SECONDS.timed('update_job_status')
+    def update_job_status(self, job_id: str, status: str, results: Optional[Dict[str, Any]] = None,
+                          claim_id: Optional[str] = None, owner: Optional[str] = None) -> bool:
+        """Update a job's status and optionally its results.
+
+        Args:
+            job_id: Job identifier
+            status: New status
+            results: Results dictionary to store with the job
+            claim_id: Only update while this job queue claim holds the job
+                with an unexpired lease, so a worker that lost the job cannot
+                overwrite the run that replaced it
+            owner: Record this process as the one holding the job, so
+                recovery after a restart leaves jobs of live processes alone
+
+        Returns:
+            True if the job was updated, False if it does not exist (or the
+            claim no longer holds it)
+        """
+        assignments, params = self._status_assignments(status, owner)
+        if results is not None:
+            assignments.append('results = ?')
+            params.append(json.dumps(results))
+        params.append(job_id)
+        condition = 'id = ?'
+        if claim_id is not None:
+            condition += (' AND EXISTS (SELECT 1 FROM job_queue WHERE job_queue.job_id = jobs.id'
+                          ' AND job_queue.claim_id = ? AND job_queue.lease_expires > ?)')
+            params.extend([claim_id, time.time()])
+
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute(f"UPDATE jobs SET {', '.join(assignments)} WHERE {condition}", params)
+        self._notify([job_id])
+        return cursor.rowcount > 0
+
+    @STORE_OP_SECONDS.timed('update_jobs_status')
+    def update_jobs_status(self, job_ids: List[str], status: str, owner: Optional[str] = None) -> None:
+        """Set the status (and owner) of many jobs in a single transaction, stamping times as update_job_status does."""
+        assignments, params = self._status_assignments(status, owner)
+        conn = self._connect()
+        with conn:
+            conn.executemany(
+                f"UPDATE jobs SET {', '.join(assignments)} WHERE id = ?",
+                [(*params, job_id) for job_id in job_ids]
+            )
+        self._notify(job_ids)
+
+    def _status_assignments(self, status: str, owner: Optional[str] = None) -> Tuple[List[str], List[Any]]:
+        """Return the SET clauses and parameters for a status change, with its timestamp."""
+        now = datetime.now().isoformat(timespec='microseconds')
+        assignments = ['status = ?']
+        params: List[Any] = [status]
+        if status == 'running':
+            assignments.append('started_at = ?')
+            params.append(now)
+        elif status in TERMINAL_STATUSES:
+            assignments.append('completed_at = ?')
+            params.append(now)
+        if owner is not None:
+            assignments.append('owner = ?')
+            params.append(owner)
+        return assignments, params
+
+    @STORE_OP_SECONDS.timed('list_unfinished_owners')
+    def list_unfinished_owners(self) -> List[Optional[str]]:
+        """Return the distinct owners of ``queued`` and ``running`` jobs (None for jobs with no owner)."""
+        rows = self._connect().execute(
+            "SELECT DISTINCT owner FROM jobs WHERE status IN ('queued', 'running')"
+        ).fetchall()
+        return [row[0] for row in rows]
+
+    @STORE_OP_SECONDS.timed('fail_owned_jobs')
+    def fail_owned_jobs(self, owner: Optional[str], error: str) -> List[str]:
+        """Mark the ``running`` jobs of an owner that exited failed.
+
+        Args:
+            owner: Owner whose jobs are failed (None for jobs with no owner)
+            error: Message stored as the jobs' ``error`` result
+
+        Returns:
+            IDs of the jobs that were failed
+        """
+        now = datetime.now().isoformat(timespec='microseconds')
+        results = json.dumps({'error': error})
+        conn = self._connect()
+        rows = conn.execute("SELECT id FROM jobs WHERE status = 'running' AND owner IS ?", (owner,)).fetchall()
+        job_ids = []
+        with conn:
+            for row in rows:
+                cursor = conn.execute(
+                    "UPDATE jobs SET status = 'failed', completed_at = ?, results = ? "
+                    "WHERE id = ? AND status = 'running' AND owner IS ?",
+                    (now, results, row[0], owner)
+                )
+                if cursor.rowcount:
+                    job_ids.append(row[0])
+        self._notify(job_ids)
+        return job_ids
+
+    @STORE_OP_SECONDS.timed('adopt_queued_jobs')
+    def adopt_queued_jobs(self, owner: Optional[str], new_owner: str) -> List[Dict[str, Any]]:
+        """Take over the ``queued`` jobs of an owner that exited, oldest first.
+
+        Each job is handed over with a conditional update, so when several
+        processes recover at once every job goes to exactly one of them.
+
+        Returns:
+            The jobs taken over
+        """
+        conn = self._connect()
+        rows = conn.execute(
+            "SELECT * FROM jobs WHERE status = 'queued' AND owner IS ? ORDER BY created_at, id", (owner,)
+        ).fetchall()
+        adopted = []
+        with conn:
+            for row in rows:
+                cursor = conn.execute(
+                    "UPDATE jobs SET owner = ? WHERE id = ? AND status = 'queued' AND owner IS ?",
+                    (new_owner, row['id'], owner)
+                )
+                if cursor.rowcount:
+                    adopted.append(self._row_to_job(row))
+        return adopted
+
+    @STORE_OP_SECONDS.timed('list_jobs')
+    def list_jobs(self, limit: Optional[int] = None, status: Optional[str] = None) -> List[Dict[str, Any]]:
+        """List jobs, newest first.
+
+        Args:
+            limit: Maximum number of jobs to return
+            status: Only return jobs with this status
+        """
+        query = 'SELECT * FROM jobs'
+        params: List[Any] = []
+        if status:
+            query += ' WHERE status = ?'
+            params.append(status)
+        query += ' ORDER BY created_at DESC, id DESC'
+        if limit is not None:
+            query += ' LIMIT ?'
+            params.append(limit)
+        rows = self._connect().execute(query, params).fetchall()
+        return [self._row_to_job(row) for row in rows]
+
+    @STORE_OP_SECONDS.timed('list_jobs_page')
+    def list_jobs_page(self, limit: int = 50, status: Optional[str] = None, job_type: Optional[str] = None,
+                       cursor: Optional[str] = None, summary: bool = False) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """List one page of jobs, newest first, using keyset pagination.
+
+        Args:
+            limit: Page size
+            status: Only return jobs with this status
+            job_type: Only return jobs of this spec type
+            cursor: Cursor returned with the previous page
+            summary: Only return the lightweight summary columns
+
+        Returns:
+            Tuple of (jobs, next_cursor); next_cursor is None on the last page
+        """
+        columns = ', '.join(SUMMARY_COLUMNS) if summary else '*'
+        conditions = []
+        params: List[Any] = []
+        if status:
+            conditions.append('status = ?')
+            params.append(status)
+        if job_type:
+            conditions.append('type = ?')
+            params.append(job_type)
+        if cursor:
+            created_at, job_id = decode_cursor(cursor)
+            conditions.append('(created_at, id) < (?, ?)')
+            params.extend([created_at, job_id])
+
+        query = f'SELECT {columns} FROM jobs'
+        if conditions:
+            query += ' WHERE ' + ' AND '.join(conditions)
+        query += ' ORDER BY created_at DESC, id DESC LIMIT ?'
+        params.append(limit + 1)
+
+        rows = self._connect().execute(query, params).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1]['created_at'], rows[-1]['id'])
+        jobs = [dict(row) if summary else self._row_to_job(row) for row in rows]
+        return jobs, next_cursor
+
+    @STORE_OP_SECONDS.timed('count_jobs')
+    def count_jobs(self, status: Optional[str] = None) -> int:
+        """Count jobs, optionally by status, from the maintained counters."""
+        conn = self._connect()
+        if status:
+            row = conn.execute('SELECT count FROM job_counts WHERE status = ?', (status,)).fetchone()
+        else:
+            row = conn.execute('SELECT SUM(count) FROM job_counts').fetchone()
+        return (row[0] or 0) if row else 0
+
+    @STORE_OP_SECONDS.timed('delete_job')
+    def delete_job(self, job_id: str) -> bool:
+        """Delete a job record and its working directory.
+
+        Returns:
+            True if the job existed, False otherwise
+        """
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute('DELETE FROM jobs WHERE id = ?', (job_id,))
+        shutil.rmtree(os.path.join(self.jobs_dir, job_id), ignore_errors=True)
+        if os.path.exists(self.archive_path(job_id)):
+            os.remove(self.archive_path(job_id))
+        self._notify([job_id])
+        return cursor.rowcount > 0
+
+    def archive_path(self, job_id: str) -> str:
+        """Return the path of a job's archive (which may not exist)."""
+        return os.path.join(self.jobs_dir, f'{job_id}.zip')
+
+    @STORE_OP_SECONDS.timed('mark_archived')
+    def mark_archived(self, job_id: str) -> None:
+        """Record that a job's directory has been replaced by its archive."""
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                'UPDATE jobs SET archived_at = ? WHERE id = ?',
+                (datetime.now().isoformat(timespec='microseconds'), job_id)
+            )
+        self._notify([job_id])
+
+    @STORE_OP_SECONDS.timed('list_finished_jobs')
+    def list_finished_jobs(self) -> List[Dict[str, Any]]:
+        """Return summaries of jobs in a terminal status, oldest completion first."""
+        placeholders = ', '.join('?' for _ in TERMINAL_STATUSES)
+        rows = self._connect().execute(
+            f"SELECT {', '.join(SUMMARY_COLUMNS)} FROM jobs WHERE status IN ({placeholders}) "
+            "ORDER BY COALESCE(completed_at, created_at), id",
+            sorted(TERMINAL_STATUSES)
+        ).fetchall()
+        return [dict(row) for row in rows]
+
+    def iter_job_inputs(self, chunk_size: int = 1000) -> Iterator[Tuple[str, Dict[str, Any], bool]]:
+        """Yield (job_id, inputs, archived) for every job without loading them all at once."""
+        cursor = self._connect().execute('SELECT id, inputs, archived_at FROM jobs')
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            for row in rows:
+                yield row['id'], json.loads(row['inputs']), row['archived_at'] is not None
@@ -0,0 +1,395 @@
+import fcntl
+import os
+import shutil
+import stat
+import threading
+import time
+import tempfile
+import zipfile
+from datetime import datetime
+from typing import Dict, Any, Optional, List, Tuple, IO
+from .job_store import JobStore
+from .upload_store import UploadStore
+from ..execution.compression import is_sidecar
+
+# Extensions of already-compressed files, stored in archives without recompressing
+STORED_EXTENSIONS = {'.zip', '.gz', '.bz2', '.xz', '.zst', '.png', '.jpg', '.jpeg', '.gif', '.webp'}
+
+
+def directory_size(path: str) -> int:
+    """Return the total size of the files under a directory."""
+    total = 0
+    try:
+        with os.scandir(path) as it:
+            for entry in it:
+                if entry.is_dir(follow_symlinks=False):
+                    total += directory_size(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    total += entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        pass
+    return total
+
+
+def archive_job_dir(job_dir: str, archive_path: str) -> int:
+    """Pack a job directory into a zip archive written atomically.
+
+    The directory itself is left in place for the caller to remove.
+    Precompressed sidecars are left out, since files are served from the
+    archive uncompressed.
+
+    Returns:
+        Size of the archive in bytes
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(archive_path), prefix='.archive-', suffix='.tmp')
+    try:
+        with os.fdopen(fd, 'wb') as f, zipfile.ZipFile(f, 'w', zipfile.ZIP_DEFLATED) as archive:
+            for root, _, files in os.walk(job_dir):
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    if is_sidecar(path):
+                        continue
+                    ext = os.path.splitext(name)[1].lower()
+                    compression = zipfile.ZIP_STORED if ext in STORED_EXTENSIONS else zipfile.ZIP_DEFLATED
+                    archive.write(path, os.path.relpath(path, job_dir), compress_type=compression)
+        os.replace(tmp_path, archive_path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+    return os.path.getsize(archive_path)
+
+
+def open_archived_file(archive_path: str, job_dir: str, path: str) -> Optional[Tuple[IO[bytes], zipfile.ZipInfo]]:
+    """Open a file from a job's archive by its original path in the job directory.
+
+    Returns:
+        Tuple of (readable file, zip entry info), or None if the archive or
+        member does not exist
+    """
+    member = os.path.relpath(os.path.abspath(path), os.path.abspath(job_dir))
+    if member.startswith(os.pardir):
+        return None
+    try:
+        archive = zipfile.ZipFile(archive_path)
+    except (OSError, zipfile.BadZipFile):
+        return None
+    try:
+        info = archive.getinfo(member.replace(os.sep, '/'))
+    except KeyError:
+        archive.close()
+        return None
+    # The member keeps a reference to the archive, which is closed with it
+    return archive.open(info), info
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[float]:
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except ValueError:
+        return None
+
+
+class RetentionService:
+    """Background clean-up of finished jobs and unused uploads.
+
+    Each pass, in order:
+
+    1. Deletes finished jobs older than their TTL. A per-spec TTL takes
+       precedence over the TTL for the job's status; jobs without either are
+       kept.
+    2. Archives finished job directories older than ``archive_after`` into
+       ``<job_id>.zip``. Results stay in the job store and files remain
+       downloadable from the archive.
+    3. Deletes the oldest finished jobs while job files exceed ``jobs_quota``.
+    4. Removes uploads no job references once they are older than
+       ``upload_grace``, if set. While uploads exceed ``uploads_quota``, it also
+       removes uploads referenced only by archived jobs, oldest first,
+       since those jobs keep their own copy of each input.
+    """
+
+    def __init__(self, job_store: JobStore, upload_store: Optional[UploadStore] = None,
+                 status_ttls: Optional[Dict[str, float]] = None, spec_ttls: Optional[Dict[str, float]] = None,
+                 archive_after: Optional[float] = None, jobs_quota: Optional[int] = None,
+                 uploads_quota: Optional[int] = None, upload_grace: Optional[float] = None,
+                 interval: float = 600.0):
+        """Initialize the retention service.
+
+        Args:
+            job_store: Store whose finished jobs are managed
+            upload_store: Store whose unreferenced uploads are collected
+            status_ttls: Seconds to keep finished jobs, keyed by status
+            spec_ttls: Seconds to keep finished jobs, keyed by spec id
+            archive_after: Seconds after completion before a job is archived
+            jobs_quota: Maximum bytes of job directories and archives
+            uploads_quota: Maximum bytes of stored uploads
+            upload_grace: Seconds an unreferenced upload is kept, so uploads
+                made ahead of a submission are not collected (None keeps them)
+            interval: Seconds between background passes
+        """
+        self.job_store = job_store
+        self.upload_store = upload_store
+        self.status_ttls = dict(status_ttls or {})
+        self.spec_ttls = dict(spec_ttls or {})
+        self.archive_after = archive_after
+        self.jobs_quota = jobs_quota
+        self.uploads_quota = uploads_quota
+        self.upload_grace = upload_grace
+        self.interval = interval
+
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def is_configured(self) -> bool:
+        """Check whether any TTL, archival, quota or upload collection is set."""
+        return bool(self.status_ttls or self.spec_ttls or self.archive_after is not None
+                    or self.jobs_quota is not None or self.uploads_quota is not None
+                    or self.upload_grace is not None)
+
+    def start(self) -> None:
+        """Start running passes in a background thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name='jobson-retention', daemon=True)
+        self._thread.start()
+
+    def shutdown(self) -> None:
+        """Stop the background thread after the current pass."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _loop(self) -> None:
+        # Only the process holding the lock runs passes; the others keep
+        # trying so one of them takes over if that process exits
+        leader_lock = None
+        try:
+            while not self._stop.wait(self.interval):
+                if leader_lock is None:
+                    leader_lock = self._try_lock()
+                    if leader_lock is None:
+                        continue
+                try:
+                    self._run_pass()
+                except Exception as e:
+                    print(f"Error running retention pass: {e}")
+        finally:
+            if leader_lock is not None:
+                leader_lock.close()
+
+    def _try_lock(self) -> Optional[IO[str]]:
+        """Take the lock file that makes this process the one running passes, or return None if another holds it."""
+        lock_file = open(self.job_store.db_path + '.retention-lock', 'a')
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            lock_file.close()
+            return None
+        return lock_file
+
+    def run_once(self) -> Optional[Dict[str, int]]:
+        """Run one retention pass, unless another process sharing the jobs directory is running passes.
+
+        Passes hold a lock file next to the database, so web processes
+        never archive or delete the same jobs at once.
+
+        Returns:
+            Counts of deleted and archived jobs, removed uploads and bytes
+            freed, or None if another process (or this one's background
+            thread) holds the lock
+        """
+        lock_file = self._try_lock()
+        if lock_file is None:
+            return None
+        with lock_file:
+            return self._run_pass()
+
+    def _run_pass(self) -> Dict[str, int]:
+        with self._lock:
+            stats = {'deleted_jobs': 0, 'archived_jobs': 0, 'removed_uploads': 0, 'bytes_freed': 0}
+            now = time.time()
+            jobs = self.job_store.list_finished_jobs()
+
+            jobs = self._expire_jobs(jobs, now, stats)
+            if self.archive_after is not None:
+                self._archive_jobs(jobs, now, stats)
+            if self.jobs_quota is not None:
+                self._enforce_jobs_quota(jobs, stats)
+            if self.upload_store is not None:
+                self._collect_uploads(now, stats)
+
+            if any(stats.values()):
+                print(f"Retention pass: {stats}")
+            return stats
+
+    def _ttl_for(self, job: Dict[str, Any]) -> Optional[float]:
+        if job['type'] in self.spec_ttls:
+            return self.spec_ttls[job['type']]
+        return self.status_ttls.get(job['status'])
+
+    def _finished_at(self, job: Dict[str, Any]) -> float:
+        return parse_timestamp(job['completed_at']) or parse_timestamp(job['created_at']) or 0.0
+
+    def _job_size(self, job_id: str) -> int:
+        size = directory_size(os.path.join(self.job_store.jobs_dir, job_id))
+        archive_path = self.job_store.archive_path(job_id)
+        if os.path.exists(archive_path):
+            size += os.path.getsize(archive_path)
+        return size
+
+    def _delete_job(self, job_id: str, stats: Dict[str, int]) -> None:
+        size = self._job_size(job_id)
+        if self.job_store.delete_job(job_id):
+            stats['deleted_jobs'] += 1
+            stats['bytes_freed'] += size
+
+    def _expire_jobs(self, jobs: List[Dict[str, Any]], now: float, stats: Dict[str, int]) -> List[Dict[str, Any]]:
+        """Delete jobs past their TTL and return the remaining ones."""
+        remaining = []
+        for job in jobs:
+            ttl = self._ttl_for(job)
+            if ttl is not None and now - self._finished_at(job) > ttl:
+                self._delete_job(job['id'], stats)
+            else:
+                remaining.append(job)
+        return remaining
+
+    def _archive_jobs(self, jobs: List[Dict[str, Any]], now: float, stats: Dict[str, int]) -> None:
+        for job in jobs:
+            job_dir = os.path.join(self.job_store.jobs_dir, job['id'])
+            if job['archived_at']:
+                # Left behind if a previous pass stopped between archiving and removal
+                if os.path.isdir(job_dir):
+                    shutil.rmtree(job_dir, ignore_errors=True)
+                continue
+            if now - self._finished_at(job) <= self.archive_after or not os.path.isdir(job_dir):
+                continue
+            try:
+                size = directory_size(job_dir)
+                archive_size = archive_job_dir(job_dir, self.job_store.archive_path(job['id']))
+                self.job_store.mark_archived(job['id'])
+                shutil.rmtree(job_dir, ignore_errors=True)
+            except Exception as e:
+                print(f"Error archiving job {job['id']}: {e}")
+                continue
+            job['archived_at'] = True
+            stats['archived_jobs'] += 1
+            stats['bytes_freed'] += max(0, size - archive_size)
+
+    def _enforce_jobs_quota(self, jobs: List[Dict[str, Any]], stats: Dict[str, int]) -> None:
+        """Delete the oldest finished jobs until job files fit in the quota."""
+        total, job_inodes, inodes = self._jobs_usage()
+        for job in jobs:
+            if total <= self.jobs_quota:
+                return
+            if not self.job_store.delete_job(job['id']):
+                continue
+            freed = 0
+            for key in job_inodes.get(job['id'], ()):
+                inode = inodes.get(key)
+                if inode is not None:
+                    inode[1] -= 1
+                    if inode[1] == 0:
+                        freed += inode[0]
+            total -= freed
+            stats['deleted_jobs'] += 1
+            stats['bytes_freed'] += freed
+
+    def _jobs_usage(self) -> Tuple[int, Dict[str, List[Tuple[int, int]]], Dict[Tuple[int, int], List[int]]]:
+        """Measure the space job directories and archives hold, excluding the database.
+
+        Each inode is counted once, and only if all of its links are under
+        the jobs directory: deleting a job whose inputs are hardlinked from
+        the upload store frees nothing for those inputs. Precompressed
+        sidecars are not counted, since archiving drops them.
+
+        Returns:
+            Tuple of (total bytes, inodes under each job keyed by job id,
+            [size, links left] of each counted inode keyed by (device, inode))
+        """
+        db_name = os.path.basename(self.job_store.db_path)
+        job_inodes: Dict[str, List[Tuple[int, int]]] = {}
+        links: Dict[Tuple[int, int], List[int]] = {}
+
+        def add(job_id, info):
+            key = (info.st_dev, info.st_ino)
+            job_inodes.setdefault(job_id, []).append(key)
+            if key in links:
+                links[key][1] += 1
+            else:
+                links[key] = [info.st_size, 1, info.st_nlink]
+
+        with os.scandir(self.job_store.jobs_dir) as it:
+            for entry in it:
+                if entry.name.startswith(db_name):
+                    continue
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        for root, _, files in os.walk(entry.path):
+                            for name in files:
+                                path = os.path.join(root, name)
+                                if is_sidecar(path):
+                                    continue
+                                info = os.lstat(path)
+                                if stat.S_ISREG(info.st_mode):
+                                    add(entry.name, info)
+                    elif entry.is_file(follow_symlinks=False):
+                        job_id = entry.name[:-4] if entry.name.endswith('.zip') else entry.name
+                        add(job_id, entry.stat(follow_symlinks=False))
+                except OSError:
+                    continue
+
+        inodes = {key: [size, seen] for key, (size, seen, nlink) in links.items() if seen >= nlink}
+        return sum(size for size, _ in inodes.values()), job_inodes, inodes
+
+    def _collect_uploads(self, now: float, stats: Dict[str, int]) -> None:
+        live_refs = set()
+        archived_refs = set()
+        for _, inputs, archived in self.job_store.iter_job_inputs():
+            for value in inputs.values():
+                if isinstance(value, str) and self.upload_store.contains(value):
+                    (archived_refs if archived else live_refs).add(os.path.abspath(value))
+
+        uploads = []
+        total = 0
+        for root, _, files in os.walk(self.upload_store.upload_dir):
+            for name in files:
+                # Skip placeholders such as .gitkeep, but not abandoned partial uploads
+                if name.startswith('.') and not name.startswith('.upload-'):
+                    continue
+                path = os.path.abspath(os.path.join(root, name))
+                try:
+                    info = os.stat(path)
+                except OSError:
+                    continue
+                uploads.append((info.st_mtime, path, info.st_size))
+                total += info.st_size
+        uploads.sort()
+
+        def remove(path, size):
+            nonlocal total
+            try:
+                os.remove(path)
+            except OSError:
+                return
+            total -= size
+            stats['removed_uploads'] += 1
+            stats['bytes_freed'] += size
+
+        for mtime, path, size in uploads:
+            if self.upload_grace is None:
+                break
+            if path not in live_refs and path not in archived_refs and now - mtime > self.upload_grace:
+                remove(path, size)
+
+        if self.uploads_quota is not None:
+            for mtime, path, size in uploads:
+                if total <= self.uploads_quota:
+                    break
+                if path in archived_refs and path not in live_refs:
+                    remove(path, size)
@@ -0,0 +1,94 @@
+import os
+import re
+import stat
+import hashlib
+import tempfile
+from typing import BinaryIO, Optional
+from werkzeug.utils import secure_filename
+
+DIGEST_NAME = re.compile(r'^([0-9a-f]{64})(\.[^/]*)?$')
+
+
+class UploadStore:
+    """Stores uploaded files once, addressed by the SHA-256 of their contents.
+
+    Files are hashed while they stream to disk and kept at
+    ``<upload_dir>/<xx>/<digest><ext>``. Identical uploads share one file,
+    and different uploads with the same name no longer overwrite each other.
+    Stored files are made read-only since job directories hardlink them.
+    """
+
+    def __init__(self, upload_dir: str, chunk_size: int = 1024 * 1024):
+        """Initialize the upload store.
+
+        Args:
+            upload_dir: Root directory for stored uploads
+            chunk_size: Bytes read per chunk while streaming an upload
+        """
+        self.upload_dir = upload_dir
+        self.chunk_size = chunk_size
+        os.makedirs(upload_dir, exist_ok=True)
+
+    def save(self, stream: BinaryIO, filename: Optional[str] = None) -> str:
+        """Stream a file into the store.
+
+        Args:
+            stream: Readable binary stream with the upload contents
+            filename: Original filename, used only for its extension
+
+        Returns:
+            Path of the stored file
+        """
+        ext = os.path.splitext(secure_filename(filename or ''))[1].lower()
+        digest = hashlib.sha256()
+
+        fd, tmp_path = tempfile.mkstemp(dir=self.upload_dir, prefix='.upload-')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                for chunk in iter(lambda: stream.read(self.chunk_size), b''):
+                    digest.update(chunk)
+                    f.write(chunk)
+
+            path = self.path_for(digest.hexdigest(), ext)
+            if os.path.exists(path):
+                os.remove(tmp_path)
+                # Restart the unreferenced-upload grace period for the new upload
+                os.utime(path)
+            else:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                os.chmod(tmp_path, stat.S_IRUSR | stat.S_IRGRP | stat.S_IROTH)
+                os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        return path
+
+    def path_for(self, digest: str, ext: str = '') -> str:
+        """Return the storage path for a content digest."""
+        return os.path.join(self.upload_dir, digest[:2], f'{digest}{ext}')
+
+    def find(self, digest: str) -> Optional[str]:
+        """Return the stored file for a content digest, whatever its extension."""
+        if len(digest) != 64 or not all(c in '0123456789abcdef' for c in digest):
+            return None
+        shard = os.path.join(self.upload_dir, digest[:2])
+        try:
+            for name in os.listdir(shard):
+                if name.startswith(digest):
+                    return os.path.join(shard, name)
+        except OSError:
+            pass
+        return None
+
+    def digest_of(self, path: str) -> Optional[str]:
+        """Return the content digest of a stored file from its name, or None if it is not in the store."""
+        match = DIGEST_NAME.match(os.path.basename(path))
+        if match is None or not self.contains(path) or os.path.basename(os.path.dirname(path)) != match.group(1)[:2]:
+            return None
+        return match.group(1)
+
+    def contains(self, path: str) -> bool:
+        """Check whether a path lies inside this store."""
+        root = os.path.abspath(self.upload_dir)
+        return os.path.commonpath([root, os.path.abspath(path)]) == root
@@ -0,0 +1,11 @@
+import pytest
+
+from jobsonTwo.storage.job_store import JobStore
+
+# Minimal spec for jobs that are only stored, never run
+SPEC = {'id': 'test', 'name': 'Test', 'description': 'Test spec', 'expectedInputs': [], 'outputs': []}
+
+
+@pytest.fixture
+def store(tmp_path):
+    return JobStore(str(tmp_path / 'jobs'))
@@ -0,0 +1,60 @@
+import os
+import sys
+
+import pytest
+
+from jobsonTwo.execution.cache import ResultCache
+from jobsonTwo.execution.engine import JobExecutionEngine, STDOUT_FILE, STDERR_FILE
+
+SPEC = {
+    'id': 'printer',
+    'name': 'Printer',
+    'description': 'Prints, then writes an output file',
+    'expectedInputs': [],
+    'execution': {
+        'application': sys.executable,
+        'arguments': ['-c', "import sys; print('to stdout'); print('to stderr', file=sys.stderr); open('out.txt', 'w').write('done')"],
+    },
+    'outputs': [{'id': 'out', 'path': 'out.txt'}],
+}
+
+
+@pytest.fixture
+def engine(store, tmp_path):
+    engine = JobExecutionEngine(store, result_cache=ResultCache(str(tmp_path / 'cache')), compress_artifacts=False)
+    yield engine
+    engine.shutdown()
+
+
+def run_job(store, engine):
+    job_id = store.create_job(SPEC, {}, 'job')
+    return job_id, engine.start_job(job_id, SPEC, {}).result(30)
+
+
+def read(store, job_id, name):
+    with open(os.path.join(store.jobs_dir, job_id, name)) as f:
+        return f.read()
+
+
+def test_cache_hit_restores_outputs_and_logs(store, engine):
+    first, results = run_job(store, engine)
+    assert 'cache_hit' not in results
+
+    second, results = run_job(store, engine)
+    assert results['cache_hit']
+    with open(results['output_files']['out']) as f:
+        assert f.read() == 'done'
+    assert read(store, second, STDOUT_FILE) == 'to stdout\n'
+    assert read(store, second, STDERR_FILE) == 'to stderr\n'
+    assert engine.result_cache.stats()['entries'] == 1
+
+
+def test_entries_without_logs_still_hit(store, engine, tmp_path):
+    job_id, results = run_job(store, engine)
+    cache = ResultCache(str(tmp_path / 'other-cache'))
+    cache.store('key', os.path.join(store.jobs_dir, job_id), results)
+
+    job_dir = tmp_path / 'hit'
+    job_dir.mkdir()
+    assert cache.materialize('key', str(job_dir))['output_files'] == {'out': str(job_dir / 'out.txt')}
+    assert not (job_dir / STDOUT_FILE).exists()
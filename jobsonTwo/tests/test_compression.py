@@ -0,0 +1,67 @@
+import gzip
+import os
+import threading
+
+from werkzeug.http import parse_accept_header
+
+from jobsonTwo.execution import engine as engine_module
+from jobsonTwo.execution.compression import compress_file, find_sidecar, sidecar_path
+from jobsonTwo.execution.engine import JobExecutionEngine
+from jobsonTwo.storage.job_store import JobStore
+
+
+def write(path, data):
+    with open(path, 'wb') as f:
+        f.write(data)
+    return str(path)
+
+
+def test_compressible_file_gets_gzip_sidecar(tmp_path):
+    path = write(tmp_path / 'report.txt', b'word ' * 10000)
+    assert 'gzip' in compress_file(path)
+    with gzip.open(sidecar_path(path, 'gzip')) as f:
+        assert f.read() == b'word ' * 10000
+
+
+def test_small_and_incompressible_files_are_skipped(tmp_path):
+    assert compress_file(write(tmp_path / 'small.txt', b'tiny')) == []
+    assert compress_file(write(tmp_path / 'random.bin', os.urandom(100000))) == []
+    assert not os.path.exists(tmp_path / 'random.bin.gz')
+
+
+def test_sidecar_negotiation(tmp_path):
+    path = write(tmp_path / 'report.txt', b'word ' * 10000)
+    compress_file(path, ['gzip'])
+
+    assert find_sidecar(path, parse_accept_header('gzip, deflate')) == (sidecar_path(path, 'gzip'), 'gzip')
+    assert find_sidecar(path, parse_accept_header('*')) == (sidecar_path(path, 'gzip'), 'gzip')
+    assert find_sidecar(path, parse_accept_header('gzip;q=0')) is None
+    assert find_sidecar(path, parse_accept_header('br')) is None
+    assert find_sidecar(path, parse_accept_header('')) is None
+
+    # A sidecar older than its file is not served
+    os.utime(sidecar_path(path, 'gzip'), (0, 0))
+    assert find_sidecar(path, parse_accept_header('gzip')) is None
+
+
+def test_compression_runs_off_the_calling_thread(tmp_path, monkeypatch):
+    path = write(tmp_path / 'report.txt', b'word ' * 10000)
+    release = threading.Event()
+    threads = []
+
+    def slow_compress(paths):
+        threads.append(threading.current_thread().name)
+        release.wait(10)
+        for p in paths:
+            compress_file(p)
+    monkeypatch.setattr(engine_module, 'compress_files', slow_compress)
+
+    engine = JobExecutionEngine(JobStore(str(tmp_path / 'jobs')), warm_pool=None)
+    try:
+        engine._compress_artifacts('job', {'output_files': {'report': path}})
+        assert not os.path.exists(sidecar_path(path, 'gzip'))
+    finally:
+        release.set()
+        engine.shutdown()
+    assert threads and threads[0].startswith('jobson-compress')
+    assert os.path.exists(sidecar_path(path, 'gzip'))
@@ -0,0 +1,78 @@
+import io
+import json
+import os
+import tarfile
+import zipfile
+
+import pytest
+
+from jobsonTwo.execution.engine import JobExecutionEngine
+from jobsonTwo.specs.inputs import validate_inputs
+from jobsonTwo.specs.registry import SpecRegistry
+
+Image = pytest.importorskip('PIL.Image')
+
+SPECS_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'specs')
+
+
+def png(width, height, color):
+    buffer = io.BytesIO()
+    Image.new('RGB', (width, height), color).save(buffer, 'PNG')
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope='module')
+def spec():
+    return SpecRegistry(SPECS_DIR).get('image_batch_processor')
+
+
+@pytest.fixture
+def engine(store):
+    engine = JobExecutionEngine(store, compress_artifacts=False)
+    yield engine
+    engine.shutdown()
+
+
+def run(store, engine, spec, images_path, operations):
+    inputs = validate_inputs(spec, {'images': images_path, 'operations': operations, 'format': 'png', 'workers': 2})
+    job_id = store.create_job(spec, inputs, 'batch')
+    results = engine.start_job(job_id, spec, inputs).result(120)
+    assert store.get_job(job_id)['status'] == 'completed', results.get('stderr')
+    with open(results['output_files']['manifest']) as f:
+        manifest = json.load(f)
+    return zipfile.ZipFile(results['output_files']['processed_images']), manifest
+
+
+def test_processes_a_zip_and_writes_operations_in_input_syntax(tmp_path, store, engine, spec):
+    archive_path = tmp_path / 'images.zip'
+    with zipfile.ZipFile(archive_path, 'w') as archive:
+        archive.writestr('a/wide.png', png(400, 200, 'red'))
+        archive.writestr('tall.png', png(100, 300, 'blue'))
+        archive.writestr('notes.txt', 'not an image')
+
+    output, manifest = run(store, engine, spec, str(archive_path), 'grayscale, thumbnail:100x100, rotate:90, resize:x40')
+
+    assert manifest['operations'] == ['grayscale', 'thumbnail:100x100', 'rotate:90', 'resize:x40']
+    assert manifest['processed'] == 2 and manifest['failed'] == 0
+    assert sorted(entry['source'] for entry in manifest['images']) == ['a/wide.png', 'tall.png']
+    for entry in manifest['images']:
+        with Image.open(output.open(entry['output'])) as image:
+            assert image.mode == 'L'
+            assert image.size == (entry['width'], entry['height'])
+            assert image.size[1] == 40
+
+
+def test_processes_a_tar(tmp_path, store, engine, spec):
+    archive_path = tmp_path / 'images.tar'
+    with tarfile.open(archive_path, 'w') as archive:
+        data = png(64, 64, 'green')
+        info = tarfile.TarInfo('square.png')
+        info.size = len(data)
+        archive.addfile(info, io.BytesIO(data))
+
+    output, manifest = run(store, engine, spec, str(archive_path), 'resize:32x')
+
+    assert manifest['operations'] == ['resize:32x']
+    [entry] = manifest['images']
+    assert (entry['width'], entry['height']) == (32, 32)
+    assert output.namelist() == [entry['output']]
@@ -0,0 +1,61 @@
+import pytest
+
+from jobsonTwo.specs.inputs import InputValidator
+from jobsonTwo.specs.validator import JobSpecValidator
+
+PNG_HEADER = b'\x89PNG\r\n\x1a\n' + b'\x00' * 16
+
+
+def make_spec(**input_fields):
+    input_spec = {'id': 'value', 'name': 'Value', 'description': 'Test input', 'type': 'string'}
+    input_spec.update(input_fields)
+    return {
+        'name': 'Test',
+        'description': 'Test spec',
+        'expectedInputs': [input_spec],
+        'execution': {'application': 'echo', 'arguments': []},
+    }
+
+
+def write(path, data):
+    path.write_bytes(data)
+    return str(path)
+
+
+def test_spec_with_unknown_format_is_rejected():
+    spec = make_spec(type='file', supportedFormats=['png', 'psd'])
+    with pytest.raises(ValueError, match='psd'):
+        JobSpecValidator().validate(spec)
+
+
+def test_spec_with_known_formats_and_aliases_is_accepted():
+    assert JobSpecValidator().validate(make_spec(type='file', supportedFormats=['PNG', 'jpeg', 'tgz', 'csv']))
+
+
+def test_unknown_format_does_not_disable_sniffing(tmp_path):
+    validator = InputValidator(make_spec(type='file', supportedFormats=['png', 'psd']))
+
+    png = write(tmp_path / 'image.png', PNG_HEADER)
+    assert validator.validate({'value': png}) == {'value': png}
+    with pytest.raises(ValueError, match='not a supported file type'):
+        validator.validate({'value': write(tmp_path / 'notes.png', b'plain text')})
+
+
+def test_file_is_identified_by_content_not_name(tmp_path):
+    validator = InputValidator(make_spec(type='file', supportedFormats=['txt', 'csv']))
+
+    assert validator.validate({'value': write(tmp_path / 'data.bin', b'a,b\n1,2\n')})
+    with pytest.raises(ValueError, match='not a supported file type'):
+        validator.validate({'value': write(tmp_path / 'data.csv', PNG_HEADER)})
+
+
+def test_options_return_the_stripped_value():
+    validator = InputValidator(make_spec(options=['fast', 'slow']))
+
+    assert validator.validate({'value': '  fast \n'}) == {'value': 'fast'}
+    with pytest.raises(ValueError, match='must be one of'):
+        validator.validate({'value': 'medium'})
+
+
+def test_strings_without_options_are_kept_as_given():
+    assert InputValidator(make_spec()).validate({'value': ' padded '}) == {'value': ' padded '}
@@ -0,0 +1,48 @@
+import json
+
+from jobsonTwo.execution.job_log import read_log_records
+
+
+def write_lines(path, lines):
+    path.write_bytes(b''.join(line + b'\n' for line in lines))
+
+
+def test_pages_through_complete_records(tmp_path):
+    path = tmp_path / 'job.log'
+    write_lines(path, [json.dumps({'ts': i, 'level': 'info', 'msg': str(i)}).encode() for i in range(5)] + [b'plain'])
+    with open(path, 'ab') as f:
+        f.write(b'{"partial')
+
+    records, offset, at_end = read_log_records(str(path), 0, limit=4)
+    assert [record['msg'] for record in records] == ['0', '1', '2', '3']
+    assert not at_end
+
+    records, offset, at_end = read_log_records(str(path), offset, limit=4)
+    assert [record['msg'] for record in records] == ['4', 'plain']
+    assert records[1]['level'] == 'info'
+    assert at_end
+    assert read_log_records(str(path), offset) == ([], offset, True)
+
+
+def test_line_longer_than_a_read_is_truncated_and_skipped(tmp_path):
+    path = tmp_path / 'job.log'
+    write_lines(path, [b'x' * 100, b'after'])
+
+    records, offset, at_end = read_log_records(str(path), 0, max_bytes=16)
+    assert records == [{'ts': None, 'level': 'info', 'msg': 'x' * 16, 'truncated': True}]
+    assert offset == 101
+    assert not at_end
+
+    records, offset, at_end = read_log_records(str(path), offset, max_bytes=16)
+    assert [record['msg'] for record in records] == ['after']
+    assert at_end
+
+
+def test_unfinished_long_line_still_advances(tmp_path):
+    path = tmp_path / 'job.log'
+    path.write_bytes(b'y' * 40)
+
+    records, offset, at_end = read_log_records(str(path), 0, max_bytes=16)
+    assert records[0]['truncated']
+    assert offset == 40
+    assert at_end
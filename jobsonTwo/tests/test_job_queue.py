@@ -0,0 +1,230 @@
+import os
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from jobsonTwo.execution.engine import JobExecutionEngine
+from jobsonTwo.execution.worker import QueueWorker
+from jobsonTwo.storage.job_queue import JobQueue
+
+SLEEP_SPEC = {
+    'id': 'sleeper',
+    'name': 'Sleeper',
+    'description': 'Sleeps, then writes an output file',
+    'expectedInputs': [],
+    'execution': {
+        'application': sys.executable,
+        'arguments': ['-c', "import time; time.sleep(1); open('out.txt', 'w').write('stale')"],
+    },
+    'outputs': [{'id': 'out', 'path': 'out.txt'}],
+}
+
+
+@pytest.fixture
+def queue(store):
+    return JobQueue(store)
+
+
+def submit(store, queue, spec=SLEEP_SPEC):
+    job_id = store.create_job(spec, {}, 'job')
+    queue.submit(job_id, spec, {})
+    return job_id
+
+
+def expire_leases(queue):
+    queue._connect().execute('UPDATE job_queue SET lease_expires = 0 WHERE worker_id IS NOT NULL')
+
+
+def test_claim_heartbeat_and_complete(store, queue):
+    job_id = submit(store, queue)
+    claimed_job, claim_id, _ = queue.claim('w1', 30)
+    assert claimed_job == job_id
+    assert queue.claim('w2', 30) is None
+
+    assert queue.heartbeat([claim_id], 30) == ([], [])
+    assert queue.heartbeat(['stale'], 30) == ([], ['stale'])
+
+    queue.stop(job_id)
+    assert queue.heartbeat([claim_id], 30) == ([claim_id], [])
+
+    queue.complete(job_id, 'stale')
+    assert queue.stats()['running'] == 1
+    queue.complete(job_id, claim_id)
+    assert queue.stats() == {'queued': 0, 'running': 0, 'running_by_worker': {}}
+
+
+def test_an_earlier_claim_cannot_complete_a_reclaimed_job(store, queue):
+    job_id = submit(store, queue)
+    first = queue.claim('w1', 30)[1]
+    expire_leases(queue)
+    queue.requeue_expired()
+    second = queue.claim('w1', 30)[1]
+    assert first != second
+
+    assert queue.heartbeat([first, second], 30) == ([], [first])
+    queue.complete(job_id, first)
+    assert queue.stats()['running_by_worker'] == {'w1': 1}
+
+
+def test_expired_lease_is_requeued_then_failed(store, queue):
+    job_id = submit(store, queue)
+    for attempt in range(queue.max_attempts):
+        assert queue.claim(f'w{attempt}', 30)[0] == job_id
+        expire_leases(queue)
+        requeued, failed = queue.requeue_expired()
+        if attempt < queue.max_attempts - 1:
+            assert (requeued, failed) == ([job_id], [])
+            assert store.get_job(job_id)['status'] == 'queued'
+    assert failed == [job_id]
+    assert store.get_job(job_id)['status'] == 'failed'
+    assert queue.claim('w9', 30) is None
+
+
+def test_status_write_is_fenced_on_the_claim(store, queue):
+    job_id = submit(store, queue)
+    first = queue.claim('w1', 30)[1]
+    assert store.update_job_status(job_id, 'running', claim_id=first)
+
+    expire_leases(queue)
+    queue.requeue_expired()
+    # The same worker claims the job again
+    second = queue.claim('w1', 30)[1]
+
+    assert not store.update_job_status(job_id, 'completed', {'stale': True}, claim_id=first)
+    assert store.update_job_status(job_id, 'running', claim_id=second)
+    job = store.get_job(job_id)
+    assert job['status'] == 'running'
+    assert job['results'] is None
+
+
+def test_status_write_is_fenced_on_an_unexpired_lease(store, queue):
+    job_id = submit(store, queue)
+    claim_id = queue.claim('w1', 30)[1]
+    expire_leases(queue)
+
+    # Not yet handed to anyone else, but the lease has lapsed
+    assert not store.update_job_status(job_id, 'completed', {'late': True}, claim_id=claim_id)
+    assert store.get_job(job_id)['status'] == 'queued'
+
+
+def test_engine_drops_results_of_a_lost_job(store, queue):
+    job_id = submit(store, queue)
+    claim_id = queue.claim('w1', 30)[1]
+    engine = JobExecutionEngine(store, warm_pool=None, compress_artifacts=False)
+    try:
+        future = engine.start_job(job_id, SLEEP_SPEC, {}, claim_id=claim_id)
+
+        # Another worker takes the job over while the first one is still running it
+        expire_leases(queue)
+        queue.requeue_expired()
+        store.update_job_status(job_id, 'running', claim_id=queue.claim('w2', 30)[1])
+
+        assert future.result(timeout=10) is None
+    finally:
+        engine.shutdown()
+
+    job = store.get_job(job_id)
+    assert job['status'] == 'running'
+    assert job['results'] is None
+    assert not os.path.exists(os.path.join(store.jobs_dir, job_id, 'results.json'))
+
+
+def test_engine_abandon_job_records_nothing(store, queue):
+    job_id = submit(store, queue)
+    claim_id = queue.claim('w1', 30)[1]
+    engine = JobExecutionEngine(store, warm_pool=None, compress_artifacts=False)
+    try:
+        future = engine.start_job(job_id, SLEEP_SPEC, {}, claim_id=claim_id)
+        assert engine.abandon_job(job_id)
+        assert future.result(timeout=10) is None
+    finally:
+        engine.shutdown()
+
+    assert store.get_job(job_id)['status'] == 'running'
+    assert not os.path.exists(os.path.join(store.jobs_dir, job_id, 'results.json'))
+
+
+class BlockingEngine:
+    """Engine double whose start_job blocks until released."""
+
+    def __init__(self, job_store):
+        self.job_store = job_store
+        self.started = []
+        self.release = threading.Event()
+
+    def start_job(self, job_id, spec, inputs, claim_id=None):
+        self.started.append(job_id)
+        if len(self.started) > 1:
+            self.release.wait(10)
+        future = Future()
+        future.set_result({})
+        return future
+
+    def stop_job(self, job_id):
+        return False
+
+    def abandon_job(self, job_id):
+        return False
+
+    def is_running(self, job_id):
+        return False
+
+
+def test_leases_are_renewed_while_a_job_starts_slowly(store, queue):
+    first = submit(store, queue)
+    second = submit(store, queue)
+    engine = BlockingEngine(store)
+    worker = QueueWorker(engine, queue, worker_id='w1', max_jobs=1, lease_seconds=0.5,
+                         heartbeat_interval=0.1, poll_interval=0.05)
+
+    thread = threading.Thread(target=worker.run, daemon=True)
+    thread.start()
+    try:
+        deadline = time.monotonic() + 5
+        while len(engine.started) < 2 and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert engine.started == [first, second]
+
+        # The claim loop is stuck starting the second job for longer than a lease
+        time.sleep(1.0)
+        row = queue._connect().execute(
+            'SELECT worker_id, lease_expires FROM job_queue WHERE job_id = ?', (second,)
+        ).fetchone()
+        assert row['worker_id'] == 'w1'
+        assert row['lease_expires'] > time.time()
+    finally:
+        engine.release.set()
+        worker.shutdown()
+        thread.join(10)
+    assert not thread.is_alive()
+
+
+def test_worker_reruns_a_job_it_lost_and_claimed_again(store, queue):
+    job_id = submit(store, queue)
+    engine = JobExecutionEngine(store, warm_pool=None, compress_artifacts=False)
+    worker = QueueWorker(engine, queue, worker_id='w1', max_jobs=2, lease_seconds=5,
+                         heartbeat_interval=0.1, poll_interval=0.05)
+    thread = threading.Thread(target=worker.run, daemon=True)
+    thread.start()
+    try:
+        store.wait_for_update([job_id], lambda s: s[job_id]['status'] == 'running', 5)
+        # The lease lapses; this worker is the one that requeues and claims the job again
+        expire_leases(queue)
+        queue.requeue_expired()
+
+        job = store.wait_for_update([job_id], lambda s: s[job_id]['status'] != 'running' and s[job_id]['status'] != 'queued', 15)
+        assert job[job_id]['status'] == 'completed'
+        # The queue row goes once the run's completion callback has fired
+        deadline = time.monotonic() + 5
+        while queue.stats()['running'] and time.monotonic() < deadline:
+            time.sleep(0.05)
+        assert queue.stats() == {'queued': 0, 'running': 0, 'running_by_worker': {}}
+    finally:
+        worker.shutdown()
+        thread.join(10)
+        engine.shutdown()
+    assert not thread.is_alive()
+    assert store.get_job(job_id)['results']['output_files']
@@ -0,0 +1,85 @@
+import pytest
+
+from jobsonTwo.tests.conftest import SPEC
+
+
+def test_bulk_status_updates_stamp_times_like_single_updates(store):
+    job_ids = [store.create_job(SPEC, {}, f'job {i}') for i in range(3)]
+
+    store.update_jobs_status(job_ids, 'queued')
+    assert all(store.get_job(job_id)['completed_at'] is None for job_id in job_ids)
+
+    store.update_jobs_status(job_ids[:1], 'running')
+    assert store.get_job(job_ids[0])['started_at'] is not None
+
+    store.update_jobs_status(job_ids, 'failed')
+    statuses = store.get_job_statuses(job_ids)
+    assert all(statuses[job_id]['status'] == 'failed' for job_id in job_ids)
+    assert all(statuses[job_id]['completed_at'] is not None for job_id in job_ids)
+    assert len(store.list_finished_jobs()) == 3
+    assert store.count_jobs('failed') == 3
+
+
+def test_batches_keep_job_order_and_count_by_status(store):
+    batch_id, job_ids = store.create_batch(SPEC, [
+        {'inputs': {'n': i}, 'name': f'batch #{i + 1}'} for i in range(4)
+    ])
+    assert store.get_batch(batch_id)['counts'] == {'pending': 4}
+
+    store.update_jobs_status(job_ids, 'queued')
+    store.update_jobs_status(job_ids[:1], 'completed')
+    store.update_job_status(job_ids[1], 'failed')
+    batch = store.get_batch(batch_id)
+    assert batch['size'] == 4
+    assert batch['counts'] == {'queued': 2, 'completed': 1, 'failed': 1}
+
+    jobs = store.list_batch_jobs(batch_id)
+    assert [job['id'] for job in jobs] == job_ids
+    assert [job['inputs'] for job in jobs] == [{'n': i} for i in range(4)]
+    assert store.get_batch('missing') is None
+
+
+def page_through(store, **filters):
+    pages = []
+    cursor = None
+    while True:
+        jobs, cursor = store.list_jobs_page(cursor=cursor, **filters)
+        pages.append([job['id'] for job in jobs])
+        if cursor is None:
+            return pages
+
+
+def test_keyset_pages_cover_every_job_once_newest_first(store):
+    job_ids = [store.create_job(SPEC, {}, f'job {i}') for i in range(7)]
+    # Jobs created in the same instant are ordered by id
+    conn = store._connect()
+    with conn:
+        conn.execute("UPDATE jobs SET created_at = '2026-01-01T00:00:00' WHERE id IN (?, ?, ?)", job_ids[2:5])
+
+    pages = page_through(store, limit=3)
+    assert [len(page) for page in pages] == [3, 3, 1]
+    listed = [job_id for page in pages for job_id in page]
+    assert listed == [job['id'] for job in store.list_jobs()]
+    assert sorted(listed) == sorted(job_ids)
+
+
+def test_keyset_pages_are_stable_under_inserts_and_filters(store):
+    other = dict(SPEC, id='other')
+    job_ids = [store.create_job(SPEC if i % 2 else other, {}, f'job {i}') for i in range(6)]
+    store.update_job_status(job_ids[1], 'completed')
+
+    first, cursor = store.list_jobs_page(limit=2, job_type='test')
+    store.create_job(SPEC, {}, 'newer')
+    rest, end = store.list_jobs_page(limit=2, job_type='test', cursor=cursor)
+    assert [job['id'] for job in first + rest] == [job_ids[5], job_ids[3], job_ids[1]]
+    assert end is None
+
+    completed, _ = store.list_jobs_page(status='completed', summary=True)
+    assert [job['id'] for job in completed] == [job_ids[1]]
+    assert 'inputs' not in completed[0]
+    assert store.count_jobs('completed') == 1 and store.count_jobs() == 7
+
+
+def test_invalid_cursor_is_rejected(store):
+    with pytest.raises(ValueError):
+        store.list_jobs_page(cursor='not-a-cursor')
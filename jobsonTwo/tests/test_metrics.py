@@ -0,0 +1,58 @@
+import pytest
+
+from jobsonTwo.metrics import Counter, Gauge, Histogram, MetricsRegistry
+
+
+def test_counters_and_gauges_render_in_text_format():
+    registry = MetricsRegistry()
+    finished = registry.register(Counter('jobs_total', 'Finished jobs', ('spec', 'status')))
+    queued = registry.register(Gauge('queued', 'Queued jobs', ('state',)))
+    finished.labels('b', 'failed').inc()
+    finished.labels('a "quoted"\\spec\n', 'completed').inc(2)
+    queued.set_function(lambda: {('running',): 3, ('queued',): 1.5})
+
+    assert registry.render() == (
+        '# HELP jobs_total Finished jobs\n'
+        '# TYPE jobs_total counter\n'
+        'jobs_total{spec="a \\"quoted\\"\\\\spec\\n",status="completed"} 2\n'
+        'jobs_total{spec="b",status="failed"} 1\n'
+        '# HELP queued Queued jobs\n'
+        '# TYPE queued gauge\n'
+        'queued{state="queued"} 1.5\n'
+        'queued{state="running"} 3\n'
+    )
+
+
+def test_histogram_buckets_are_cumulative_with_inf_sum_and_count():
+    registry = MetricsRegistry()
+    latency = registry.register(Histogram('latency_seconds', 'Latency', buckets=(1.0, 0.1)))
+    for value in (0.05, 0.1, 0.5, 7.0):
+        latency.observe(value)
+
+    assert registry.render().splitlines()[2:] == [
+        'latency_seconds_bucket{le="0.1"} 2',
+        'latency_seconds_bucket{le="1.0"} 3',
+        'latency_seconds_bucket{le="+Inf"} 4',
+        'latency_seconds_sum 7.65',
+        'latency_seconds_count 4',
+    ]
+
+
+def test_timed_observes_calls_even_when_they_raise():
+    latency = Histogram('op_seconds', 'Operation latency', ('operation',))
+
+    @latency.timed('fail')
+    def fail():
+        raise RuntimeError('boom')
+
+    with pytest.raises(RuntimeError):
+        fail()
+    assert latency.labels('fail').count == 1
+    with pytest.raises(ValueError):
+        latency.labels('too', 'many')
+
+
+def test_failing_gauge_callbacks_render_only_their_header():
+    gauge = Gauge('broken', 'Broken gauge')
+    gauge.set_function(lambda: 1 / 0)
+    assert gauge.render() == ['# HELP broken Broken gauge', '# TYPE broken gauge']
@@ -0,0 +1,179 @@
+import os
+import stat
+
+import pytest
+
+from jobsonTwo.execution.cache import link_or_copy
+from jobsonTwo.execution.pipeline import PipelineRunner
+from jobsonTwo.specs.pipeline import PipelineLoader
+
+SPECS = {
+    'produce': {
+        'id': 'produce', 'name': 'Produce', 'description': 'Writes a file',
+        'expectedInputs': [{'id': 'message', 'name': 'Message', 'type': 'string'}],
+        'outputs': [{'id': 'result', 'path': 'out.txt'}],
+    },
+    'consume': {
+        'id': 'consume', 'name': 'Consume', 'description': 'Reads a file',
+        'expectedInputs': [{'id': 'input_file', 'name': 'Input', 'type': 'file'}],
+        'outputs': [{'id': 'result', 'path': 'out.txt'}],
+    },
+}
+
+# first -> (left, right); left -> last
+PIPELINE = '''
+name: Diamond
+description: Test pipeline
+expectedInputs:
+  - id: message
+    name: Message
+    type: string
+    description: Message for the first step
+steps:
+  - id: last
+    spec: consume
+    inputs:
+      input_file: ${steps.left.outputs.result}
+  - id: left
+    spec: consume
+    inputs:
+      input_file: ${steps.first.outputs.result}
+  - id: right
+    spec: consume
+    inputs:
+      input_file: ${steps.first.outputs.result}
+  - id: first
+    spec: produce
+    inputs:
+      message: ${inputs.message}
+'''
+
+
+class Registry:
+    def get(self, spec_id):
+        return SPECS.get(spec_id)
+
+
+class RecordingScheduler:
+    def __init__(self):
+        self.submitted = []
+
+    def submit_many(self, jobs):
+        self.submitted.extend(jobs)
+
+
+@pytest.fixture
+def scheduler():
+    return RecordingScheduler()
+
+
+@pytest.fixture
+def runner(store, scheduler):
+    return PipelineRunner(store, scheduler, Registry())
+
+
+def submitted_steps(run, scheduler):
+    steps = {job_id: step_id for step_id, job_id in run['steps'].items()}
+    names = [steps[job_id] for job_id, _, _ in scheduler.submitted]
+    scheduler.submitted.clear()
+    return names
+
+
+def finish(store, run, step_id, status='completed'):
+    """Finish a step's job as the engine would, writing its output file."""
+    job_id = run['steps'][step_id]
+    results = {}
+    if status == 'completed':
+        path = os.path.join(store.jobs_dir, job_id, 'out.txt')
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'w') as f:
+            f.write(step_id)
+        results['output_files'] = {'result': path}
+    store.update_job_status(job_id, status, results)
+    return results.get('output_files', {}).get('result')
+
+
+def test_loader_rejects_bad_references_and_cycles():
+    loader = PipelineLoader()
+    assert [step['id'] for step in loader.load_from_string(PIPELINE)['steps']] == ['last', 'left', 'right', 'first']
+
+    with pytest.raises(ValueError, match='unknown step'):
+        loader.load_from_string(PIPELINE.replace('steps.left.', 'steps.middle.'))
+    with pytest.raises(ValueError, match='unknown pipeline input'):
+        loader.load_from_string(PIPELINE.replace('inputs.message', 'inputs.other'))
+    with pytest.raises(ValueError, match='cycle'):
+        loader.load_from_string(PIPELINE.replace(
+            'spec: produce\n    inputs:\n      message: ${inputs.message}',
+            'spec: consume\n    inputs:\n      input_file: ${steps.last.outputs.result}'
+        ))
+
+
+def test_steps_start_in_dependency_order(store, scheduler, runner):
+    pipeline = PipelineLoader().load_from_string(PIPELINE)
+    run = store.get_pipeline_run(runner.create_run(pipeline, {'message': 'hi'}, 'run'))
+    assert submitted_steps(run, scheduler) == ['first']
+
+    output = finish(store, run, 'first')
+    runner.advance(run['id'])
+    assert scheduler.submitted[0][2] == {'input_file': output}
+    assert submitted_steps(run, scheduler) == ['left', 'right']
+
+    finish(store, run, 'left')
+    runner.advance(run['id'])
+    assert submitted_steps(run, scheduler) == ['last']
+
+    finish(store, run, 'right')
+    finish(store, run, 'last')
+    assert runner.advance(run['id'])['status'] == 'completed'
+    assert store.list_active_pipeline_runs() == []
+
+
+def test_failed_step_stops_its_downstream_steps(store, scheduler, runner):
+    pipeline = PipelineLoader().load_from_string(PIPELINE)
+    run = store.get_pipeline_run(runner.create_run(pipeline, {'message': 'hi'}, 'run'))
+    finish(store, run, 'first')
+    runner.advance(run['id'])
+    submitted_steps(run, scheduler)
+
+    finish(store, run, 'left', 'failed')
+    assert runner.advance(run['id'])['status'] == 'running'
+    last = store.get_job(run['steps']['last'])
+    assert last['status'] == 'stopped'
+    assert 'left' in last['results']['error']
+    assert submitted_steps(run, scheduler) == []
+
+    finish(store, run, 'right')
+    assert runner.advance(run['id'])['status'] == 'failed'
+
+
+def test_rerun_keeps_completed_steps(store, scheduler, runner):
+    pipeline = PipelineLoader().load_from_string(PIPELINE)
+    run = store.get_pipeline_run(runner.create_run(pipeline, {'message': 'hi'}, 'run'))
+    with pytest.raises(ValueError):
+        runner.rerun(run['id'])
+
+    finish(store, run, 'first')
+    runner.advance(run['id'])
+    finish(store, run, 'left', 'failed')
+    finish(store, run, 'right')
+    assert runner.advance(run['id'])['status'] == 'failed'
+    scheduler.submitted.clear()
+
+    rerun = runner.rerun(run['id'])
+    assert rerun['status'] == 'running'
+    for step_id in ('first', 'right'):
+        assert rerun['steps'][step_id] == run['steps'][step_id]
+    for step_id in ('left', 'last'):
+        assert rerun['steps'][step_id] != run['steps'][step_id]
+    assert submitted_steps(rerun, scheduler) == ['left']
+    assert store.get_job(rerun['steps']['last'])['status'] == 'pending'
+    assert runner.rerun('missing') is None
+
+
+def test_linked_artifacts_are_read_only(tmp_path):
+    src = tmp_path / 'out.txt'
+    src.write_text('output')
+    link_or_copy(str(src), str(tmp_path / 'input.txt'))
+
+    for path in (src, tmp_path / 'input.txt'):
+        assert stat.S_IMODE(os.stat(path).st_mode) == 0o444
@@ -0,0 +1,55 @@
+import os
+
+from jobsonTwo.execution.output import read_head_tail, read_new_lines
+from jobsonTwo.web.previews import BINARY_PREVIEW, PreviewCache
+
+
+def test_small_files_are_read_whole(tmp_path):
+    path = tmp_path / 'out.txt'
+    path.write_text('short output\n')
+    assert read_head_tail(str(path), 8, 8) == ('short output\n', False)
+    assert read_head_tail(str(tmp_path / 'missing.txt'), 8, 8) == ('', False)
+
+
+def test_large_files_keep_only_head_and_tail(tmp_path):
+    path = tmp_path / 'out.txt'
+    path.write_bytes(b'HEAD' + b'.' * 1000 + b'TAIL')
+
+    text, truncated = read_head_tail(str(path), 4, 4)
+
+    assert truncated
+    assert text == 'HEAD\n... [1000 bytes truncated] ...\nTAIL'
+
+
+def test_new_lines_wait_for_complete_lines(tmp_path):
+    path = tmp_path / 'stdout.log'
+    path.write_bytes(b'one\ntw')
+
+    text, offset = read_new_lines(str(path), 0)
+    assert (text, offset) == ('one\n', 4)
+    assert read_new_lines(str(path), offset) == ('', 4)
+    assert read_new_lines(str(path), offset, final=True) == ('tw', 6)
+
+
+def test_previews_are_cached_per_file_version(tmp_path, monkeypatch):
+    cache = PreviewCache(head_bytes=4, tail_bytes=4, max_entries=1)
+    path = tmp_path / 'out.txt'
+    path.write_text('first')
+    reads = []
+    monkeypatch.setattr('jobsonTwo.web.previews.read_head_tail',
+                        lambda *args: reads.append(args) or read_head_tail(*args))
+
+    assert cache.get(str(path)) == 'first'
+    assert cache.get(str(path)) == 'first'
+    assert len(reads) == 1
+
+    path.write_text('second version')
+    os.utime(path, ns=(0, 1))
+    assert cache.get(str(path)).startswith('seco\n... [6 bytes')
+    assert len(reads) == 2
+
+
+def test_binary_files_get_a_placeholder(tmp_path):
+    path = tmp_path / 'image.png'
+    path.write_bytes(b'\x89PNG\r\n\x1a\n\0\0')
+    assert PreviewCache().get(str(path)) == BINARY_PREVIEW
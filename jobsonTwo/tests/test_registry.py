@@ -0,0 +1,43 @@
+import os
+
+from jobsonTwo.specs.loader import JobSpecLoader
+from jobsonTwo.specs.registry import SpecRegistry
+
+VALID_SPEC = '''
+name: Echo
+description: Echo a message
+expectedInputs: []
+execution:
+  application: echo
+  arguments: [hello]
+outputs: []
+'''
+
+
+class CountingLoader(JobSpecLoader):
+    def __init__(self):
+        super().__init__()
+        self.loads = 0
+
+    def load_from_file(self, path):
+        self.loads += 1
+        return super().load_from_file(path)
+
+
+def test_broken_spec_is_loaded_again_only_when_it_changes(tmp_path, capsys):
+    path = tmp_path / 'echo.yaml'
+    path.write_text('name: [unterminated')
+    loader = CountingLoader()
+    registry = SpecRegistry(str(tmp_path), loader, check_interval=0)
+
+    assert registry.get('echo') is None
+    registry.refresh()
+    registry.refresh()
+    assert registry.list_specs() == []
+    assert loader.loads == 1
+    assert capsys.readouterr().out.count('Error loading job spec') == 1
+
+    path.write_text(VALID_SPEC)
+    os.utime(path, ns=(0, 10 ** 18))
+    assert registry.get('echo')['name'] == 'Echo'
+    assert loader.loads == 2
@@ -0,0 +1,108 @@
+import io
+import os
+import zipfile
+
+import pytest
+
+from jobsonTwo.storage import retention
+from jobsonTwo.storage.retention import RetentionService
+from jobsonTwo.storage.upload_store import UploadStore
+from jobsonTwo.tests.conftest import SPEC
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    return UploadStore(str(tmp_path / 'uploads'))
+
+
+def finished_job(store, files=None, links=None):
+    """Create a completed job whose directory holds the given files and hardlinks."""
+    job_id = store.create_job(SPEC, {}, 'job')
+    store.update_job_status(job_id, 'completed')
+    job_dir = os.path.join(store.jobs_dir, job_id)
+    os.makedirs(job_dir)
+    for name, data in (files or {}).items():
+        with open(os.path.join(job_dir, name), 'wb') as f:
+            f.write(data)
+    for name, target in (links or {}).items():
+        os.link(target, os.path.join(job_dir, name))
+    return job_id
+
+
+def test_jobs_quota_ignores_inputs_linked_from_uploads(store, uploads):
+    upload = uploads.save(io.BytesIO(b'x' * 100000), 'data.bin')
+    job_id = finished_job(store, files={'out.txt': b'small'}, links={'data.bin': upload})
+
+    stats = RetentionService(store, jobs_quota=1000).run_once()
+
+    assert stats['deleted_jobs'] == 0
+    assert store.get_job(job_id) is not None
+
+
+def test_jobs_quota_counts_files_shared_between_jobs_once(store):
+    first = finished_job(store, files={'out.bin': b'y' * 5000})
+    second = finished_job(store, links={'in.bin': os.path.join(store.jobs_dir, first, 'out.bin')})
+    third = finished_job(store, files={'out.txt': b'small'})
+
+    # Deleting the first job frees nothing while the second still links its output
+    stats = RetentionService(store, jobs_quota=1000).run_once()
+
+    assert stats['deleted_jobs'] == 2
+    assert stats['bytes_freed'] == 5000
+    assert store.get_job(first) is None and store.get_job(second) is None
+    assert store.get_job(third) is not None
+
+
+def test_dedupe_hit_restarts_upload_grace(store, uploads):
+    path = uploads.save(io.BytesIO(b'payload'), 'data.txt')
+    os.utime(path, (0, 0))
+
+    assert uploads.save(io.BytesIO(b'payload'), 'data.txt') == path
+    stats = RetentionService(store, uploads, upload_grace=3600).run_once()
+
+    assert stats['removed_uploads'] == 0
+    assert os.path.exists(path)
+
+
+def test_only_one_process_runs_passes(store):
+    holder = RetentionService(store, jobs_quota=0)
+    lock_file = holder._try_lock()
+    try:
+        # A second service (another web process) sees the lock and skips its pass
+        assert RetentionService(store, jobs_quota=0).run_once() is None
+    finally:
+        lock_file.close()
+    assert RetentionService(store, jobs_quota=0).run_once() is not None
+
+
+def test_archives_are_written_through_unique_temp_files(store, monkeypatch):
+    job_id = finished_job(store, files={'out.txt': b'data' * 100})
+    temp_names = []
+    real_mkstemp = retention.tempfile.mkstemp
+
+    def recording_mkstemp(*args, **kwargs):
+        fd, path = real_mkstemp(*args, **kwargs)
+        temp_names.append(path)
+        return fd, path
+    monkeypatch.setattr(retention.tempfile, 'mkstemp', recording_mkstemp)
+
+    stats = RetentionService(store, archive_after=-1).run_once()
+
+    assert stats['archived_jobs'] == 1
+    assert os.path.exists(store.archive_path(job_id))
+    assert temp_names and not any(os.path.exists(path) for path in temp_names)
+    assert temp_names[0] != store.archive_path(job_id) + '.tmp'
+
+
+def test_archives_and_quota_leave_out_sidecars(store):
+    job_id = finished_job(store, files={
+        'out.txt': b'small',
+        'out.txt.gz': b'z' * 5000,
+        'data.gz': b'output',
+    })
+
+    assert RetentionService(store, jobs_quota=1000).run_once()['deleted_jobs'] == 0
+
+    RetentionService(store, archive_after=-1).run_once()
+    with zipfile.ZipFile(store.archive_path(job_id)) as archive:
+        assert sorted(archive.namelist()) == ['data.gz', 'out.txt']
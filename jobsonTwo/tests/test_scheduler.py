@@ -0,0 +1,283 @@
+import io
+import os
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from jobsonTwo.execution import cache as cache_module
+from jobsonTwo.execution.cache import ResultCache
+from jobsonTwo.execution.engine import JobExecutionEngine
+from jobsonTwo.execution.resources import ResourceBudget
+from jobsonTwo.execution.scheduler import JobScheduler
+from jobsonTwo.storage.upload_store import UploadStore
+
+
+def make_spec(spec_id, script='pass'):
+    return {
+        'id': spec_id,
+        'name': spec_id,
+        'description': 'Test spec',
+        'expectedInputs': [{'id': 'data', 'name': 'Data', 'description': 'Input file', 'type': 'file', 'optional': True}],
+        'execution': {'application': sys.executable, 'arguments': ['-c', script]},
+        'outputs': [],
+    }
+
+
+class SlowPrepareEngine(JobExecutionEngine):
+    """Engine whose input preparation blocks for specs named 'slow'."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.release = threading.Event()
+
+    def _create_input_files(self, job_dir, spec, inputs):
+        if spec['id'] == 'slow':
+            self.release.wait(10)
+        return super()._create_input_files(job_dir, spec, inputs)
+
+
+@pytest.fixture
+def engine(store):
+    engine = SlowPrepareEngine(store, warm_pool=None, compress_artifacts=False)
+    yield engine
+    engine.release.set()
+    engine.shutdown()
+
+
+def test_slow_preparation_does_not_block_dispatch(store, engine):
+    scheduler = JobScheduler(engine, max_workers=4)
+    slow, fast = make_spec('slow'), make_spec('fast')
+    slow_id = store.create_job(slow, {}, 'slow')
+    fast_id = store.create_job(fast, {}, 'fast')
+    scheduler.submit(slow_id, slow, {})
+    scheduler.submit(fast_id, fast, {})
+    try:
+        assert store.wait_for_update([fast_id], lambda s: s[fast_id]['status'] == 'completed', 10)[fast_id]['status'] == 'completed'
+        assert store.get_job(slow_id)['status'] == 'running'
+    finally:
+        engine.release.set()
+        scheduler.shutdown()
+    assert store.get_job(slow_id)['status'] == 'completed'
+
+
+def test_job_stopped_while_preparing_never_starts(store, engine):
+    slow = make_spec('slow', "open('started', 'w').close()")
+    job_id = store.create_job(slow, {}, 'slow')
+    future = engine.start_job(job_id, slow, {})
+    store.wait_for_update([job_id], lambda s: s[job_id]['status'] == 'running', 5)
+
+    assert engine.stop_job(job_id)
+    engine.release.set()
+    assert future.result(timeout=10) is None
+    assert store.get_job(job_id)['status'] == 'stopped'
+    assert not engine.is_running(job_id)
+
+
+def test_cache_key_reuses_upload_digest(tmp_path, store, monkeypatch):
+    uploads = UploadStore(str(tmp_path / 'uploads'))
+    path = uploads.save(io.BytesIO(b'payload'), 'data.txt')
+    digest = uploads.digest_of(path)
+    assert digest == cache_module.hash_file(path)
+    assert uploads.digest_of(str(tmp_path / 'elsewhere' / f'{digest}.txt')) is None
+
+    result_cache = ResultCache(str(tmp_path / 'cache'))
+    spec = make_spec('fast')
+    expected = result_cache.key_for(spec, {'data': path}, {'data': path})
+
+    def no_hashing(path):
+        raise AssertionError("input was hashed again")
+    monkeypatch.setattr(cache_module, 'hash_file', no_hashing)
+    engine = JobExecutionEngine(store, warm_pool=None, upload_store=uploads)
+    try:
+        digests = engine._upload_digests(spec, {'data': path})
+    finally:
+        engine.shutdown()
+    assert digests == {'data': digest}
+    assert result_cache.key_for(spec, {'data': path}, {'data': path}, digests) == expected
+
+
+def test_recover_requeues_queued_and_fails_running_jobs(store, engine):
+    spec = make_spec('fast')
+    queued_id = store.create_job(spec, {}, 'queued')
+    running_id = store.create_job(spec, {}, 'running')
+    store.update_job_status(queued_id, 'queued')
+    store.update_job_status(running_id, 'running')
+
+    scheduler = JobScheduler(engine, max_workers=2)
+    finished = []
+    scheduler.add_listener(finished.append)
+    try:
+        scheduler.recover()
+        assert store.wait_for_update([queued_id], lambda s: s[queued_id]['status'] == 'completed', 10)[queued_id]['status'] == 'completed'
+    finally:
+        scheduler.shutdown()
+    running = store.get_job(running_id)
+    assert running['status'] == 'failed'
+    assert running['completed_at'] is not None
+    assert 'restart' in running['results']['error']
+    assert running_id in finished
+
+
+def test_recover_leaves_jobs_of_live_processes_alone(store, engine):
+    spec = make_spec('fast')
+    sibling = f"{socket.gethostname()}:{os.getppid()}:sibling"
+    earlier = f"{socket.gethostname()}:{os.getpid()}:earlier"
+    sibling_queued, sibling_running, earlier_running = (store.create_job(spec, {}, name) for name in ('a', 'b', 'c'))
+    store.update_job_status(sibling_queued, 'queued', owner=sibling)
+    store.update_job_status(sibling_running, 'running', owner=sibling)
+    store.update_job_status(earlier_running, 'running', owner=earlier)
+
+    scheduler = JobScheduler(engine, max_workers=2)
+    try:
+        scheduler.recover()
+        assert not scheduler.is_queued(sibling_queued)
+    finally:
+        scheduler.shutdown()
+    statuses = store.get_job_statuses([sibling_queued, sibling_running, earlier_running])
+    assert statuses[sibling_queued]['status'] == 'queued'
+    assert statuses[sibling_running]['status'] == 'running'
+    # Same pid as this process but another suffix: an earlier process that has exited
+    assert statuses[earlier_running]['status'] == 'failed'
+
+
+def test_concurrent_recovery_adopts_each_job_once(store):
+    spec = make_spec('fast')
+    job_ids = [store.create_job(spec, {}, str(i)) for i in range(5)]
+    store.update_jobs_status(job_ids, 'queued', owner='gone:1:x')
+
+    first = store.adopt_queued_jobs('gone:1:x', 'new:1:a')
+    second = store.adopt_queued_jobs('gone:1:x', 'new:2:b')
+    assert [job['id'] for job in first] == sorted(job_ids, key=lambda job_id: store.get_job(job_id)['created_at'])
+    assert second == []
+
+
+class CountingScheduler(JobScheduler):
+    RESOURCE_RECHECK_INTERVAL = 0.02
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checks = 0
+
+    def _next_job(self):
+        self.checks += 1
+        return super()._next_job()
+
+
+class FastHeldBudget(ResourceBudget):
+    """Budget that never admits the 'fast' spec."""
+
+    def __init__(self):
+        super().__init__(memory_bytes=1 << 40, cores=64, check_available=False)
+
+    def fits(self, spec):
+        return spec['id'] != 'fast'
+
+
+def checks_while_fast_waits(store, scheduler):
+    """Start a 'slow' job, queue a 'fast' one behind it and count dispatcher checks."""
+    slow, fast = make_spec('slow'), make_spec('fast')
+    scheduler.submit(store.create_job(slow, {}, 'slow'), slow, {})
+    deadline = time.monotonic() + 5
+    while not scheduler.stats()['running'] and time.monotonic() < deadline:
+        time.sleep(0.01)
+    scheduler.submit(store.create_job(fast, {}, 'fast'), fast, {})
+    start = scheduler.checks
+    time.sleep(0.3)
+    return scheduler.checks - start
+
+
+def test_dispatcher_sleeps_while_all_slots_are_busy(store, engine):
+    scheduler = CountingScheduler(engine, max_workers=1, budget=FastHeldBudget())
+    assert checks_while_fast_waits(store, scheduler) <= 2
+    engine.release.set()
+    scheduler.shutdown()
+
+
+def test_dispatcher_rechecks_jobs_held_back_by_the_budget(store, engine):
+    scheduler = CountingScheduler(engine, max_workers=2, budget=FastHeldBudget())
+    assert checks_while_fast_waits(store, scheduler) > 5
+    engine.release.set()
+    scheduler.shutdown()
+
+
+class RecordingEngine:
+    """Engine that records start order and keeps each job running until finished."""
+
+    def __init__(self, job_store):
+        self.job_store = job_store
+        self.started = []
+        self.futures = {}
+        self._cond = threading.Condition()
+
+    def start_job(self, job_id, spec, inputs):
+        future = Future()
+        with self._cond:
+            self.started.append(job_id)
+            self.futures[job_id] = future
+            self._cond.notify_all()
+        return future
+
+    def stop_job(self, job_id):
+        return False
+
+    def wait_started(self, count):
+        with self._cond:
+            assert self._cond.wait_for(lambda: len(self.started) >= count, 5)
+        time.sleep(0.05)
+        return list(self.started)
+
+    def finish(self, job_id):
+        self.futures[job_id].set_result({})
+
+
+def queue_jobs(store, scheduler, spec, count, **kwargs):
+    jobs = [(store.create_job(spec, {}, 'job'), spec, {}) for _ in range(count)]
+    scheduler.submit_many(jobs, **kwargs)
+    return [job_id for job_id, _, _ in jobs]
+
+
+def test_higher_priority_jobs_start_first(store):
+    engine = RecordingEngine(store)
+    scheduler = JobScheduler(engine, max_workers=1)
+    spec = make_spec('plain')
+    [blocker] = queue_jobs(store, scheduler, spec, 1)
+    engine.wait_started(1)
+
+    low = queue_jobs(store, scheduler, spec, 2)
+    urgent = queue_jobs(store, scheduler, dict(spec, priority=5), 1)
+    batch = queue_jobs(store, scheduler, spec, 1, priority=10)
+
+    expected = [blocker] + batch + urgent + low
+    for count, job_id in enumerate(expected, 1):
+        assert engine.wait_started(count) == expected[:count]
+        engine.finish(job_id)
+    scheduler.shutdown()
+
+
+def test_capped_specs_wait_without_holding_back_others(store):
+    engine = RecordingEngine(store)
+    capped = make_spec('capped')
+    capped['execution']['maxConcurrency'] = 1
+    limited = make_spec('limited')
+    scheduler = JobScheduler(engine, max_workers=4, spec_limits={'limited': 2})
+
+    capped_ids = queue_jobs(store, scheduler, capped, 2)
+    limited_ids = queue_jobs(store, scheduler, limited, 3)
+    other_ids = queue_jobs(store, scheduler, make_spec('other'), 1)
+
+    started = engine.wait_started(4)
+    assert sorted(started) == sorted(capped_ids[:1] + limited_ids[:2] + other_ids)
+    assert scheduler.stats()['running_by_spec'] == {'capped': 1, 'limited': 2, 'other': 1}
+
+    engine.finish(capped_ids[0])
+    assert engine.wait_started(5)[-1] == capped_ids[1]
+    engine.finish(limited_ids[0])
+    assert engine.wait_started(6)[-1] == limited_ids[2]
+    for job_id in engine.started:
+        if not engine.futures[job_id].done():
+            engine.finish(job_id)
+    scheduler.shutdown()
@@ -0,0 +1,114 @@
+import importlib
+import threading
+import time
+
+import pytest
+
+from jobsonTwo.storage.job_store import JobStore
+from jobsonTwo.tests.conftest import SPEC
+
+
+def update_later(store, job_id, status, delay=0.1):
+    timer = threading.Timer(delay, store.update_job_status, (job_id, status))
+    timer.start()
+    return timer
+
+
+def test_waiter_is_woken_by_a_status_update(store):
+    job_id = store.create_job(SPEC, {}, 'job')
+    timer = update_later(store, job_id, 'running')
+
+    started = time.monotonic()
+    statuses = store.wait_for_update([job_id], lambda s: s[job_id]['status'] != 'pending', 10)
+    timer.join()
+
+    assert statuses[job_id]['status'] == 'running'
+    assert time.monotonic() - started < 5
+
+
+def test_wait_returns_the_unchanged_statuses_after_the_timeout(store):
+    job_id = store.create_job(SPEC, {}, 'job')
+
+    started = time.monotonic()
+    statuses = store.wait_for_update([job_id, 'missing'], lambda s: s[job_id]['status'] != 'pending', 0.1)
+
+    assert time.monotonic() - started >= 0.1
+    assert statuses[job_id]['status'] == 'pending'
+    assert 'missing' not in statuses
+
+
+def test_updates_from_another_store_are_picked_up_by_polling(store):
+    job_id = store.create_job(SPEC, {}, 'job')
+    # A second store on the same database stands in for another process
+    timer = update_later(JobStore(store.jobs_dir), job_id, 'completed')
+
+    statuses = store.wait_for_update([job_id], lambda s: s[job_id]['status'] != 'pending', 10, poll_interval=0.05)
+    timer.join()
+
+    assert statuses[job_id]['status'] == 'completed'
+
+
+@pytest.fixture(scope='module')
+def app_module(tmp_path_factory):
+    # The app reads its configuration when first imported
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setenv('JOBSON_JOBS_DIR', str(tmp_path_factory.mktemp('jobs')))
+        mp.setenv('JOBSON_STATUS_MAX_WAIT', '10')
+        yield importlib.import_module('jobsonTwo.web.app')
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def job_id(app_module):
+    job_id = app_module.job_store.create_job(SPEC, {}, 'job')
+    yield job_id
+    app_module.job_store.delete_job(job_id)
+
+
+@pytest.mark.parametrize('wait', ['nan', 'inf', '-inf', 'soon', ''])
+def test_invalid_wait_is_rejected(client, job_id, wait):
+    response = client.get(f'/api/jobs/{job_id}/status?wait={wait}', headers={'If-None-Match': '"x"'})
+    assert response.status_code == 400
+    response = client.get(f'/api/jobs/status?ids={job_id}&wait={wait}', headers={'If-None-Match': '"x"'})
+    assert response.status_code == 400
+
+
+def test_unchanged_etag_gets_304(client, job_id):
+    response = client.get(f'/api/jobs/{job_id}/status')
+    assert response.status_code == 200
+    assert response.get_json()['status'] == 'pending'
+
+    response = client.get(f'/api/jobs/{job_id}/status', headers={'If-None-Match': response.headers['ETag']})
+    assert response.status_code == 304
+
+
+def test_wait_is_clamped(app_module, client, job_id, monkeypatch):
+    monkeypatch.setitem(app_module.app.config, 'STATUS_MAX_WAIT', 0.05)
+    etag = client.get(f'/api/jobs/{job_id}/status').headers['ETag']
+
+    response = client.get(f'/api/jobs/{job_id}/status?wait=1e9', headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert client.get(f'/api/jobs/{job_id}/status?wait=-5').status_code == 200
+
+
+def test_multi_job_status_long_polls_until_any_job_changes(app_module, client, job_id):
+    other_id = app_module.job_store.create_job(SPEC, {}, 'other')
+    try:
+        url = f'/api/jobs/status?ids={job_id},missing,{other_id},{job_id}'
+        response = client.get(url)
+        body = response.get_json()
+        assert [job['status'] for job in body['jobs']] == ['pending', 'pending']
+        assert not any(job['done'] for job in body['jobs'])
+        assert body['missing'] == ['missing']
+
+        timer = update_later(app_module.job_store, other_id, 'completed')
+        response = client.get(f'{url}&wait=10', headers={'If-None-Match': response.headers['ETag']})
+        timer.join()
+        assert response.status_code == 200
+        assert [job['done'] for job in response.get_json()['jobs']] == [False, True]
+    finally:
+        app_module.job_store.delete_job(other_id)
@@ -0,0 +1,77 @@
+import os
+import sys
+import time
+
+import pytest
+
+from jobsonTwo.execution.supervisor import ProcessSupervisor
+from jobsonTwo.execution.warm_pool import WarmPool
+
+# Starts a child that ignores SIGTERM and records its pid once it does, then waits to be terminated itself
+SCRIPT = '''
+import subprocess, sys, time
+subprocess.Popen([sys.executable, '-c', CHILD])
+time.sleep(60)
+'''.replace('CHILD', repr('''
+import os, signal, time
+signal.signal(signal.SIGTERM, signal.SIG_IGN)
+with open('child.pid', 'w') as f:
+    f.write(str(os.getpid()))
+time.sleep(60)
+'''))
+
+
+def wait_for(predicate, timeout=10):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    # A killed child of an exited parent is reaped by init; until then it is a zombie
+    with open(f'/proc/{pid}/stat') as f:
+        return f.read().split(')')[-1].split()[0] != 'Z'
+
+
+@pytest.fixture
+def supervisor():
+    supervisor = ProcessSupervisor()
+    yield supervisor
+    supervisor.shutdown()
+
+
+def read_child_pid(tmp_path):
+    assert wait_for(lambda: (tmp_path / 'child.pid').exists() and (tmp_path / 'child.pid').read_text())
+    return int((tmp_path / 'child.pid').read_text())
+
+
+def test_group_members_ignoring_sigterm_are_killed_after_the_grace_period(supervisor, tmp_path):
+    process = supervisor.spawn([sys.executable, '-c', SCRIPT], str(tmp_path), dict(os.environ),
+                               str(tmp_path / 'stdout.log'), str(tmp_path / 'stderr.log'))
+    child = read_child_pid(tmp_path)
+
+    supervisor.stop(process, grace_period=0.5)
+    process.wait(timeout=10)
+    assert alive(child)
+    assert wait_for(lambda: not alive(child))
+
+
+def test_warm_group_members_ignoring_sigterm_are_killed(supervisor, tmp_path):
+    pool = WarmPool(start_timeout=30)
+    try:
+        process = pool.spawn([sys.executable, '-c', SCRIPT], [], str(tmp_path), dict(os.environ),
+                             str(tmp_path / 'stdout.log'), str(tmp_path / 'stderr.log'))
+        child = read_child_pid(tmp_path)
+
+        supervisor.stop(process, grace_period=0.5)
+        process.wait(timeout=10)
+        assert wait_for(lambda: not alive(child))
+    finally:
+        pool.shutdown()
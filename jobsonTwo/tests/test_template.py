@@ -0,0 +1,64 @@
+import sys
+
+import pytest
+import yaml
+
+from jobsonTwo.execution.engine import JobExecutionEngine
+from jobsonTwo.specs.loader import JobSpecLoader
+from jobsonTwo.specs.template import ArgumentTemplate, CompiledSpec, compile_argument, compile_arguments
+from jobsonTwo.storage.job_store import JobStore
+
+SPEC = {
+    'name': 'Greeter',
+    'description': 'Test spec',
+    'expectedInputs': [
+        {'id': 'name', 'name': 'Name', 'description': 'Who to greet', 'type': 'string'},
+        {'id': 'limit', 'name': 'Limit', 'description': 'Optional limit', 'type': 'number', 'optional': True},
+        {'id': 'data', 'name': 'Data', 'description': 'Optional file', 'type': 'file', 'optional': True},
+    ],
+    'execution': {'application': sys.executable, 'arguments': ['-c', 'pass', 'hello ${inputs.name}!', '--limit=${inputs.limit}', 3]},
+    'outputs': [],
+}
+
+
+def test_arguments_compile_into_literals_and_references():
+    template = compile_argument('a ${inputs.x} b ${inputs.y}${inputs.x}', {'x', 'y'})
+    assert template.segments == ((False, 'a '), (True, 'x'), (False, ' b '), (True, 'y'), (True, 'x'))
+    assert template.render({'x': '1', 'y': '2'}) == 'a 1 b 21'
+    assert compile_argument('plain', set()).segments == ((False, 'plain'),)
+
+
+def test_loaded_specs_carry_their_templates():
+    spec = JobSpecLoader().load_from_string(yaml.safe_dump(SPEC))
+    assert isinstance(spec, CompiledSpec)
+    assert spec == SPEC
+    assert spec.argument_templates[2].segments == ((False, 'hello '), (True, 'name'), (False, '!'))
+
+
+def test_missing_optional_inputs_render_empty():
+    templates = compile_arguments(SPEC)
+    assert templates[-1] == 3
+    assert [t.render({'name': 'Ada'}) for t in templates if isinstance(t, ArgumentTemplate)] == \
+        ['-c', 'pass', 'hello Ada!', '--limit=']
+
+
+@pytest.mark.parametrize('arg, error', [
+    ('${inputs.other}', 'unknown input'),
+    ('${inputs.name', 'Unterminated'),
+])
+def test_bad_references_are_rejected_when_the_spec_loads(arg, error):
+    spec = dict(SPEC, execution=dict(SPEC['execution'], arguments=['-c', 'pass', arg]))
+    with pytest.raises(ValueError, match=error):
+        JobSpecLoader().load_from_string(yaml.safe_dump(spec))
+
+
+def test_compiled_and_plain_specs_prepare_the_same_command(tmp_path):
+    engine = JobExecutionEngine(JobStore(str(tmp_path / 'jobs')), warm_pool=None, compress_artifacts=False)
+    try:
+        inputs = {'name': 'Ada', 'limit': 5}
+        input_files = {'data': str(tmp_path / 'input_data.txt')}
+        compiled = engine._prepare_command(CompiledSpec(SPEC), inputs, input_files)
+        assert compiled == engine._prepare_command(SPEC, inputs, input_files)
+        assert compiled[3:] == ['hello Ada!', '--limit=5', 3]
+    finally:
+        engine.shutdown()
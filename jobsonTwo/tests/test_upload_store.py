@@ -0,0 +1,44 @@
+import hashlib
+import io
+import os
+import stat
+
+import pytest
+
+from jobsonTwo.storage.upload_store import UploadStore
+
+
+@pytest.fixture
+def uploads(tmp_path):
+    return UploadStore(str(tmp_path / 'uploads'), chunk_size=4)
+
+
+def test_identical_uploads_share_one_read_only_file(uploads):
+    first = uploads.save(io.BytesIO(b'same bytes'), 'a.txt')
+    second = uploads.save(io.BytesIO(b'same bytes'), '../b.txt')
+    other = uploads.save(io.BytesIO(b'other bytes'), 'a.txt')
+
+    digest = hashlib.sha256(b'same bytes').hexdigest()
+    assert first == second == uploads.path_for(digest, '.txt')
+    assert other != first
+    assert stat.S_IMODE(os.stat(first).st_mode) == 0o444
+    # Only the stored files remain; no temporary files are left behind
+    assert sorted(os.listdir(os.path.dirname(first))) == [os.path.basename(first)]
+
+
+def test_uploads_are_found_by_digest(uploads):
+    path = uploads.save(io.BytesIO(b'payload'), 'data.CSV')
+    digest = hashlib.sha256(b'payload').hexdigest()
+
+    assert path.endswith('.csv')
+    assert uploads.find(digest) == path
+    assert uploads.digest_of(path) == digest
+    assert uploads.find('0' * 64) is None
+    assert uploads.find('../' + digest[3:]) is None
+
+
+def test_files_outside_the_store_have_no_digest(uploads, tmp_path):
+    outside = tmp_path / ('a' * 64 + '.txt')
+    outside.write_bytes(b'x')
+    assert not uploads.contains(str(outside))
+    assert uploads.digest_of(str(outside)) is None
@@ -0,0 +1,37 @@
+import os
+import signal
+import sys
+
+import pytest
+
+from jobsonTwo.execution.warm_pool import WarmPool
+
+
+@pytest.fixture
+def pool():
+    pool = WarmPool(start_timeout=30)
+    yield pool
+    pool.shutdown()
+
+
+def spawn(pool, tmp_path, script, preload=()):
+    return pool.spawn([sys.executable, '-c', script], list(preload), str(tmp_path), {},
+                      str(tmp_path / 'stdout.log'), str(tmp_path / 'stderr.log'))
+
+
+def test_preload_printing_to_stdout_does_not_break_the_pool(pool, tmp_path):
+    # Importing 'this' prints the Zen of Python to stdout
+    for i in range(2):
+        process = spawn(pool, tmp_path, f'print("job {i}")', preload=['this'])
+        assert process.wait(timeout=30) == 0
+        assert (tmp_path / 'stdout.log').read_text() == f'job {i}\n'
+
+
+def test_running_jobs_fail_when_the_zygote_dies(pool, tmp_path):
+    process = spawn(pool, tmp_path, 'import time; time.sleep(60)')
+    zygote = next(iter(pool._zygotes.values()))
+    zygote.process.kill()
+
+    assert process.wait(timeout=10) == -signal.SIGKILL
+    os.killpg(process.pid, signal.SIGKILL)
+    assert spawn(pool, tmp_path, 'pass').wait(timeout=30) == 0
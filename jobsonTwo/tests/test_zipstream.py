@@ -0,0 +1,39 @@
+import io
+import zipfile
+
+from jobsonTwo.web import zipstream
+from jobsonTwo.web.zipstream import iter_zip
+
+
+def read_zip(chunks):
+    return zipfile.ZipFile(io.BytesIO(b''.join(chunks)))
+
+
+def test_streams_paths_bytes_and_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(zipstream, 'COPY_CHUNK_SIZE', 1024)
+    path = tmp_path / 'output.txt'
+    path.write_bytes(b'x' * 5000)
+
+    archive = read_zip(iter_zip([
+        ('job/output.txt', str(path)),
+        ('job/results.json', b'{}'),
+        ('job/stream.bin', io.BytesIO(bytes(range(256)) * 40)),
+    ]))
+    assert archive.testzip() is None
+    assert archive.read('job/output.txt') == b'x' * 5000
+    assert archive.read('job/results.json') == b'{}'
+    assert archive.read('job/stream.bin') == bytes(range(256)) * 40
+
+
+def test_entries_of_unknown_size_may_exceed_the_zip64_limit(tmp_path, monkeypatch):
+    # Lower the limit so an ordinary entry crosses it
+    monkeypatch.setattr(zipfile, 'ZIP64_LIMIT', 1000)
+    path = tmp_path / 'large.bin'
+    path.write_bytes(b'a' * 4000)
+
+    archive = read_zip(iter_zip([
+        ('stream.bin', io.BytesIO(b'b' * 4000)),
+        ('large.bin', str(path)),
+    ]))
+    assert archive.read('stream.bin') == b'b' * 4000
+    assert archive.read('large.bin') == b'a' * 4000
@@ -1,12 +1,30 @@
 import os
-from flask import Flask, render_template, request, redirect, url_for, flash, send_file
-from werkzeug.utils import secure_filename
+from flask import Flask, render_template, request, redirect, url_for, flash, send_file, jsonify, Response, stream_with_context, g
 import os
-from ..execution.engine import JobExecutionEngine
-from ..storage.job_store import JobStore
+from ..execution.engine import JobExecutionEngine, STDOUT_FILE, STDERR_FILE
+from ..execution.output import read_new_lines
+from ..execution.compression import find_sidecar, has_sidecars
+from ..execution.job_log import read_log_records, LOG_FILE
+from .previews import PreviewCache, BINARY_PREVIEW, ARCHIVED_PREVIEW
+from .zipstream import iter_zip
+from ..execution.scheduler import JobScheduler
+from ..execution.pipeline import PipelineRunner
+from ..execution.cache import ResultCache
+from ..execution.resources import ResourceBudget
+from ..storage.job_store import JobStore, TERMINAL_STATUSES
+from ..storage.upload_store import UploadStore
+from ..storage.job_queue import JobQueue
+from ..storage.retention import RetentionService, open_archived_file
 from jobsonTwo.specs.loader import JobSpecLoader
-import threading
+from jobsonTwo.specs.registry import SpecRegistry
+from jobsonTwo.specs.pipeline import PipelineLoader
+from jobsonTwo.specs.inputs import validate_inputs
+from ..metrics import REGISTRY, REQUEST_SECONDS, SCHEDULER_JOBS, RESULT_CACHE
+import time
 import json
+import math
+import hashlib
+import itertools
 from datetime import datetime
 
 app = Flask(__name__, template_folder='templates')
@@ -17,37 +35,204 @@ UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'upload
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
+# Directory holding job files and the job database, shared with any workers
+app.config['JOBS_DIR'] = os.environ.get('JOBSON_JOBS_DIR', os.path.join(os.path.dirname(os.path.dirname(__file__)), 'jobs'))
+
+# 'local' runs jobs in this process; 'worker' only enqueues them for worker.py processes
+app.config['EXECUTION_MODE'] = os.environ.get('JOBSON_EXECUTION_MODE', 'local')
+
+# Number of jobs allowed to run at once across all specs
+app.config['MAX_WORKERS'] = int(os.environ.get('JOBSON_MAX_WORKERS', os.cpu_count() or 1))
+
+# Host budget for admitting jobs by their spec's resources hints (defaults: MemAvailable, CPU count)
+app.config['MEMORY_BUDGET_MB'] = os.environ.get('JOBSON_MEMORY_BUDGET_MB')
+app.config['CORE_BUDGET'] = os.environ.get('JOBSON_CORE_BUDGET')
+
+# Opt-in cache of job outputs, keyed on spec and input contents
+app.config['RESULT_CACHE_DIR'] = os.environ.get('JOBSON_RESULT_CACHE_DIR')
+app.config['RESULT_CACHE_MAX_BYTES'] = int(os.environ.get('JOBSON_RESULT_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+
+# Bytes of each output file shown on the job page (half from the start, half from the end)
+app.config['PREVIEW_BYTES'] = int(os.environ.get('JOBSON_PREVIEW_BYTES', 64 * 1024))
+
+# Print job log records to the server's stdout as well as each job's log file
+app.config['LOG_ECHO'] = os.environ.get('JOBSON_LOG_ECHO', '').lower() in ('1', 'true', 'yes')
+
+# Write gzip/zstd copies of finished jobs' compressible files, served to clients that accept them
+app.config['COMPRESS_ARTIFACTS'] = os.environ.get('JOBSON_COMPRESS_ARTIFACTS', '1').lower() in ('1', 'true', 'yes')
+
+# Retention: TTLs in hours as JSON objects keyed by status or spec id, e.g.
+# JOBSON_RETENTION_STATUS_TTL_HOURS='{"failed": 168, "completed": 720}'
+app.config['RETENTION_STATUS_TTL_HOURS'] = json.loads(os.environ.get('JOBSON_RETENTION_STATUS_TTL_HOURS', '{}'))
+app.config['RETENTION_SPEC_TTL_HOURS'] = json.loads(os.environ.get('JOBSON_RETENTION_SPEC_TTL_HOURS', '{}'))
+# Hours after completion before a job directory is archived into a zip
+app.config['ARCHIVE_AFTER_HOURS'] = os.environ.get('JOBSON_ARCHIVE_AFTER_HOURS')
+# Size quotas for job files and uploads
+app.config['JOBS_QUOTA_MB'] = os.environ.get('JOBSON_JOBS_QUOTA_MB')
+app.config['UPLOADS_QUOTA_MB'] = os.environ.get('JOBSON_UPLOADS_QUOTA_MB')
+# Hours an upload no job refers to is kept before being collected (unset: never collected)
+app.config['UPLOAD_GRACE_HOURS'] = os.environ.get('JOBSON_UPLOAD_GRACE_HOURS')
+app.config['RETENTION_INTERVAL'] = float(os.environ.get('JOBSON_RETENTION_INTERVAL', 600))
+
+# Job listing page sizes
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Longest a status request may block with ?wait=<seconds>
+app.config['STATUS_MAX_WAIT'] = float(os.environ.get('JOBSON_STATUS_MAX_WAIT', 60))
+# Seconds between status re-reads while long-polling. Only needed when other
+# processes update jobs (worker mode, several web processes); otherwise waiters
+# are woken by this process's own status updates.
+app.config['STATUS_POLL_INTERVAL'] = float(os.environ.get(
+    'JOBSON_STATUS_POLL_INTERVAL', 1.0 if app.config['EXECUTION_MODE'] == 'worker' else 0
+)) or None
+# Most jobs a single multi-job status request may watch
+MAX_STATUS_JOBS = 500
+
+# Job log records returned per page
+LOG_PAGE_SIZE = 200
+
+# Seconds between checks for new output while tailing a running job
+LOG_STREAM_POLL_INTERVAL = 0.5
+
+# Seconds between checks of unfinished pipeline runs for steps that can start
+PIPELINE_POLL_INTERVAL = 1.0
+
+# Largest number of jobs a single batch submission may create
+app.config['MAX_BATCH_SIZE'] = int(os.environ.get('JOBSON_MAX_BATCH_SIZE', 10000))
+
+# Prefix of file input values that refer to a stored upload by digest
+UPLOAD_REF_PREFIX = 'sha256:'
+
+JOB_STATUSES = ['pending', 'queued', 'running', 'completed', 'failed', 'stopped']
+
+# Files every job directory holds, downloadable by name
+JOB_FILES = {'log': LOG_FILE, 'results': 'results.json', 'stdout': STDOUT_FILE, 'stderr': STDERR_FILE}
+
 # Initialize components
 spec_loader = JobSpecLoader()
-job_store = JobStore(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'jobs'))
-job_engine = JobExecutionEngine(job_store)
+spec_registry = SpecRegistry(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'specs'), spec_loader)
+upload_store = UploadStore(app.config['UPLOAD_FOLDER'])
+job_store = JobStore(app.config['JOBS_DIR'])
+result_cache = None
+if app.config['RESULT_CACHE_DIR']:
+    result_cache = ResultCache(app.config['RESULT_CACHE_DIR'], app.config['RESULT_CACHE_MAX_BYTES'])
+job_engine = JobExecutionEngine(job_store, result_cache=result_cache, log_echo=app.config['LOG_ECHO'],
+                                compress_artifacts=app.config['COMPRESS_ARTIFACTS'], upload_store=upload_store)
+resource_budget = ResourceBudget(
+    memory_bytes=int(float(app.config['MEMORY_BUDGET_MB']) * 1024 * 1024) if app.config['MEMORY_BUDGET_MB'] else None,
+    cores=float(app.config['CORE_BUDGET']) if app.config['CORE_BUDGET'] else None
+)
+if app.config['EXECUTION_MODE'] == 'worker':
+    job_scheduler = JobQueue(job_store)
+else:
+    job_scheduler = JobScheduler(job_engine, max_workers=app.config['MAX_WORKERS'], budget=resource_budget)
+    job_scheduler.recover()
+pipeline_registry = SpecRegistry(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'pipelines'), PipelineLoader())
+pipeline_runner = PipelineRunner(job_store, job_scheduler, spec_registry, poll_interval=PIPELINE_POLL_INTERVAL)
+pipeline_runner.start()
+preview_cache = PreviewCache(app.config['PREVIEW_BYTES'] // 2, app.config['PREVIEW_BYTES'] // 2)
+retention_service = RetentionService(
+    job_store,
+    upload_store,
+    status_ttls={k: float(v) * 3600 for k, v in app.config['RETENTION_STATUS_TTL_HOURS'].items()},
+    spec_ttls={k: float(v) * 3600 for k, v in app.config['RETENTION_SPEC_TTL_HOURS'].items()},
+    archive_after=float(app.config['ARCHIVE_AFTER_HOURS']) * 3600 if app.config['ARCHIVE_AFTER_HOURS'] else None,
+    jobs_quota=int(float(app.config['JOBS_QUOTA_MB']) * 1024 * 1024) if app.config['JOBS_QUOTA_MB'] else None,
+    uploads_quota=int(float(app.config['UPLOADS_QUOTA_MB']) * 1024 * 1024) if app.config['UPLOADS_QUOTA_MB'] else None,
+    upload_grace=float(app.config['UPLOAD_GRACE_HOURS']) * 3600 if app.config['UPLOAD_GRACE_HOURS'] else None,
+    interval=app.config['RETENTION_INTERVAL']
+)
+if app.config['RETENTION_INTERVAL'] > 0 and retention_service.is_configured():
+    retention_service.start()
+
+def scheduler_gauges():
+    stats = job_scheduler.stats()
+    return {('queued',): stats['queued'], ('running',): stats['running']}
+
+def result_cache_gauges():
+    if result_cache is None:
+        return {}
+    return {(stat,): value for stat, value in result_cache.stats().items()}
+
+SCHEDULER_JOBS.set_function(scheduler_gauges)
+RESULT_CACHE.set_function(result_cache_gauges)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_latency(response):
+    # Label by endpoint rather than path so job ids don't create a series each
+    started = g.pop('request_started', None)
+    if started is not None:
+        REQUEST_SECONDS.labels(request.endpoint or 'unmatched', request.method, str(response.status_code)).observe(
+            time.perf_counter() - started)
+    return response
 
 def get_job_types():
-    """Get list of available job types from specs directory"""
-    try:
-        specs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'specs')
-        specs = []
-        for spec_file in os.listdir(specs_dir):
-            if spec_file.endswith('.yaml'):
-                spec_path = os.path.join(specs_dir, spec_file)
-                spec = spec_loader.load_from_file(spec_path)
-                # Add the job type ID (filename without extension)
-                spec['id'] = os.path.splitext(spec_file)[0]
-                specs.append(spec)
-        return specs
-    except Exception as e:
-        print(f"Error loading job types: {e}")
-        return []
+    """Get list of available job types from the spec registry"""
+    return spec_registry.list_specs()
+
+def send_artifact(path):
+    """Send a job file as a download supporting Range and conditional requests.
+
+    If the client accepts a coding the file was precompressed in, its
+    sidecar is sent with Content-Encoding instead; each representation has
+    its own ETag.
+    """
+    sidecar = find_sidecar(path, request.accept_encodings)
+    if sidecar is None:
+        response = send_file(path, as_attachment=True, conditional=True, etag=True, max_age=0)
+        if has_sidecars(path):
+            response.vary.add('Accept-Encoding')
+        return response
+    sidecar_path, encoding = sidecar
+    response = send_file(sidecar_path, as_attachment=True, download_name=os.path.basename(path), conditional=True,
+                         etag=True, max_age=0)
+    response.headers['Content-Encoding'] = encoding
+    response.vary.add('Accept-Encoding')
+    return response
+
+def open_job_file(job, path):
+    """Return a job file's path, or an open file from the job's archive if it has been archived"""
+    if os.path.exists(path) or not job.get('archived_at'):
+        return path
+    archived = open_archived_file(job_store.archive_path(job['id']), os.path.join(job_store.jobs_dir, job['id']), path)
+    if archived is None:
+        raise FileNotFoundError(f"File not found: {path}")
+    return archived[0]
+
+def send_job_file(job, path):
+    """Send a job file, reading it from the job's archive if the job has been archived"""
+    if os.path.exists(path) or not job.get('archived_at'):
+        return send_artifact(path)
+    archived = open_archived_file(job_store.archive_path(job['id']), os.path.join(job_store.jobs_dir, job['id']), path)
+    if archived is None:
+        raise FileNotFoundError(f"File not found: {path}")
+    fileobj, info = archived
+    # Archive members can't be served by range, but still get a stable validator
+    return send_file(fileobj, as_attachment=True, download_name=os.path.basename(path), conditional=True,
+                     etag=f"{job['id']}-{info.CRC:08x}-{info.file_size}",
+                     last_modified=datetime(*info.date_time), max_age=0)
+
+def get_spec(job_type):
+    """Look up a job spec by type, raising if it does not exist"""
+    spec = spec_registry.get(job_type)
+    if spec is None:
+        raise FileNotFoundError(f"Job spec not found: {job_type}")
+    return spec
 
 @app.route('/')
 def index():
     """Home page showing recent jobs and stats"""
     jobs = job_store.list_jobs(limit=5)
     stats = {
-        'total_jobs': len(job_store.list_jobs()),
-        'running_jobs': len(job_store.list_jobs(status='running')),
-        'completed_jobs': len(job_store.list_jobs(status='completed')),
-        'failed_jobs': len(job_store.list_jobs(status='failed'))
+        'total_jobs': job_store.count_jobs(),
+        'running_jobs': job_store.count_jobs(status='running'),
+        'completed_jobs': job_store.count_jobs(status='completed'),
+        'failed_jobs': job_store.count_jobs(status='failed')
     }
     job_types = get_job_types()
     
@@ -55,6 +240,7 @@ def index():
     for job in jobs:
         status_colors = {
             'pending': 'warning',
+            'queued': 'warning',
             'running': 'info',
             'completed': 'success',
             'failed': 'danger',
@@ -64,15 +250,34 @@ def index():
     
     return render_template('index.html', jobs=jobs, stats=stats, job_types=job_types)
 
+def get_page_args():
+    """Read pagination and filter arguments from the query string"""
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        limit = DEFAULT_PAGE_SIZE
+    return {
+        'limit': max(1, min(limit, MAX_PAGE_SIZE)),
+        'status': request.args.get('status') or None,
+        'job_type': request.args.get('type') or None,
+        'cursor': request.args.get('cursor') or None,
+    }
+
 @app.route('/jobs')
 def jobs():
-    """List all jobs"""
-    jobs = job_store.list_jobs()
+    """List jobs one page at a time"""
+    page_args = get_page_args()
+    try:
+        jobs, next_cursor = job_store.list_jobs_page(summary=True, **page_args)
+    except ValueError as e:
+        flash(str(e), 'error')
+        return redirect(url_for('jobs'))
     
     # Add status colors for badges
     for job in jobs:
         status_colors = {
             'pending': 'warning',
+            'queued': 'warning',
             'running': 'info',
             'completed': 'success',
             'failed': 'danger',
@@ -80,7 +285,24 @@ def jobs():
         }
         job['status_color'] = status_colors.get(job['status'], 'secondary')
     
-    return render_template('jobs.html', jobs=jobs)
+    return render_template(
+        'jobs.html',
+        jobs=jobs,
+        next_cursor=next_cursor,
+        filters=page_args,
+        statuses=JOB_STATUSES,
+        job_types=get_job_types()
+    )
+
+@app.route('/api/jobs')
+def api_jobs():
+    """List job summaries one page at a time as JSON"""
+    page_args = get_page_args()
+    try:
+        jobs, next_cursor = job_store.list_jobs_page(summary=True, **page_args)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify({'jobs': jobs, 'next_cursor': next_cursor})
 
 @app.route('/jobs/new', methods=['GET', 'POST'])
 def new_job():
@@ -92,9 +314,7 @@ def new_job():
             return render_template('new_job.html', job_types=job_types)
         
         try:
-            specs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'specs')
-            spec_path = os.path.join(specs_dir, f"{job_type}.yaml")
-            spec = spec_loader.load_from_file(spec_path)
+            spec = get_spec(job_type)
             return render_template('new_job.html', spec=spec, job_type=job_type)
         except Exception as e:
             flash(f"Error loading job spec: {str(e)}", 'error')
@@ -107,9 +327,7 @@ def new_job():
             return redirect(url_for('new_job'))
         
         try:
-            specs_dir = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'specs')
-            spec_path = os.path.join(specs_dir, f"{job_type}.yaml")
-            spec = spec_loader.load_from_file(spec_path)
+            spec = get_spec(job_type)
             inputs = {}
             
             # Process form inputs
@@ -119,13 +337,20 @@ def new_job():
                     if input_id in request.files:
                         file = request.files[input_id]
                         if file.filename:
-                            filename = secure_filename(file.filename)
-                            filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
-                            file.save(filepath)
-                            inputs[input_id] = filepath
+                            inputs[input_id] = upload_store.save(file.stream, file.filename)
+                elif input_spec['type'] == 'boolean':
+                    # Unchecked checkboxes are not submitted at all
+                    inputs[input_id] = input_id in request.form
                 else:
                     inputs[input_id] = request.form.get(input_id)
             
+            # Reject bad inputs before the job takes a worker slot
+            try:
+                inputs = validate_inputs(spec, inputs)
+            except ValueError as e:
+                flash(str(e), 'error')
+                return redirect(url_for('new_job', type=job_type))
+            
             # Create job
             job_id = job_store.create_job(
                 spec=spec,
@@ -134,13 +359,9 @@ def new_job():
                 description=request.form.get('description', '')
             )
             
-            # Start job execution in background
-            thread = threading.Thread(
-                target=execute_job_background,
-                args=(job_id, spec, inputs)
-            )
-            thread.daemon = True
-            thread.start()
+            # Queue job for execution
+            priority = request.form.get('priority')
+            job_scheduler.submit(job_id, spec, inputs, priority=int(priority) if priority else None)
             
             return redirect(url_for('job_details', job_id=job_id))
         
@@ -148,6 +369,295 @@ def new_job():
             flash(f"Error creating job: {str(e)}", 'error')
             return redirect(url_for('new_job'))
 
+def status_etag(statuses, job_ids):
+    """ETag over the status and timestamps of some jobs"""
+    raw = json.dumps([statuses.get(job_id) for job_id in job_ids], sort_keys=True)
+    return hashlib.sha1(raw.encode('utf-8')).hexdigest()[:20]
+
+def parse_wait():
+    """Seconds to long-poll for from ?wait=, clamped to STATUS_MAX_WAIT, or None if it is not a finite number"""
+    try:
+        wait = float(request.args.get('wait', 0))
+    except ValueError:
+        return None
+    if not math.isfinite(wait):
+        return None
+    return min(max(wait, 0), app.config['STATUS_MAX_WAIT'])
+
+def read_statuses(job_ids, wait):
+    """Read job statuses, long-polling for up to wait seconds while the client's ETag is current"""
+    if wait and request.if_none_match:
+        statuses = job_store.wait_for_update(
+            job_ids,
+            lambda current: not request.if_none_match.contains(status_etag(current, job_ids)),
+            wait,
+            app.config['STATUS_POLL_INTERVAL']
+        )
+    else:
+        statuses = job_store.get_job_statuses(job_ids)
+    return statuses, status_etag(statuses, job_ids)
+
+def status_response(payload, etag):
+    """JSON status response, or 304 Not Modified if the client already has it"""
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = jsonify(payload)
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def status_summary(status):
+    return dict(status, done=status['status'] in TERMINAL_STATUSES)
+
+@app.route('/api/jobs/<job_id>/status')
+def api_job_status(job_id):
+    """Status and timestamps of one job, with ETag and ?wait= long-polling"""
+    wait = parse_wait()
+    if wait is None:
+        return jsonify({'error': "wait must be a number of seconds"}), 400
+    statuses, etag = read_statuses([job_id], wait)
+    if job_id not in statuses:
+        return jsonify({'error': "Job not found"}), 404
+    return status_response(status_summary(statuses[job_id]), etag)
+
+@app.route('/api/jobs/status')
+def api_jobs_status():
+    """Status of many jobs (?ids=a,b,...); long-polling returns when any of them changes"""
+    job_ids = list(dict.fromkeys(job_id for job_id in request.args.get('ids', '').split(',') if job_id))
+    if not job_ids:
+        return jsonify({'error': "ids must list at least one job id"}), 400
+    if len(job_ids) > MAX_STATUS_JOBS:
+        return jsonify({'error': f"At most {MAX_STATUS_JOBS} jobs per request"}), 400
+    wait = parse_wait()
+    if wait is None:
+        return jsonify({'error': "wait must be a number of seconds"}), 400
+    statuses, etag = read_statuses(job_ids, wait)
+    return status_response({
+        'jobs': [status_summary(statuses[job_id]) for job_id in job_ids if job_id in statuses],
+        'missing': [job_id for job_id in job_ids if job_id not in statuses],
+    }, etag)
+
+@app.route('/api/uploads', methods=['POST'])
+def api_upload():
+    """Store an uploaded file and return a reference usable as a batch file input"""
+    file = request.files.get('file')
+    if not file or not file.filename:
+        return jsonify({'error': "No file uploaded"}), 400
+    path = upload_store.save(file.stream, file.filename)
+    digest = os.path.splitext(os.path.basename(path))[0]
+    return jsonify({'ref': f"{UPLOAD_REF_PREFIX}{digest}"}), 201
+
+def expand_batch_inputs(spec, payload):
+    """Build the validated per-job inputs for a batch from an explicit list or a cartesian sweep"""
+    if 'inputs' in payload:
+        input_sets = payload['inputs']
+        if not isinstance(input_sets, list) or not all(isinstance(i, dict) for i in input_sets):
+            raise ValueError("inputs must be a list of objects")
+    elif 'sweep' in payload:
+        sweep = payload['sweep']
+        base = payload.get('base', {})
+        if not isinstance(sweep, dict) or not all(isinstance(v, list) and v for v in sweep.values()):
+            raise ValueError("sweep must map input ids to non-empty lists of values")
+        if not isinstance(base, dict):
+            raise ValueError("base must be an object")
+        size = 1
+        for values in sweep.values():
+            size *= len(values)
+        if size > app.config['MAX_BATCH_SIZE']:
+            raise ValueError(f"Batch too large: {size} jobs (limit {app.config['MAX_BATCH_SIZE']})")
+        keys = list(sweep)
+        input_sets = [dict(base, **dict(zip(keys, combo))) for combo in itertools.product(*sweep.values())]
+    else:
+        raise ValueError("Batch must specify either inputs or sweep")
+
+    if not input_sets:
+        raise ValueError("Batch is empty")
+    if len(input_sets) > app.config['MAX_BATCH_SIZE']:
+        raise ValueError(f"Batch too large: {len(input_sets)} jobs (limit {app.config['MAX_BATCH_SIZE']})")
+
+    input_specs = {input_spec['id']: input_spec for input_spec in spec['expectedInputs']}
+    resolved_uploads = {}
+    batch_inputs = []
+    for index, input_set in enumerate(input_sets):
+        unknown = set(input_set) - set(input_specs)
+        if unknown:
+            raise ValueError(f"Unknown inputs: {sorted(unknown)}")
+        inputs = {}
+        for input_id, value in input_set.items():
+            if input_specs[input_id]['type'] == 'file' and value is not None:
+                if not isinstance(value, str) or not value.startswith(UPLOAD_REF_PREFIX):
+                    raise ValueError(f"File input {input_id} must be an upload reference ({UPLOAD_REF_PREFIX}<digest>)")
+                if value not in resolved_uploads:
+                    resolved_uploads[value] = upload_store.find(value[len(UPLOAD_REF_PREFIX):])
+                if resolved_uploads[value] is None:
+                    raise ValueError(f"Unknown upload: {value}")
+                value = resolved_uploads[value]
+            inputs[input_id] = value
+        try:
+            batch_inputs.append(validate_inputs(spec, inputs))
+        except ValueError as e:
+            raise ValueError(f"Job {index + 1}: {e}" if len(input_sets) > 1 else str(e))
+    return batch_inputs
+
+def batch_summary(batch):
+    """Aggregate progress counts for a batch"""
+    counts = batch['counts']
+    finished = sum(counts.get(status, 0) for status in ('completed', 'failed', 'stopped'))
+    return {
+        'batch_id': batch['id'],
+        'type': batch['type'],
+        'created_at': batch['created_at'],
+        'total': batch['size'],
+        'counts': counts,
+        'finished': finished,
+        'done': finished >= batch['size'],
+        'results_url': url_for('api_batch_results', batch_id=batch['id']),
+    }
+
+@app.route('/api/batches', methods=['POST'])
+def api_create_batch():
+    """Create and queue a batch of jobs for one spec"""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or not payload.get('spec'):
+        return jsonify({'error': "Request body must be a JSON object with a spec"}), 400
+
+    spec = spec_registry.get(payload['spec'])
+    if spec is None:
+        return jsonify({'error': f"Job spec not found: {payload['spec']}"}), 404
+
+    try:
+        batch_inputs = expand_batch_inputs(spec, payload)
+        priority = payload.get('priority')
+        priority = int(priority) if priority is not None else None
+    except (ValueError, TypeError) as e:
+        return jsonify({'error': str(e)}), 400
+
+    name = payload.get('name') or spec['name']
+    batch_id, job_ids = job_store.create_batch(spec, [
+        {'inputs': inputs, 'name': f"{name} #{i + 1}", 'description': payload.get('description', '')}
+        for i, inputs in enumerate(batch_inputs)
+    ])
+    job_scheduler.submit_many(
+        [(job_id, spec, inputs) for job_id, inputs in zip(job_ids, batch_inputs)],
+        priority=priority
+    )
+    return jsonify(batch_summary(job_store.get_batch(batch_id))), 201
+
+@app.route('/api/batches/<batch_id>')
+def api_batch(batch_id):
+    """Aggregate progress of a batch"""
+    batch = job_store.get_batch(batch_id)
+    if not batch:
+        return jsonify({'error': "Batch not found"}), 404
+    return jsonify(batch_summary(batch))
+
+@app.route('/api/batches/<batch_id>/results')
+def api_batch_results(batch_id):
+    """Download every job's results and output files in a batch as one zip"""
+    if not job_store.get_batch(batch_id):
+        return jsonify({'error': "Batch not found"}), 404
+
+    def entries():
+        manifest = []
+        for job in job_store.list_batch_jobs(batch_id):
+            results = job.get('results') or {}
+            manifest.append({
+                'job_id': job['id'],
+                'status': job['status'],
+                'inputs': job['inputs'],
+                'return_code': results.get('return_code'),
+            })
+            yield f"{job['id']}/results.json", json.dumps(results, indent=2).encode('utf-8')
+            for output_id, output_path in results.get('output_files', {}).items():
+                try:
+                    source = open_job_file(job, output_path)
+                except FileNotFoundError:
+                    continue
+                if isinstance(source, str) and not os.path.exists(source):
+                    continue
+                yield f"{job['id']}/{os.path.basename(output_path)}", source
+        yield 'manifest.json', json.dumps(manifest, indent=2).encode('utf-8')
+
+    return Response(
+        stream_with_context(iter_zip(entries())),
+        mimetype='application/zip',
+        headers={'Content-Disposition': f'attachment; filename=batch-{batch_id}.zip'}
+    )
+
+def pipeline_run_summary(run):
+    """Status of a pipeline run and each of its steps"""
+    jobs = job_store.get_jobs(list(run['steps'].values()))
+    return {
+        'run_id': run['id'],
+        'pipeline': run['pipeline'],
+        'name': run['name'],
+        'status': run['status'],
+        'created_at': run['created_at'],
+        'completed_at': run['completed_at'],
+        'steps': [
+            {
+                'id': step_id,
+                'job_id': job_id,
+                'status': jobs[job_id]['status'] if job_id in jobs else 'deleted',
+                'url': url_for('job_details', job_id=job_id),
+            }
+            for step_id, job_id in run['steps'].items()
+        ],
+    }
+
+@app.route('/api/pipelines')
+def api_pipelines():
+    """List the available pipeline definitions"""
+    return jsonify({'pipelines': [
+        {
+            'id': pipeline['id'],
+            'name': pipeline['name'],
+            'description': pipeline['description'],
+            'inputs': pipeline['expectedInputs'],
+            'steps': [{'id': step['id'], 'spec': step['spec']} for step in pipeline['steps']],
+        }
+        for pipeline in pipeline_registry.list_specs()
+    ]})
+
+@app.route('/api/pipelines/runs', methods=['POST'])
+def api_create_pipeline_run():
+    """Start a run of a pipeline"""
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict) or not payload.get('pipeline'):
+        return jsonify({'error': "Request body must be a JSON object with a pipeline"}), 400
+
+    pipeline = pipeline_registry.get(payload['pipeline'])
+    if pipeline is None:
+        return jsonify({'error': f"Pipeline not found: {payload['pipeline']}"}), 404
+
+    try:
+        # Pipeline inputs follow the same rules as a single-job batch
+        inputs = expand_batch_inputs(pipeline, {'inputs': [payload.get('inputs', {})]})[0]
+        run_id = pipeline_runner.create_run(pipeline, inputs, payload.get('name') or pipeline['name'])
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    return jsonify(pipeline_run_summary(job_store.get_pipeline_run(run_id))), 201
+
+@app.route('/api/pipelines/runs/<run_id>')
+def api_pipeline_run(run_id):
+    """Progress of a pipeline run"""
+    run = job_store.get_pipeline_run(run_id)
+    if not run:
+        return jsonify({'error': "Pipeline run not found"}), 404
+    return jsonify(pipeline_run_summary(run))
+
+@app.route('/api/pipelines/runs/<run_id>/rerun', methods=['POST'])
+def api_rerun_pipeline(run_id):
+    """Re-run the unfinished steps of a failed pipeline run"""
+    try:
+        run = pipeline_runner.rerun(run_id)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 409
+    if not run:
+        return jsonify({'error': "Pipeline run not found"}), 404
+    return jsonify(pipeline_run_summary(run))
+
 @app.route('/jobs/<job_id>')
 def job_details(job_id):
     """Show details of a specific job"""
@@ -159,6 +669,7 @@ def job_details(job_id):
     # Add status color for badge
     status_colors = {
         'pending': 'warning',
+        'queued': 'warning',
         'running': 'info',
         'completed': 'success',
         'failed': 'danger',
@@ -169,32 +680,88 @@ def job_details(job_id):
     # Read output file contents if available
     if job.get('results') and job['results'].get('output_files'):
         job['results']['output_contents'] = {}
+        binary_outputs = {o['id'] for o in job['spec'].get('outputs', []) if o.get('binary')}
         for output_id, output_path in job['results']['output_files'].items():
-            # Check if file is a binary file based on extension
-            file_ext = os.path.splitext(output_path)[1].lower()
-            binary_extensions = {'.png', '.jpg', '.jpeg', '.gif', '.bmp', '.pdf', '.zip', '.exe', '.bin'}
-            
-            if file_ext in binary_extensions:
-                job['results']['output_contents'][output_id] = "Binary file - available for download"
-            else:
-                try:
-                    with open(output_path, 'r') as f:
-                        job['results']['output_contents'][output_id] = f.read()
-                except UnicodeDecodeError:
-                    # If we can't decode the file as text, it's probably binary
-                    job['results']['output_contents'][output_id] = "Binary file - available for download"
-                except Exception as e:
-                    print(f"Error reading output file {output_path}: {e}")
-                    job['results']['output_contents'][output_id] = f"Error reading output file: {str(e)}"
+            if output_id in binary_outputs:
+                job['results']['output_contents'][output_id] = BINARY_PREVIEW
+                continue
+            if job.get('archived_at') and not os.path.exists(output_path):
+                job['results']['output_contents'][output_id] = ARCHIVED_PREVIEW
+                continue
+            try:
+                job['results']['output_contents'][output_id] = preview_cache.get(output_path)
+            except Exception as e:
+                print(f"Error reading output file {output_path}: {e}")
+                job['results']['output_contents'][output_id] = f"Error reading output file: {str(e)}"
+    
+    # First page of the job's execution log; the rest is fetched on demand
+    log_records, log_offset, log_end = read_log_records(
+        os.path.join(job_store.jobs_dir, job_id, LOG_FILE), 0, LOG_PAGE_SIZE
+    )
     
-    return render_template('job_details.html', job=job)
+    return render_template('job_details.html', job=job, log_records=log_records,
+                           log_offset=log_offset, log_end=log_end)
+
+@app.route('/jobs/<job_id>/log')
+def job_log(job_id):
+    """Page through a job's execution log records by byte offset"""
+    if not job_store.get_job(job_id):
+        return jsonify({'error': "Job not found"}), 404
+    try:
+        offset = max(0, int(request.args.get('offset', 0)))
+        limit = min(max(1, int(request.args.get('limit', LOG_PAGE_SIZE))), MAX_PAGE_SIZE * 5)
+    except ValueError:
+        return jsonify({'error': "offset and limit must be integers"}), 400
+
+    records, next_offset, at_end = read_log_records(os.path.join(job_store.jobs_dir, job_id, LOG_FILE), offset, limit)
+    return jsonify({'records': records, 'next_offset': next_offset, 'end': at_end})
+
+@app.route('/jobs/<job_id>/log/stream')
+def stream_job_log(job_id):
+    """Tail a job's stdout or stderr as server-sent events while it runs"""
+    stream = request.args.get('stream', 'stdout')
+    if stream not in ('stdout', 'stderr'):
+        return jsonify({'error': f"Unknown stream: {stream}"}), 400
+    if not job_store.get_job(job_id):
+        return jsonify({'error': "Job not found"}), 404
+
+    log_path = os.path.join(job_store.jobs_dir, job_id, STDOUT_FILE if stream == 'stdout' else STDERR_FILE)
+
+    def generate():
+        offset = 0
+        while True:
+            text, offset = read_new_lines(log_path, offset)
+            if text:
+                yield ''.join(f"data: {line}\n" for line in text.splitlines()) + "\n"
+                continue
+
+            job = job_store.get_job_statuses([job_id]).get(job_id)
+            if not job or job['status'] not in ('pending', 'queued', 'running'):
+                text, offset = read_new_lines(log_path, offset, final=True)
+                while text:
+                    yield ''.join(f"data: {line}\n" for line in text.splitlines()) + "\n"
+                    text, offset = read_new_lines(log_path, offset, final=True)
+                yield "event: end\ndata: {}\n\n".format(job['status'] if job else 'deleted')
+                return
+            time.sleep(LOG_STREAM_POLL_INTERVAL)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
 
 @app.route('/jobs/<job_id>/stop', methods=['POST'])
 def stop_job(job_id):
     """Stop a running job"""
     try:
-        job_engine.stop_job(job_id)
-        flash("Job stopped successfully", 'success')
+        outcome = job_scheduler.stop(job_id)
+        if outcome == 'stopped':
+            flash("Job stopped successfully", 'success')
+        elif outcome == 'stopping':
+            flash("Stopping job; it will be marked stopped once its processes exit", 'success')
+        else:
+            flash("Job is not running", 'warning')
     except Exception as e:
         flash(f"Error stopping job: {str(e)}", 'error')
     return redirect(url_for('job_details', job_id=job_id))
@@ -203,7 +770,8 @@ def stop_job(job_id):
 def delete_job(job_id):
     """Delete a job"""
     try:
-        job_engine.delete_job(job_id)
+        job_scheduler.stop(job_id)
+        job_store.delete_job(job_id)
         flash("Job deleted successfully", 'success')
         return redirect(url_for('jobs'))
     except Exception as e:
@@ -225,7 +793,7 @@ def download_output(job_id, output_id):
             return redirect(url_for('job_details', job_id=job_id))
         
         output_path = output_files[output_id]
-        return send_file(output_path, as_attachment=True)
+        return send_job_file(job, output_path)
     except Exception as e:
         flash(f"Error downloading output: {str(e)}", 'error')
         return redirect(url_for('job_details', job_id=job_id))
@@ -244,23 +812,31 @@ def download_input(job_id, input_id):
             return redirect(url_for('job_details', job_id=job_id))
         
         input_path = job['inputs'][input_id]
-        return send_file(input_path, as_attachment=True)
+        if not os.path.exists(input_path):
+            # The stored upload may have been collected; fall back to the job's own copy
+            input_path = os.path.join(job_store.jobs_dir, job_id, f'input_{input_id}.txt')
+        return send_job_file(job, input_path)
     except Exception as e:
         flash(f"Error downloading input: {str(e)}", 'error')
         return redirect(url_for('job_details', job_id=job_id))
 
-def execute_job_background(job_id: str, spec: dict, inputs: dict):
-    """Execute a job in the background"""
+@app.route('/jobs/<job_id>/files/<name>')
+def download_job_file(job_id, name):
+    """Download a job's full log, results, stdout or stderr"""
     try:
-        print(f"Starting background job execution for {job_id}")
-        print(f"Job spec: {json.dumps(spec, indent=2)}")
-        print(f"Job inputs: {json.dumps(inputs, indent=2)}")
-        
-        job_engine.execute_job(job_id, spec, inputs)
-        print(f"Background job execution completed for {job_id}")
+        job = job_store.get_job(job_id)
+        if not job or name not in JOB_FILES:
+            flash("File not found", 'error')
+            return redirect(url_for('job_details', job_id=job_id))
+        return send_job_file(job, os.path.join(job_store.jobs_dir, job_id, JOB_FILES[name]))
     except Exception as e:
-        print(f"Error executing job {job_id}: {str(e)}")
-        job_store.update_job_status(job_id, 'failed', {'error': str(e)})
+        flash(f"Error downloading file: {str(e)}", 'error')
+        return redirect(url_for('job_details', job_id=job_id))
+
+@app.route('/metrics')
+def metrics():
+    """Expose process metrics in the Prometheus text format"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
 
 if __name__ == '__main__':
     app.run(debug=True, port=3001) 
\ No newline at end of file
@@ -0,0 +1,68 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Tuple
+from ..execution.output import read_head_tail
+
+BINARY_PREVIEW = "Binary file - available for download"
+ARCHIVED_PREVIEW = "Job archived - output available for download"
+
+# Bytes sniffed from the start of a file to decide whether it is text
+SNIFF_BYTES = 8192
+
+
+def is_binary_file(path: str) -> bool:
+    """Sniff the start of a file for NUL bytes or invalid UTF-8."""
+    with open(path, 'rb') as f:
+        sample = f.read(SNIFF_BYTES)
+    if b'\0' in sample:
+        return True
+    try:
+        sample.decode('utf-8')
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off at the end of the sample is fine
+        return e.start < len(sample) - 3
+    return False
+
+
+class PreviewCache:
+    """Bounded head/tail previews of output files, cached per file version.
+
+    A preview is only re-read when the file's mtime or size changes, and
+    never holds more than ``head_bytes + tail_bytes`` of the file.
+    """
+
+    def __init__(self, head_bytes: int = 32 * 1024, tail_bytes: int = 32 * 1024, max_entries: int = 256):
+        """Initialize the preview cache.
+
+        Args:
+            head_bytes: Bytes shown from the start of a file
+            tail_bytes: Bytes shown from the end of a file
+            max_entries: Number of previews kept in memory
+        """
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[str, Tuple[int, int, str]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, path: str) -> str:
+        """Return the preview text for a file."""
+        stat = os.stat(path)
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry and entry[0] == stat.st_mtime_ns and entry[1] == stat.st_size:
+                self._entries.move_to_end(path)
+                return entry[2]
+
+        if is_binary_file(path):
+            preview = BINARY_PREVIEW
+        else:
+            preview, _ = read_head_tail(path, self.head_bytes, self.tail_bytes)
+
+        with self._lock:
+            self._entries[path] = (stat.st_mtime_ns, stat.st_size, preview)
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return preview
@@ -0,0 +1,64 @@
+import io
+import os
+import zipfile
+from typing import IO, Iterable, Iterator, Tuple, Union
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+
+class _ChunkBuffer(io.RawIOBase):
+    """Unseekable sink that collects bytes written by ZipFile until drained."""
+
+    def __init__(self):
+        self._chunks = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def iter_zip(entries: Iterable[Tuple[str, Union[str, bytes, IO[bytes]]]]) -> Iterator[bytes]:
+    """Stream a zip archive without building it in memory or on disk.
+
+    Entries whose size is not known up front (open files) are always
+    written with zip64 headers, since a stream cannot be rewound to add them
+    once an entry turns out to exceed 2 GiB.
+
+    Args:
+        entries: (archive name, file path, bytes or readable binary file) pairs;
+            files are closed once copied
+
+    Yields:
+        Consecutive chunks of the archive
+    """
+    buffer = _ChunkBuffer()
+    with zipfile.ZipFile(buffer, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for arcname, source in entries:
+            if isinstance(source, bytes):
+                archive.writestr(arcname, source)
+            else:
+                if hasattr(source, 'read'):
+                    src, force_zip64 = source, True
+                else:
+                    src = open(source, 'rb')
+                    force_zip64 = os.fstat(src.fileno()).st_size * 1.05 > zipfile.ZIP64_LIMIT
+                with src, archive.open(arcname, 'w', force_zip64=force_zip64) as dst:
+                    for chunk in iter(lambda: src.read(COPY_CHUNK_SIZE), b''):
+                        dst.write(chunk)
+                        data = buffer.drain()
+                        if data:
+                            yield data
+            data = buffer.drain()
+            if data:
+                yield data
+    data = buffer.drain()
+    if data:
+        yield data
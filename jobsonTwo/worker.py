@@ -0,0 +1,67 @@
+import os
+import sys
+import signal
+import argparse
+
+# Add the parent directory to the Python path
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from jobsonTwo.execution.engine import JobExecutionEngine
+from jobsonTwo.execution.cache import ResultCache
+from jobsonTwo.execution.worker import QueueWorker
+from jobsonTwo.storage.job_store import JobStore
+from jobsonTwo.storage.job_queue import JobQueue
+from jobsonTwo.storage.upload_store import UploadStore
+
+JOBS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'jobs')
+UPLOAD_FOLDER = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads')
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run queued JobsonTwo jobs (start the web app with JOBSON_EXECUTION_MODE=worker)')
+    parser.add_argument('--jobs-dir', default=os.environ.get('JOBSON_JOBS_DIR', JOBS_DIR), help='Shared jobs directory')
+    parser.add_argument('--id', help='Worker name (defaults to host, pid and a random suffix)')
+    parser.add_argument('--max-jobs', type=int, default=int(os.environ.get('JOBSON_MAX_WORKERS', os.cpu_count() or 1)),
+                        help='Jobs run at once by this worker')
+    parser.add_argument('--lease', type=float, default=float(os.environ.get('JOBSON_LEASE_SECONDS', 30)),
+                        help='Seconds a claimed job stays leased without a heartbeat')
+    parser.add_argument('--heartbeat', type=float, default=float(os.environ.get('JOBSON_HEARTBEAT_SECONDS', 5)),
+                        help='Seconds between lease renewals')
+    args = parser.parse_args()
+
+    result_cache = None
+    if os.environ.get('JOBSON_RESULT_CACHE_DIR'):
+        result_cache = ResultCache(
+            os.environ['JOBSON_RESULT_CACHE_DIR'],
+            int(os.environ.get('JOBSON_RESULT_CACHE_MAX_BYTES', 1024 * 1024 * 1024))
+        )
+
+    job_store = JobStore(args.jobs_dir)
+    engine = JobExecutionEngine(
+        job_store,
+        output_preview_bytes=int(os.environ.get('JOBSON_PREVIEW_BYTES', 64 * 1024)),
+        result_cache=result_cache,
+        upload_store=UploadStore(UPLOAD_FOLDER),
+        log_echo=os.environ.get('JOBSON_LOG_ECHO', '').lower() in ('1', 'true', 'yes'),
+        compress_artifacts=os.environ.get('JOBSON_COMPRESS_ARTIFACTS', '1').lower() in ('1', 'true', 'yes')
+    )
+    worker = QueueWorker(
+        engine,
+        JobQueue(job_store),
+        worker_id=args.id,
+        max_jobs=args.max_jobs,
+        lease_seconds=args.lease,
+        heartbeat_interval=args.heartbeat
+    )
+
+    # Finish running jobs on SIGTERM/SIGINT instead of abandoning their leases
+    signal.signal(signal.SIGTERM, lambda *_: worker.shutdown())
+    signal.signal(signal.SIGINT, lambda *_: worker.shutdown())
+    try:
+        worker.run()
+    finally:
+        engine.shutdown()
+
+
+if __name__ == '__main__':
+    main()